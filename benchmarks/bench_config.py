@@ -0,0 +1,25 @@
+"""App configuration for benchmark runs (``CONFIG_MODULE=benchmarks.bench_config.BenchConfig``).
+
+Production-like settings (no debug, rate limits off so the load generator is
+not throttled, quiet logs) against the benchmark database, which defaults to
+benchmarks/bench.db and can be pointed elsewhere with BENCH_DATABASE_URL.
+"""
+
+import os
+
+from config.config import BaseConfig
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class BenchConfig(BaseConfig):
+    DEBUG = False
+    TESTING = False
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        "BENCH_DATABASE_URL", f"sqlite:///{os.path.join(BENCH_DIR, 'bench.db')}"
+    )
+    # The load generator mints its own tokens; the server must share the key
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "benchmark-secret-key-not-for-production")
+    RATELIMIT_ENABLED = False
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")
+    MAIL_SUPPRESS_SEND = True
@@ -0,0 +1,134 @@
+"""Microbenchmark: serializing a 100-product listing.
+
+Compares the old path (per-field dict building with isinstance checks, then
+stdlib json through Flask's default provider) with the shared serializers
+encoded by FastJSONProvider. Runs without a database:
+
+    python benchmarks/bench_json.py [--items 100] [--number 200]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from shared import json_provider, serializers  # noqa: E402
+
+
+def legacy_serialize_product(product):
+    # The hand-rolled serializer the routes used before shared.serializers
+    return {
+        "id": product.id,
+        "name": product.name,
+        "slug": product.slug,
+        "description": product.description,
+        "currency": product.currency,
+        "price": (
+            float(product.price)
+            if isinstance(product.price, Decimal)
+            else product.price
+        ),
+        "discount_percentage": product.discount_percentage,
+        "stock_quantity": product.stock_quantity,
+        "unit_quantity": product.unit_quantity,
+        "image_url": product.image_url,
+        "location": product.location,
+        "featured": product.featured,
+        "flash_sale": product.flash_sale,
+        "vendor_id": product.vendor_id,
+        "vendor_name": product.vendor.username if product.vendor else None,
+        "created_at": (
+            product.created_at.isoformat()
+            if isinstance(product.created_at, datetime)
+            else None
+        ),
+        "updated_at": (
+            product.updated_at.isoformat()
+            if isinstance(product.updated_at, datetime)
+            else None
+        ),
+        "is_approved": product.is_approved,
+        "rejected": product.rejected,
+        "categories": [
+            {"id": c.id, "name": c.name, "slug": c.slug}
+            for c in product.categories_linked
+        ],
+    }
+
+
+def make_products(count):
+    vendor = SimpleNamespace(username="vendor")
+    categories = [
+        SimpleNamespace(id=i, name=f"Category {i}", slug=f"category-{i}")
+        for i in range(3)
+    ]
+    created = datetime(2025, 1, 1, 8, 30)
+    return [
+        SimpleNamespace(
+            id=i,
+            name=f"Single origin coffee {i}",
+            slug=f"single-origin-coffee-{i}",
+            description="Medium roast with notes of chocolate and citrus. " * 3,
+            currency="IDR",
+            price=Decimal("85000.00") + i,
+            discount_percentage=10,
+            stock_quantity=100 + i,
+            unit_quantity="250g",
+            image_url=f"https://cdn.example.com/products/{i}.jpg",
+            location="Bandung",
+            featured=i % 5 == 0,
+            flash_sale=i % 7 == 0,
+            vendor_id=1,
+            vendor=vendor,
+            created_at=created + timedelta(minutes=i),
+            updated_at=created + timedelta(hours=i),
+            is_approved=True,
+            rejected=False,
+            categories_linked=categories,
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    products = make_products(args.items)
+    app = Flask("bench_json")  # providers only hold a weak reference
+    legacy_json = DefaultJSONProvider(app)
+    fast_json = json_provider.FastJSONProvider(app)
+
+    def legacy():
+        payload = {"products": [legacy_serialize_product(p) for p in products]}
+        return legacy_json.dumps(payload)
+
+    def fast():
+        payload = {"products": serializers.PRODUCT.many(products)}
+        return fast_json.dumps(payload)
+
+    if legacy_json.loads(legacy()) != fast_json.loads(fast()):
+        raise SystemExit("serializers disagree; fix before comparing timings")
+
+    backend = "orjson" if json_provider.orjson else "stdlib json (orjson missing)"
+    print(f"{args.items} products x {args.number} runs, fast path on {backend}")
+    results = {}
+    for name, fn in (("legacy", legacy), ("shared", fast)):
+        best = min(timeit.repeat(fn, number=args.number, repeat=5))
+        results[name] = best / args.number
+        print(f"  {name:<7} {results[name] * 1e6:9.1f} us/listing")
+    print(f"  speedup {results['legacy'] / results['shared']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
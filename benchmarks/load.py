@@ -0,0 +1,446 @@
+"""Load test of the core API flows against a seeded benchmark database.
+
+Each scenario (catalog browse, search, add-to-cart, checkout, order
+history, admin approval queue) runs for ``--duration`` seconds on
+``--concurrency`` threads, either in-process through the Flask test client
+or over HTTP against a running server. Queries per request come from the
+``Server-Timing`` header the instrumentation middleware adds, so they work
+for both targets. Results are written as JSON; ``--baseline`` compares
+against an earlier run and exits non-zero on regressions.
+
+    python benchmarks/seed.py --scale 0.1
+    python benchmarks/load.py --output benchmarks/results/client.json
+    python benchmarks/load.py --gunicorn --workers 4 --concurrency 16 \\
+        --baseline benchmarks/results/client.json
+
+``--url`` targets a server that is already running; it must use the
+benchmark database and JWT_SECRET_KEY (CONFIG_MODULE=benchmarks.bench_config.BenchConfig).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_CONFIG = "benchmarks.bench_config.BenchConfig"
+QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    body: dict = None
+    token: str = None
+
+
+@dataclass
+class Fixtures:
+    """Ids and tokens the scenarios draw from, sampled from the database."""
+
+    product_ids: list
+    customer_tokens: list
+    admin_token: str
+    search_terms: list
+
+
+def _browse(fx, rng):
+    return Request("GET", f"/products?page={rng.randint(1, 50)}&limit=20")
+
+
+def _search(fx, rng):
+    return Request("GET", f"/products?search={rng.choice(fx.search_terms)}&limit=20")
+
+
+def _add_to_cart(fx, rng):
+    body = {"product_id": rng.choice(fx.product_ids), "quantity": 1}
+    return Request("POST", "/cart/items", body, rng.choice(fx.customer_tokens))
+
+
+def _checkout(fx, rng):
+    items = [
+        {"product_id": product_id, "quantity": rng.randint(1, 2)}
+        for product_id in rng.sample(fx.product_ids, rng.randint(1, 3))
+    ]
+    return Request("POST", "/orders", {"items": items}, rng.choice(fx.customer_tokens))
+
+
+def _order_history(fx, rng):
+    return Request("GET", "/orders?limit=20", token=rng.choice(fx.customer_tokens))
+
+
+def _admin_queue(fx, rng):
+    return Request(
+        "GET",
+        f"/products?include_unapproved=true&only_unapproved=true"
+        f"&page={rng.randint(1, 5)}&limit=20",
+        token=fx.admin_token,
+    )
+
+
+SCENARIOS = {
+    "browse": _browse,
+    "search": _search,
+    "add_to_cart": _add_to_cart,
+    "checkout": _checkout,
+    "order_history": _order_history,
+    "admin_queue": _admin_queue,
+}
+
+
+def load_fixtures(app, sample=500, seed_value=0):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import select
+
+    from instance.database import db
+    from models.product import Products
+    from models.user import RoleType, Users
+
+    rng = random.Random(seed_value)
+    with app.app_context():
+        product_ids = db.session.execute(
+            select(Products.id).where(Products.is_approved.is_(True)).limit(sample * 4)
+        ).scalars().all()
+        customer_ids = db.session.execute(
+            select(Users.id).where(Users.role == RoleType.customer).limit(sample)
+        ).scalars().all()
+        admin_id = db.session.execute(
+            select(Users.id).where(Users.role == RoleType.admin).limit(1)
+        ).scalar()
+        names = db.session.execute(
+            select(Products.name).limit(sample)
+        ).scalars().all()
+        if not (product_ids and customer_ids and admin_id):
+            raise SystemExit("Benchmark database is empty; run benchmarks/seed.py first")
+
+        customer_tokens = [
+            create_access_token(identity=str(user_id), additional_claims={"role": "customer"})
+            for user_id in customer_ids
+        ]
+        admin_token = create_access_token(
+            identity=str(admin_id), additional_claims={"role": "admin"}
+        )
+    terms = sorted({word.lower() for name in names for word in name.split() if word.isalpha()})
+    rng.shuffle(product_ids)
+    return Fixtures(product_ids, customer_tokens, admin_token, terms or ["coffee"])
+
+
+class ClientTarget:
+    """In-process: the Flask test client, one per thread."""
+
+    name = "client"
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, req):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        headers = {"Authorization": f"Bearer {req.token}"} if req.token else {}
+        response = client.open(req.path, method=req.method, json=req.body, headers=headers)
+        response.close()
+        return response.status_code, response.headers.get("Server-Timing", "")
+
+
+class HttpTarget:
+    """A running server, over one keep-alive connection per thread."""
+
+    name = "http"
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=30
+            )
+        return conn
+
+    def send(self, req):
+        headers = {"Content-Type": "application/json"}
+        if req.token:
+            headers["Authorization"] = f"Bearer {req.token}"
+        body = json.dumps(req.body) if req.body is not None else None
+        conn = self._connection()
+        try:
+            conn.request(req.method, req.path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+        return response.status, response.getheader("Server-Timing", "")
+
+
+@dataclass
+class ScenarioResult:
+    latencies: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def record(self, seconds, status, server_timing):
+        self.latencies.append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status >= 400:
+            self.errors += 1
+        match = QUERIES_RE.search(server_timing or "")
+        if match:
+            self.queries.append(int(match.group(1)))
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def pct(p):
+            if not latencies:
+                return None
+            index = min(count - 1, max(0, int(round(p / 100 * count + 0.5)) - 1))
+            return round(latencies[index] * 1000, 3)
+
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": round(count / self.elapsed, 2) if self.elapsed else 0.0,
+            "mean_ms": round(sum(latencies) / count * 1000, 3) if count else None,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "queries_per_request": (
+                round(sum(self.queries) / len(self.queries), 2) if self.queries else None
+            ),
+            "status_counts": {str(k): v for k, v in sorted(self.statuses.items())},
+        }
+
+
+def run_scenario(target, build, fixtures, duration, concurrency, warmup=5, seed_value=0):
+    result = ScenarioResult()
+    lock = threading.Lock()
+
+    def one(rng, measure):
+        req = build(fixtures, rng)
+        started = time.perf_counter()
+        try:
+            status, server_timing = target.send(req)
+        except (http.client.HTTPException, OSError):
+            status, server_timing = 599, ""
+        seconds = time.perf_counter() - started
+        if measure:
+            with lock:
+                result.record(seconds, status, server_timing)
+
+    warm_rng = random.Random(seed_value)
+    for _ in range(warmup):
+        one(warm_rng, measure=False)
+
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed_value * 1000 + index + 1)
+        while time.perf_counter() < deadline:
+            one(rng, measure=True)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - started
+    return result.summary()
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of ``results`` against ``baseline`` as readable lines."""
+    problems = []
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        if before["rps"] and current["rps"] < before["rps"] * (1 - tolerance):
+            problems.append(f"{name}: rps {before['rps']} -> {current['rps']}")
+        for key in ("p95_ms", "p99_ms"):
+            if before[key] and current[key] and current[key] > before[key] * (1 + tolerance):
+                problems.append(f"{name}: {key} {before[key]} -> {current[key]}")
+        if (
+            before["queries_per_request"] is not None
+            and current["queries_per_request"] is not None
+            and current["queries_per_request"] > before["queries_per_request"]
+        ):
+            problems.append(
+                f"{name}: queries/request {before['queries_per_request']}"
+                f" -> {current['queries_per_request']}"
+            )
+    return problems
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(workers, threads):
+    port = _free_port()
+    env = dict(os.environ, CONFIG_MODULE=os.environ.get("CONFIG_MODULE", BENCH_CONFIG))
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--log-level", "warning",
+            "app:app",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        if process.poll() is not None:
+            raise SystemExit("gunicorn exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("gunicorn did not start listening")
+
+
+def run(
+    app,
+    target,
+    scenarios=None,
+    duration=10.0,
+    concurrency=1,
+    warmup=5,
+    echo=print,
+):
+    """Run ``scenarios`` (all by default) and return the results document."""
+    fixtures = load_fixtures(app)
+    results = {
+        "meta": {
+            "target": target.name,
+            "concurrency": concurrency,
+            "duration_seconds": duration,
+            "database": app.config["SQLALCHEMY_DATABASE_URI"].rsplit("@", 1)[-1],
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+        },
+        "scenarios": {},
+    }
+    for name in scenarios or SCENARIOS:
+        summary = run_scenario(
+            target, SCENARIOS[name], fixtures, duration, concurrency, warmup
+        )
+        results["scenarios"][name] = summary
+        echo(
+            f"{name:<14} {summary['rps']:>9.1f} rps  p50 {summary['p50_ms']}ms"
+            f"  p95 {summary['p95_ms']}ms  p99 {summary['p99_ms']}ms"
+            f"  {summary['queries_per_request']} q/req  {summary['errors']} errors"
+        )
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target_group = parser.add_mutually_exclusive_group()
+    target_group.add_argument("--url", help="benchmark a server that is already running")
+    target_group.add_argument(
+        "--gunicorn", action="store_true", help="start a local gunicorn to benchmark"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help="comma separated subset"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests first")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10,
+        help="allowed relative rps/latency change before it counts as a regression",
+    )
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    os.environ.setdefault("CONFIG_MODULE", BENCH_CONFIG)
+    from config.settings import create_app
+
+    app = create_app()
+    server = None
+    if args.gunicorn:
+        server, url = start_gunicorn(args.workers, args.threads)
+        target = HttpTarget(url)
+    elif args.url:
+        target = HttpTarget(args.url)
+    else:
+        target = ClientTarget(app)
+
+    try:
+        results = run(app, target, scenarios, args.duration, args.concurrency, args.warmup)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    if args.gunicorn:
+        results["meta"].update(target="gunicorn", workers=args.workers, threads=args.threads)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            problems = compare(results, json.load(fh), args.tolerance)
+        for line in problems:
+            print(f"REGRESSION {line}")
+        if problems:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Bulk seeder for the benchmark database.
+
+At ``--scale 1`` it creates 10k vendors, 20k customers, 100k products (80%
+approved, 10% pending, 10% rejected) and 250k orders with 1M order items.
+Rows go in with multi-row executemany batches and explicit ids, so a full
+seed takes minutes rather than hours; search_text is filled in here because
+bulk inserts skip the mapper events that normally maintain it.
+
+    python benchmarks/seed.py --scale 0.1
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from instance.database import db  # noqa: E402
+from models.category import Categories  # noqa: E402
+from models.order import Orders  # noqa: E402
+from models.order_item import OrderItems  # noqa: E402
+from models.product import Products, build_search_text  # noqa: E402
+from models.product_category import ProductCategories  # noqa: E402
+from models.user import RoleType, Users  # noqa: E402
+from shared import crono  # noqa: E402
+
+FULL_SIZE = {
+    "vendors": 10_000,
+    "customers": 20_000,
+    "categories": 200,
+    "products": 100_000,
+    "orders": 250_000,
+    "items_per_order": 4,
+}
+BATCH_SIZE = 5000
+CITIES = ("Jakarta", "Bandung", "Surabaya", "Medan", "Denpasar", "Yogyakarta")
+ORIGINS = ("Gayo", "Toraja", "Kintamani", "Flores", "Java", "Mandheling", "Bajawa")
+ROASTS = ("Light", "Medium", "Dark", "Espresso", "Filter")
+ORDER_STATUSES = ("pending", "paid", "shipped", "completed", "cancelled")
+
+
+def sizes_for(scale):
+    counts = {
+        key: max(1, int(value * scale))
+        for key, value in FULL_SIZE.items()
+        if key != "items_per_order"
+    }
+    counts["items_per_order"] = FULL_SIZE["items_per_order"]
+    return counts
+
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start : start + BATCH_SIZE])
+
+
+def _users(first_id, count, role, rng, now, tag):
+    return [
+        {
+            "id": first_id + i,
+            "username": f"bench_{tag}_{first_id + i}",
+            "first_name": tag.title(),
+            "last_name": str(first_id + i),
+            "email": f"bench_{tag}_{first_id + i}@bench.test",
+            "password_hash": "benchmark",
+            "city": rng.choice(CITIES),
+            "role": role,
+            "is_active": True,
+            "balance": Decimal("10000000"),
+            "created_at": now - timedelta(days=rng.randint(0, 730)),
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def seed(scale=0.01, seed_value=42, echo=print):
+    """Seed the current app's database; returns the row counts created."""
+    rng = random.Random(seed_value)
+    counts = sizes_for(scale)
+    now = crono.now()
+    db.create_all()
+
+    started = time.perf_counter()
+
+    def done(label, n):
+        echo(f"  {label:<18} {n:>9,}  ({time.perf_counter() - started:.1f}s)")
+
+    first_user = _next_id(Users)
+    vendors = _users(first_user, counts["vendors"], RoleType.vendor, rng, now, "vendor")
+    customers = _users(
+        first_user + len(vendors), counts["customers"], RoleType.customer, rng, now, "customer"
+    )
+    admin = _users(first_user + len(vendors) + len(customers), 1, RoleType.admin, rng, now, "admin")
+    _bulk_insert(Users, vendors + customers + admin)
+    done("users", len(vendors) + len(customers) + 1)
+    vendor_city = {v["id"]: v["city"] for v in vendors}
+
+    first_category = _next_id(Categories)
+    categories = [
+        {
+            "id": first_category + i,
+            "name": f"{ORIGINS[i % len(ORIGINS)]} {ROASTS[i % len(ROASTS)]} {i}",
+            "slug": f"bench-category-{first_category + i}",
+            "vendor_id": vendors[i % len(vendors)]["id"],
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(counts["categories"])
+    ]
+    _bulk_insert(Categories, categories)
+    done("categories", len(categories))
+
+    first_product = _next_id(Products)
+    products = []
+    links = []
+    for i in range(counts["products"]):
+        product_id = first_product + i
+        vendor_id = rng.choice(vendors)["id"]
+        name = f"{rng.choice(ORIGINS)} {rng.choice(ROASTS)} Roast {product_id}"
+        description = f"Single origin {name.lower()} beans, roasted to order."
+        moderation = rng.random()
+        products.append(
+            {
+                "id": product_id,
+                "name": name,
+                "slug": f"bench-product-{product_id}",
+                "description": description,
+                "currency": "IDR",
+                "price": Decimal(rng.randrange(30_000, 500_000, 500)),
+                "discount_percentage": rng.choice((0, 0, 0, 5, 10, 20)),
+                "stock_quantity": 1_000_000,
+                "unit_quantity": rng.choice(("250g", "500g", "1kg")),
+                "image_url": f"https://img.bench.test/{product_id}.jpg",
+                "featured": rng.random() < 0.05,
+                "flash_sale": rng.random() < 0.05,
+                "is_approved": moderation < 0.8,
+                "rejected": moderation >= 0.9,
+                "vendor_id": vendor_id,
+                "search_text": build_search_text(name, description, vendor_city[vendor_id]),
+                "created_at": now - timedelta(minutes=rng.randint(0, 525_600)),
+                "updated_at": now,
+            }
+        )
+        for category in rng.sample(categories, min(len(categories), rng.randint(1, 2))):
+            links.append({"product_id": product_id, "category_id": category["id"]})
+    _bulk_insert(Products, products)
+    done("products", len(products))
+    _bulk_insert(ProductCategories, links)
+    done("product_categories", len(links))
+
+    approved = [p for p in products if p["is_approved"]] or products
+    first_order = _next_id(Orders)
+    next_item = _next_id(OrderItems)
+    orders = []
+    items = []
+    order_count = item_count = 0
+    for i in range(counts["orders"]):
+        order_id = first_order + i
+        total = Decimal("0")
+        for product in rng.sample(approved, min(len(approved), counts["items_per_order"])):
+            quantity = rng.randint(1, 3)
+            total += product["price"] * quantity
+            items.append(
+                {
+                    "id": next_item,
+                    "order_id": order_id,
+                    "product_id": product["id"],
+                    "vendor_id": product["vendor_id"],
+                    "quantity": quantity,
+                    "unit_price": product["price"],
+                }
+            )
+            next_item += 1
+        orders.append(
+            {
+                "id": order_id,
+                "user_id": rng.choice(customers)["id"],
+                "total_amount": total,
+                "status": rng.choice(ORDER_STATUSES),
+                "created_at": now - timedelta(minutes=rng.randint(0, 525_600)),
+            }
+        )
+        # 1M item dicts would not fit comfortably in memory: flush as we go
+        if len(orders) == BATCH_SIZE or i == counts["orders"] - 1:
+            _bulk_insert(Orders, orders)
+            _bulk_insert(OrderItems, items)
+            order_count += len(orders)
+            item_count += len(items)
+            orders, items = [], []
+    done("orders", order_count)
+    done("order_items", item_count)
+
+    db.session.commit()
+    return {
+        "users": len(vendors) + len(customers) + 1,
+        "categories": len(categories),
+        "products": len(products),
+        "orders": order_count,
+        "order_items": item_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.01, help="1 = full size")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument(
+        "--reset", action="store_true", help="drop and recreate all tables first"
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("CONFIG_MODULE", "benchmarks.bench_config.BenchConfig")
+    from config.settings import create_app
+
+    app = create_app()
+    with app.app_context():
+        print(f"Seeding {app.config['SQLALCHEMY_DATABASE_URI']} at scale {args.scale}")
+        if args.reset:
+            db.drop_all()
+        seed(args.scale, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,87 @@ class BaseConfig:
     }
     REDIS_URL = os.getenv("REDIS_URL")
 
+    # Response cache: shared Redis across gunicorn workers when available,
+    # per-process memory otherwise
+    CACHE_TYPE = "RedisCache" if REDIS_URL else "SimpleCache"
+    # Listing ETags and cache warming rely on every worker seeing the same
+    # cache; set CACHE_SHARED=1 for a single-process SimpleCache deployment
+    CACHE_SHARED = bool(REDIS_URL) or os.getenv("CACHE_SHARED", "0") == "1"
+    CACHE_REDIS_URL = REDIS_URL
+    CACHE_KEY_PREFIX = "bumibrew:"
+    CACHE_DEFAULT_TIMEOUT = 300
+    # Catalog edits invalidate cached listings at once, but checkouts,
+    # cancellations and the reservation sweep do not: during a flash sale
+    # every order would empty the cache. Listed stock may therefore lag by up
+    # to this many seconds; checkout re-checks stock in the database anyway.
+    PRODUCT_LIST_CACHE_TIMEOUT = int(os.getenv("PRODUCT_LIST_CACHE_TIMEOUT", 60))
+    CATEGORY_TREE_CACHE_TIMEOUT = int(os.getenv("CATEGORY_TREE_CACHE_TIMEOUT", 300))
+
+    # Per-worker voucher lookups; misses (unknown codes) expire sooner
+    VOUCHER_CACHE_TTL = int(os.getenv("VOUCHER_CACHE_TTL", 60))
+    VOUCHER_NEGATIVE_CACHE_TTL = int(os.getenv("VOUCHER_NEGATIVE_CACHE_TTL", 10))
+    # How often a worker re-reads the shared voucher version to pick up
+    # changes made on other workers
+    VOUCHER_VERSION_CHECK_SECONDS = int(os.getenv("VOUCHER_VERSION_CHECK_SECONDS", 5))
+
+    # Opt-in: how long a pending order holds its stock before the expiry
+    # sweep (a periodic job, or flask release-expired-reservations) cancels
+    # it. Pending is the normal state until the vendor ships, so unset means
+    # reservations never expire.
+    STOCK_RESERVATION_TTL_MINUTES = (
+        int(os.environ["STOCK_RESERVATION_TTL_MINUTES"])
+        if os.getenv("STOCK_RESERVATION_TTL_MINUTES")
+        else None
+    )
+
+    # Request instrumentation (Server-Timing headers, /metrics). Requests
+    # running more SQL statements than the threshold are flagged as N+1
+    INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "true") == "true"
+    N_PLUS_ONE_QUERY_THRESHOLD = int(os.getenv("N_PLUS_ONE_QUERY_THRESHOLD", 20))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # Bearer token; /metrics is 404 without
+
+    # Email outbox (job worker or flask deliver-emails): messages per SMTP
+    # connection, poll interval when idle, retry backoff (base doubling per
+    # attempt, capped) and attempts before a message is marked failed
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 50))
+    EMAIL_WORKER_POLL_SECONDS = float(os.getenv("EMAIL_WORKER_POLL_SECONDS", 5))
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+    EMAIL_RETRY_MAX_SECONDS = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", 3600))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+    # A claimed batch not finished within this is picked up again
+    EMAIL_CLAIM_TIMEOUT_SECONDS = int(os.getenv("EMAIL_CLAIM_TIMEOUT_SECONDS", 300))
+
+    # Bulk catalog import/export: rows validated and inserted per chunk, row
+    # errors listed in the import report, products per export query
+    PRODUCT_IMPORT_CHUNK_SIZE = int(os.getenv("PRODUCT_IMPORT_CHUNK_SIZE", 500))
+    PRODUCT_IMPORT_MAX_ERRORS = int(os.getenv("PRODUCT_IMPORT_MAX_ERRORS", 1000))
+    PRODUCT_EXPORT_BATCH_SIZE = int(os.getenv("PRODUCT_EXPORT_BATCH_SIZE", 1000))
+    # Most products one bulk approve/reject request may touch
+    PRODUCT_MODERATION_MAX_BATCH = int(os.getenv("PRODUCT_MODERATION_MAX_BATCH", 500))
+
+    # Notifications: lifetime of the cached unread counter (it is also dropped
+    # on every change) and rows per multi-row insert when fanning out
+    NOTIFICATION_UNREAD_CACHE_TTL = int(os.getenv("NOTIFICATION_UNREAD_CACHE_TTL", 300))
+    NOTIFICATION_FANOUT_BATCH_SIZE = int(os.getenv("NOTIFICATION_FANOUT_BATCH_SIZE", 1000))
+
+    # Job worker (python worker.py): pool threads, idle poll interval, jobs
+    # claimed per batch, cap of the retry backoff, how long a claimed job may
+    # run before another worker takes it over, and retention of finished jobs
+    JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", 4))
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+    JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", 20))
+    JOB_RETRY_MAX_SECONDS = int(os.getenv("JOB_RETRY_MAX_SECONDS", 3600))
+    JOB_CLAIM_TIMEOUT_SECONDS = int(os.getenv("JOB_CLAIM_TIMEOUT_SECONDS", 600))
+    JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", 7))
+
+    # Logging: "json" or "text" records, root level, per-module overrides
+    # ("repo.product_repo=DEBUG,werkzeug=WARNING") and the fraction of DEBUG
+    # records kept
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))
+
 
 class LocalConfig(BaseConfig):
     """Configuration for local development."""
@@ -30,6 +111,7 @@ class LocalConfig(BaseConfig):
         f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT', 5432)}/{os.getenv('DB_NAME')}",
     )
     FLASK_ENV = "development"
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
 
 
 class ProductionConfig(BaseConfig):
@@ -48,3 +130,9 @@ class TestingConfig(BaseConfig):
     RATELIMIT_ENABLED = (
         False  # Disable rate limiting in tests for speed up testing process
     )
+    CACHE_TYPE = "SimpleCache"
+    # The test client runs in one process, so its SimpleCache is shared
+    CACHE_SHARED = True
+    # Every test app starts with an empty shared cache, while the per-worker
+    # voucher cache lives for the whole process: always re-read the version
+    VOUCHER_VERSION_CHECK_SECONDS = 0
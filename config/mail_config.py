@@ -15,5 +15,5 @@ def init_mail_config(app):
     # Debug logging for mail config (avoid logging passwords)
     import logging
 
-    logging.info(f"MAIL_USERNAME: {app.config['MAIL_USERNAME']}")
-    logging.info(f"MAIL_DEFAULT_SENDER: {app.config['MAIL_DEFAULT_SENDER']}")
+    logging.info("MAIL_USERNAME: %s", app.config['MAIL_USERNAME'])
+    logging.info("MAIL_DEFAULT_SENDER: %s", app.config['MAIL_DEFAULT_SENDER'])
@@ -1,7 +1,6 @@
 import os
 import redis
-import logging
-import sys
+import click
 import models  # noqa: F401
 
 from werkzeug.exceptions import HTTPException
@@ -16,12 +15,14 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# from shared.cache import cache
+from shared.cache import cache
+from shared.json_provider import FastJSONProvider
 from shared.limiter import limiter
 from shared.redis_check import check_redis_connection
 from instance.database import init_db, db
 from config.mail_config import init_mail_config
 from utils.logger import setup_logger
+from middlewares.instrumentation import init_instrumentation
 
 
 # Import blueprints
@@ -37,6 +38,7 @@ from route.order_route import order_bp
 from route.wishlist_route import wishlist_bp
 from route.subscription_route import subscription_bp
 from route.voucher_route import voucher_bp
+from route.notification_route import notification_bp
 
 # Import error handlers
 from route.error_handlers import register_error_handlers
@@ -45,17 +47,7 @@ from route.error_handlers import register_error_handlers
 def create_app(config_module=None):
     """Create a Flask application instance."""
     app = Flask(__name__)
-
-    # Configure app logger to output to console at INFO level
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-        "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
-    )
-    handler.setFormatter(formatter)
-    if not app.logger.hasHandlers():
-        app.logger.addHandler(handler)
-    app.logger.setLevel(logging.INFO)
+    app.json = FastJSONProvider(app)
 
     # Determine configuration
     config_path = config_module or os.getenv(
@@ -63,13 +55,14 @@ def create_app(config_module=None):
     )
     app.config.from_object(config_path)
 
+    # Structured logging first, so everything below logs through it
+    setup_logger(app)
+
     # 🔔 Email Configuration
     init_mail_config(app)
     mail.init_app(app)
 
-    # app.config["CACHE_TYPE"] = "RedisCache"
-    # app.config["CACHE_REDIS_URL"] = os.getenv("REDIS_URL")
-    # cache.init_app(app)
+    cache.init_app(app)
 
     # 🛠️ ENABLE CORS HERE
     # CORS(app, origins=["https://bumibrew-pearl.vercel.app"], supports_credentials=True)
@@ -79,7 +72,8 @@ def create_app(config_module=None):
     jwt = JWTManager(app)
     init_db(app)
 
-    setup_logger(app)
+    # First, so its hooks wrap every other extension's request handling
+    init_instrumentation(app)
 
     # Register error handlers
     register_error_handlers(app, jwt)
@@ -109,7 +103,7 @@ def create_app(config_module=None):
             db.session.remove()
         except Exception as e:
             # Log the error if needed (avoid print in production)
-            current_app.logger.warning(f"Failed to remove DB session: {e}")
+            current_app.logger.warning("Failed to remove DB session: %s", e)
 
     # Register blueprints
     app.register_blueprint(index_router)
@@ -124,6 +118,44 @@ def create_app(config_module=None):
     app.register_blueprint(wishlist_bp)
     app.register_blueprint(subscription_bp)
     app.register_blueprint(voucher_bp)
+    app.register_blueprint(notification_bp)
+
+    @app.cli.command("release-expired-reservations")
+    def release_expired_reservations_command():
+        """Cancel pending orders whose stock reservation expired."""
+        from services.reservation_services import release_expired_reservations
+
+        cancelled = release_expired_reservations()
+        print(f"Cancelled {cancelled} expired orders.")
+
+    @app.cli.command("import-topup-csv")
+    @click.argument("path", default="logs/topup_requests.csv")
+    def import_topup_csv_command(path):
+        """Import the legacy CSV top-up ledger into topup_requests."""
+        from repo.topup_repo import count_topup_requests
+        from services.user_services import import_legacy_topup_csv
+
+        if count_topup_requests():
+            print("topup_requests is not empty; nothing imported.")
+            return
+        imported, skipped = import_legacy_topup_csv(path)
+        print(f"Imported {imported} top-up requests ({skipped} skipped).")
+
+    @app.cli.command("deliver-emails")
+    @click.option("--once", is_flag=True, help="Deliver one batch and exit.")
+    def deliver_emails_command(once):
+        """Outbox worker: send queued emails in batches until stopped."""
+        import time
+        from services.email_services import deliver_pending_emails
+
+        poll_seconds = app.config["EMAIL_WORKER_POLL_SECONDS"]
+        while True:
+            sent, failed = deliver_pending_emails()
+            if once:
+                print(f"Sent {sent} emails ({failed} failed).")
+                return
+            if not (sent or failed):
+                time.sleep(poll_seconds)
 
     @app.route("/uploads/<path:filename>")
     def serve_uploads(filename):
@@ -8,7 +8,6 @@ from models.user import Users
 from models.product import Products
 from models.product_category import ProductCategories
 from models.category import Categories
-import services.user_services as user_services
 
 def random_string(length=6):
     """Generate a random string for unique test data."""
@@ -35,12 +34,6 @@ def app():
 
     return app
 
-@pytest.fixture(autouse=True)
-def isolate_csv_file(tmp_path, monkeypatch):
-    """Redirect CSV_TOPUP_FILE to a temp file for all tests."""
-    test_csv = tmp_path / "topup_test.csv"
-    monkeypatch.setattr(user_services, "CSV_TOPUP_FILE", str(test_csv))
-
 @pytest.fixture(scope="function")
 def init_db(app):
     """Create the database tables and seed test data."""
@@ -0,0 +1,323 @@
+"""Per-request query counting and latency instrumentation.
+
+Every request records its SQL statement count and time (SQLAlchemy cursor
+events), JSON encoding time, response size and total latency. The numbers
+are sent back in a ``Server-Timing`` header and aggregated per endpoint for
+the Prometheus-style ``/metrics`` endpoint (404 unless ``METRICS_TOKEN``
+is set, then bearer-token protected). Requests issuing more than
+``N_PLUS_ONE_QUERY_THRESHOLD`` statements are logged and counted as likely
+N+1 patterns.
+
+Aggregates live in the worker process: with several gunicorn workers each
+scrape sees the worker that answered it, as with any in-process exporter.
+"""
+
+import hmac
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class RequestMetrics:
+    __slots__ = ("started", "query_count", "sql_seconds", "serialize_seconds", "spans")
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.query_count = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.spans = []
+
+
+class EndpointStats:
+    __slots__ = (
+        "requests",
+        "statuses",
+        "duration_sum",
+        "duration_buckets",
+        "query_count",
+        "sql_seconds",
+        "serialize_seconds",
+        "response_bytes",
+        "n_plus_one",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.duration_sum = 0.0
+        self.duration_buckets = [0] * len(DURATION_BUCKETS)
+        self.query_count = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.response_bytes = 0
+        self.n_plus_one = 0
+
+
+class MetricsRegistry:
+    """Thread-safe per-(endpoint, method) aggregates for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, endpoint, method, status, duration, metrics, size, n_plus_one):
+        with self._lock:
+            stats = self._stats.get((endpoint, method))
+            if stats is None:
+                stats = self._stats[(endpoint, method)] = EndpointStats()
+            stats.requests += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.duration_sum += duration
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats.duration_buckets[i] += 1
+            stats.query_count += metrics.query_count
+            stats.sql_seconds += metrics.sql_seconds
+            stats.serialize_seconds += metrics.serialize_seconds
+            stats.response_bytes += size
+            stats.n_plus_one += n_plus_one
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def render(self) -> str:
+        """Aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = []
+
+            def family(name, kind, help_text, samples):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(samples)
+
+            def labels(endpoint, method, **extra):
+                pairs = {"endpoint": endpoint, "method": method, **extra}
+                return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items())
+
+            family(
+                "http_requests_total",
+                "counter",
+                "Requests handled, by endpoint, method and status.",
+                [
+                    f"http_requests_total{{{labels(e, m, status=str(status))}}} {count}"
+                    for (e, m), s in items
+                    for status, count in sorted(s.statuses.items())
+                ],
+            )
+            duration = []
+            for (e, m), s in items:
+                for bound, count in zip(DURATION_BUCKETS, s.duration_buckets):
+                    duration.append(
+                        f"http_request_duration_seconds_bucket"
+                        f"{{{labels(e, m, le=repr(bound))}}} {count}"
+                    )
+                duration.append(
+                    f"http_request_duration_seconds_bucket"
+                    f"{{{labels(e, m, le='+Inf')}}} {s.requests}"
+                )
+                duration.append(
+                    f"http_request_duration_seconds_sum{{{labels(e, m)}}} "
+                    f"{s.duration_sum:.6f}"
+                )
+                duration.append(
+                    f"http_request_duration_seconds_count{{{labels(e, m)}}} {s.requests}"
+                )
+            family(
+                "http_request_duration_seconds",
+                "histogram",
+                "Request latency.",
+                duration,
+            )
+            for name, help_text, attr, fmt in (
+                ("db_queries_total", "SQL statements executed.", "query_count", "{}"),
+                ("db_query_seconds_total", "Time spent in SQL.", "sql_seconds", "{:.6f}"),
+                (
+                    "response_serialization_seconds_total",
+                    "Time spent encoding JSON responses.",
+                    "serialize_seconds",
+                    "{:.6f}",
+                ),
+                (
+                    "http_response_bytes_total",
+                    "Response body bytes sent.",
+                    "response_bytes",
+                    "{}",
+                ),
+                (
+                    "n_plus_one_requests_total",
+                    "Requests over the N+1 query threshold.",
+                    "n_plus_one",
+                    "{}",
+                ),
+            ):
+                family(
+                    name,
+                    "counter",
+                    help_text,
+                    [
+                        f"{name}{{{labels(e, m)}}} {fmt.format(getattr(s, attr))}"
+                        for (e, m), s in items
+                    ],
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+def _current_metrics():
+    if has_request_context():
+        return g.get("_request_metrics")
+    return None
+
+
+@contextmanager
+def timed(name, description=None):
+    """Time a block of a request; it is reported as its own Server-Timing
+    entry (e.g. ``with timed("auth"):`` around password verification)."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current_metrics()
+        if metrics is not None:
+            metrics.spans.append((name, perf_counter() - start, description))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _current_metrics() is not None:
+        conn.info.setdefault("_query_started", []).append(perf_counter())
+
+
+def _finish_query(conn):
+    metrics = _current_metrics()
+    started = conn.info.get("_query_started")
+    if metrics is None or not started:
+        return
+    metrics.query_count += 1
+    metrics.sql_seconds += perf_counter() - started.pop()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    _finish_query(conn)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute: close its
+    # timing here so the connection's stack does not grow with each error
+    conn = exception_context.connection
+    if conn is not None and exception_context.execution_context is not None:
+        _finish_query(conn)
+
+
+_listeners_installed = False
+
+
+def _install_engine_listeners():
+    # Listening on the Engine class covers every app and bind in the process
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _listeners_installed = True
+
+
+def _timed_json_response(response):
+    def json_response(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return response(*args, **kwargs)
+        finally:
+            metrics = _current_metrics()
+            if metrics is not None:
+                metrics.serialize_seconds += perf_counter() - start
+
+    return json_response
+
+
+def _server_timing(metrics, total):
+    entries = [
+        f'db;dur={metrics.sql_seconds * 1000:.2f};desc="{metrics.query_count} queries"',
+        f"ser;dur={metrics.serialize_seconds * 1000:.2f}",
+    ]
+    for name, seconds, description in metrics.spans:
+        entry = f"{name};dur={seconds * 1000:.2f}"
+        if description:
+            entry += f';desc="{description}"'
+        entries.append(entry)
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def init_instrumentation(app):
+    """Register the request hooks and the /metrics endpoint on ``app``."""
+    if not app.config.get("INSTRUMENTATION_ENABLED", True):
+        return
+
+    _install_engine_listeners()
+    app.json.response = _timed_json_response(app.json.response)
+    metrics_path = app.config.get("METRICS_PATH", "/metrics")
+
+    @app.before_request
+    def start_request_metrics():
+        g._request_metrics = RequestMetrics()
+
+    @app.after_request
+    def record_request_metrics(response):
+        metrics = g.pop("_request_metrics", None)
+        if metrics is None or request.path == metrics_path:
+            return response
+
+        total = perf_counter() - metrics.started
+        threshold = app.config.get("N_PLUS_ONE_QUERY_THRESHOLD", 20)
+        n_plus_one = metrics.query_count > threshold
+        endpoint = request.endpoint or "unmatched"
+        if n_plus_one:
+            current_app.logger.warning(
+                "Possible N+1: %s %s ran %d queries (threshold %d)",
+                request.method,
+                request.path,
+                metrics.query_count,
+                threshold,
+            )
+
+        response.headers["Server-Timing"] = _server_timing(metrics, total)
+        registry.record(
+            endpoint,
+            request.method,
+            response.status_code,
+            total,
+            metrics,
+            response.content_length or 0,
+            n_plus_one,
+        )
+        return response
+
+    @app.route(metrics_path, methods=["GET"])
+    def metrics():
+        # Route names, latencies and query counts are not public: without a
+        # configured token the endpoint does not exist
+        token = app.config.get("METRICS_TOKEN")
+        if not token:
+            return Response("Not Found\n", status=404, mimetype="text/plain")
+        # Constant-time; bytes, as str arguments must be ASCII
+        if not hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(),
+            f"Bearer {token}".encode(),
+        ):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
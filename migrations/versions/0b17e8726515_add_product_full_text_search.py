@@ -0,0 +1,72 @@
+"""add product full-text search document and index
+
+Revision ID: 0b17e8726515
+Revises: da19eb1c0e80
+Create Date: 2026-10-18 09:12:44.318201
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b17e8726515'
+down_revision = 'da19eb1c0e80'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(search_text)",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, search_text) VALUES (new.id, new.search_text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF search_text "
+    "ON products BEGIN "
+    "DELETE FROM products_fts WHERE rowid = old.id; "
+    "INSERT INTO products_fts(rowid, search_text) VALUES (new.id, new.search_text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "DELETE FROM products_fts WHERE rowid = old.id; "
+    "END",
+]
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_text', sa.Text(), nullable=True))
+
+    # Backfill: same "name description city" layout as build_search_text()
+    op.execute(
+        "UPDATE products SET search_text = name || ' ' || description || ' ' || "
+        "COALESCE((SELECT city FROM users WHERE users.id = products.vendor_id), '')"
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.create_index(
+            'ix_products_search_text_tsv',
+            'products',
+            [sa.text("to_tsvector('simple', coalesce(search_text, ''))")],
+            postgresql_using='gin',
+        )
+    elif bind.dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute(
+            "INSERT INTO products_fts(rowid, search_text) "
+            "SELECT id, search_text FROM products"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_products_search_text_tsv', table_name='products')
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('products_fts_ai', 'products_fts_au', 'products_fts_ad'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('search_text')
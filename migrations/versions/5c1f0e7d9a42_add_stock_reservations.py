@@ -0,0 +1,42 @@
+"""add stock reservations
+
+Revision ID: 5c1f0e7d9a42
+Revises: 0b17e8726515
+Create Date: 2026-10-18 11:02:37.540129
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1f0e7d9a42'
+down_revision = '0b17e8726515'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_reservations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stock_reservations_order_id'), ['order_id'], unique=False)
+        batch_op.create_index('ix_stock_reservations_status_expires_at', ['status', 'expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stock_reservations', schema=None) as batch_op:
+        batch_op.drop_index('ix_stock_reservations_status_expires_at')
+        batch_op.drop_index(batch_op.f('ix_stock_reservations_order_id'))
+
+    op.drop_table('stock_reservations')
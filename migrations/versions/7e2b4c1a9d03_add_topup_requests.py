@@ -0,0 +1,42 @@
+"""add topup requests
+
+Revision ID: 7e2b4c1a9d03
+Revises: 5c1f0e7d9a42
+Create Date: 2026-10-18 13:26:05.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2b4c1a9d03'
+down_revision = '5c1f0e7d9a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('topup_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('processed_by', sa.Integer(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['processed_by'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('topup_requests', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_topup_requests_user_id'), ['user_id'], unique=False)
+        batch_op.create_index('ix_topup_requests_status_id', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('topup_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_topup_requests_status_id')
+        batch_op.drop_index(batch_op.f('ix_topup_requests_user_id'))
+
+    op.drop_table('topup_requests')
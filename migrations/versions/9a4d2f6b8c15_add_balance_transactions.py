@@ -0,0 +1,49 @@
+"""add balance transactions ledger
+
+Revision ID: 9a4d2f6b8c15
+Revises: 7e2b4c1a9d03
+Create Date: 2026-10-18 14:48:51.902317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4d2f6b8c15'
+down_revision = '7e2b4c1a9d03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('balance_transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('balance_after', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('reference', sa.String(length=100), nullable=True),
+    sa.Column('idempotency_key', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'idempotency_key', name='uq_balance_transactions_user_key')
+    )
+    with op.batch_alter_table('balance_transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_balance_transactions_user_id_id', ['user_id', 'id'], unique=False)
+
+    # Open the ledger with each existing balance so history adds up
+    op.execute(
+        "INSERT INTO balance_transactions "
+        "(user_id, amount, balance_after, kind, created_at) "
+        "SELECT id, balance, balance, 'opening_balance', CURRENT_TIMESTAMP "
+        "FROM users WHERE balance IS NOT NULL AND balance <> 0"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('balance_transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_balance_transactions_user_id_id')
+
+    op.drop_table('balance_transactions')
@@ -0,0 +1,61 @@
+"""add product rating aggregates
+
+Revision ID: a7c3e5f19d28
+Revises: f3a6d2e8b915
+Create Date: 2026-10-18 20:12:37.540219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e5f19d28'
+down_revision = 'f3a6d2e8b915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_avg', sa.Numeric(precision=3, scale=2), server_default='0', nullable=False))
+
+    # Backfill from the existing reviews; from here on feedback writes keep
+    # the aggregates current
+    op.execute(
+        """
+        UPDATE products SET
+            rating_count = (
+                SELECT COUNT(*) FROM feedback WHERE feedback.product_id = products.id
+            ),
+            rating_sum = (
+                SELECT COALESCE(SUM(rating), 0) FROM feedback
+                WHERE feedback.product_id = products.id
+            )
+        """
+    )
+    op.execute(
+        """
+        UPDATE products SET rating_avg = ROUND(rating_sum * 1.0 / rating_count, 2)
+        WHERE rating_count > 0
+        """
+    )
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_products_approved_rating_avg',
+            ['rating_avg', 'id'],
+            unique=False,
+            sqlite_where=sa.text('is_approved = 1'),
+            postgresql_where=sa.text('is_approved'),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_approved_rating_avg')
+        batch_op.drop_column('rating_avg')
+        batch_op.drop_column('rating_sum')
+        batch_op.drop_column('rating_count')
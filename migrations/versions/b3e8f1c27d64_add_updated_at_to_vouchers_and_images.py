@@ -0,0 +1,35 @@
+"""add updated_at to vouchers and images
+
+Revision ID: b3e8f1c27d64
+Revises: 9a4d2f6b8c15
+Create Date: 2026-10-18 16:05:12.664290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8f1c27d64'
+down_revision = '9a4d2f6b8c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vouchers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE vouchers SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE images SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade():
+    with op.batch_alter_table('images', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('vouchers', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,34 @@
+"""add feedback keyset pagination indexes
+
+Revision ID: b9e4d1f6a352
+Revises: a7c3e5f19d28
+Create Date: 2026-10-18 21:03:55.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e4d1f6a352'
+down_revision = 'a7c3e5f19d28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_product_id_created_at')
+        batch_op.drop_index('ix_feedback_user_id')
+        batch_op.create_index('ix_feedback_product_id_created_at_id', ['product_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_feedback_product_id_rating_created_at_id', ['product_id', 'rating', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_feedback_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_user_id_created_at_id')
+        batch_op.drop_index('ix_feedback_product_id_rating_created_at_id')
+        batch_op.drop_index('ix_feedback_product_id_created_at_id')
+        batch_op.create_index('ix_feedback_user_id', ['user_id'], unique=False)
+        batch_op.create_index('ix_feedback_product_id_created_at', ['product_id', 'created_at'], unique=False)
@@ -0,0 +1,128 @@
+"""add listing indexes and unique constraints
+
+Revision ID: c4d7e9a1f2b6
+Revises: b3e8f1c27d64
+Create Date: 2026-10-18 16:41:09.215834
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e9a1f2b6'
+down_revision = 'b3e8f1c27d64'
+branch_labels = None
+depends_on = None
+
+
+APPROVED_SORT_COLUMNS = ('created_at', 'price', 'name')
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        for sort_column in APPROVED_SORT_COLUMNS:
+            batch_op.create_index(
+                f'ix_products_approved_{sort_column}',
+                [sort_column, 'id'],
+                unique=False,
+                sqlite_where=sa.text('is_approved = 1'),
+                postgresql_where=sa.text('is_approved'),
+            )
+        batch_op.create_index(
+            'ix_products_pending_created_at',
+            ['created_at', 'id'],
+            unique=False,
+            sqlite_where=sa.text('is_approved = 0 AND rejected = 0'),
+            postgresql_where=sa.text('NOT is_approved AND NOT rejected'),
+        )
+        batch_op.create_index('ix_products_vendor_id_is_approved', ['vendor_id', 'is_approved'], unique=False)
+
+    with op.batch_alter_table('product_categories', schema=None) as batch_op:
+        batch_op.create_index('ix_product_categories_category_id', ['category_id', 'product_id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_user_id_status', ['user_id', 'status'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_items_product_id'), ['product_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_items_vendor_id'), ['vendor_id'], unique=False)
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.create_index('ix_feedback_product_id_created_at', ['product_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_feedback_user_id', ['user_id'], unique=False)
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_id_is_read', ['user_id', 'is_read'], unique=False)
+
+    # Collapse duplicates before the unique constraints: a cart keeps its
+    # oldest row for a product with the quantities summed, a wishlist keeps
+    # its oldest row.
+    op.execute(
+        """
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(d.quantity) FROM cart_items AS d
+            WHERE d.cart_id = cart_items.cart_id
+              AND d.product_id = cart_items.product_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM cart_items
+            GROUP BY cart_id, product_id HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_items WHERE id NOT IN (
+            SELECT MIN(id) FROM cart_items GROUP BY cart_id, product_id
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM wishlist_items WHERE id NOT IN (
+            SELECT MIN(id) FROM wishlist_items GROUP BY user_id, product_id
+        )
+        """
+    )
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_cart_items_cart_product', ['cart_id', 'product_id'])
+
+    with op.batch_alter_table('wishlist_items', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_wishlist_items_user_product', ['user_id', 'product_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('wishlist_items', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_wishlist_items_user_product', type_='unique')
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_cart_items_cart_product', type_='unique')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_id_is_read')
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_user_id')
+        batch_op.drop_index('ix_feedback_product_id_created_at')
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_vendor_id'))
+        batch_op.drop_index(batch_op.f('ix_order_items_product_id'))
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_user_id_status')
+        batch_op.drop_index('ix_orders_user_id_created_at')
+
+    with op.batch_alter_table('product_categories', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_categories_category_id')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_vendor_id_is_approved')
+        batch_op.drop_index('ix_products_pending_created_at')
+        for sort_column in reversed(APPROVED_SORT_COLUMNS):
+            batch_op.drop_index(f'ix_products_approved_{sort_column}')
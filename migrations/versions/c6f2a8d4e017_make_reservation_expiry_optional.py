@@ -0,0 +1,35 @@
+"""make stock reservation expiry optional
+
+Revision ID: c6f2a8d4e017
+Revises: b9e4d1f6a352
+Create Date: 2026-10-19 10:22:41.903517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f2a8d4e017'
+down_revision = 'b9e4d1f6a352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('stock_reservations', schema=None) as batch_op:
+        batch_op.alter_column('expires_at',
+               existing_type=sa.DateTime(),
+               nullable=True)
+
+
+def downgrade():
+    # Reservations taken without expiry get one far in the future
+    op.execute(
+        "UPDATE stock_reservations SET expires_at = '9999-12-31 00:00:00' "
+        "WHERE expires_at IS NULL"
+    )
+    with op.batch_alter_table('stock_reservations', schema=None) as batch_op:
+        batch_op.alter_column('expires_at',
+               existing_type=sa.DateTime(),
+               nullable=False)
@@ -0,0 +1,32 @@
+"""add notification inbox and wishlist product indexes
+
+Revision ID: f3a6d2e8b915
+Revises: e5b19c7a3d40
+Create Date: 2026-10-18 18:47:12.306588
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a6d2e8b915'
+down_revision = 'e5b19c7a3d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_id_id', ['user_id', 'id'], unique=False)
+
+    with op.batch_alter_table('wishlist_items', schema=None) as batch_op:
+        batch_op.create_index('ix_wishlist_items_product_id', ['product_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('wishlist_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_wishlist_items_product_id')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_id_id')
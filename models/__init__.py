@@ -15,6 +15,11 @@ from .feedback import Feedbacks
 from .wishlist_item import WishlistItems
 from .voucher import Vouchers
 from .notification import Notification
+from .stock_reservation import StockReservations
+from .topup_request import TopupRequests
+from .balance_transaction import BalanceTransactions
+from .email_outbox import EmailOutbox
+from .job import Jobs
 
 
 Product = Products
@@ -35,4 +40,9 @@ __all__ = [
     "WishlistItems",
     "Vouchers",
     "Notification",
+    "StockReservations",
+    "TopupRequests",
+    "BalanceTransactions",
+    "EmailOutbox",
+    "Jobs",
 ]
@@ -0,0 +1,38 @@
+from instance.database import db
+from datetime import datetime
+from decimal import Decimal
+from shared import crono
+
+
+class BalanceTransactions(db.Model):
+    """Append-only ledger of balance changes.
+
+    ``balance_after`` is the user's balance once the entry was applied, so
+    the latest row of a user mirrors ``Users.balance`` and history pages
+    need no running sum.
+    """
+
+    __tablename__ = "balance_transactions"
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    user_id: int = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    amount: Decimal = db.Column(db.Numeric(12, 2), nullable=False)  # signed
+    balance_after: Decimal = db.Column(db.Numeric(12, 2), nullable=False)
+    kind: str = db.Column(db.String(30), nullable=False)  # topup, admin_adjustment
+    reference: str = db.Column(db.String(100), nullable=True)
+    idempotency_key: str = db.Column(db.String(100), nullable=True)
+    created_at: datetime = db.Column(db.DateTime, default=crono.now)
+
+    __table_args__ = (
+        # History newest-first and "latest balance" lookups per user
+        db.Index("ix_balance_transactions_user_id_id", "user_id", "id"),
+        # A key identifies one operation of a user; replays hit this
+        db.UniqueConstraint(
+            "user_id", "idempotency_key", name="uq_balance_transactions_user_key"
+        ),
+    )
+
+    def __repr__(self):
+        return f"<BalanceTransaction {self.id} User {self.user_id} {self.amount}>"
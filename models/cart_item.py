@@ -7,6 +7,10 @@ class CartItems(db.Model):
     """Items added to a user's cart."""
 
     __tablename__ = "cart_items"
+    # One row per product in a cart; also serves the cart_id lookups
+    __table_args__ = (
+        db.UniqueConstraint("cart_id", "product_id", name="uq_cart_items_cart_product"),
+    )
 
     id: int = db.Column(db.Integer, primary_key=True)
     cart_id: int = db.Column(db.Integer, db.ForeignKey("cart.id"), nullable=False)
@@ -0,0 +1,32 @@
+from instance.database import db
+from datetime import datetime
+from shared import crono
+
+
+class EmailOutbox(db.Model):
+    """An email waiting to be delivered by the outbox worker
+    (``flask deliver-emails``); requests only ever insert rows here."""
+
+    __tablename__ = "email_outbox"
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    recipient: str = db.Column(db.String(255), nullable=False)
+    subject: str = db.Column(db.String(255), nullable=False)
+    body: str = db.Column(db.Text, nullable=False)
+    # pending -> sending (claimed by a worker) -> sent | failed; a failed
+    # attempt puts the row back to pending with a later next_attempt_at
+    status: str = db.Column(db.String(20), nullable=False, default="pending")
+    attempts: int = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at: datetime = db.Column(db.DateTime, nullable=False, default=crono.now)
+    claim_token: str = db.Column(db.String(32), nullable=True)
+    last_error: str = db.Column(db.Text, nullable=True)
+    created_at: datetime = db.Column(db.DateTime, default=crono.now)
+    sent_at: datetime = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Worker poll: due rows of a status, oldest due first
+        db.Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} {self.recipient} {self.status}>"
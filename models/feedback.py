@@ -7,6 +7,21 @@ class Feedbacks(db.Model):
     """Review and rating given by a user to a product."""
 
     __tablename__ = "feedback"
+    # Review pages are read newest first as (created_at, id) keysets per
+    # product (optionally per star rating) and per user
+    __table_args__ = (
+        db.Index(
+            "ix_feedback_product_id_created_at_id", "product_id", "created_at", "id"
+        ),
+        db.Index(
+            "ix_feedback_product_id_rating_created_at_id",
+            "product_id",
+            "rating",
+            "created_at",
+            "id",
+        ),
+        db.Index("ix_feedback_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: int = db.Column(db.Integer, primary_key=True)
     user_id: int = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,34 @@
+from instance.database import db
+from datetime import datetime
+from shared import crono
+
+
+class Jobs(db.Model):
+    """A unit of deferred work for the job worker (``python worker.py``);
+    see shared/jobs.py for how tasks enqueue and run."""
+
+    __tablename__ = "jobs"
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    task: str = db.Column(db.String(120), nullable=False)
+    payload: str = db.Column(db.Text, nullable=False, default="{}")  # JSON kwargs
+    # queued -> running (claimed) -> succeeded | failed; a failed attempt
+    # with retries left goes back to queued with a later run_at
+    status: str = db.Column(db.String(20), nullable=False, default="queued")
+    attempts: int = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts: int = db.Column(db.Integer, nullable=False, default=3)
+    run_at: datetime = db.Column(db.DateTime, nullable=False, default=crono.now)
+    claim_token: str = db.Column(db.String(32), nullable=True)
+    # Periodic runs are enqueued once per slot however many workers run
+    dedupe_key: str = db.Column(db.String(160), nullable=True, unique=True)
+    last_error: str = db.Column(db.Text, nullable=True)
+    created_at: datetime = db.Column(db.DateTime, default=crono.now)
+    finished_at: datetime = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Worker poll: due jobs of a status, oldest first
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.task} {self.status}>"
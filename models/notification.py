@@ -4,6 +4,12 @@ from shared import crono
 
 class Notification(db.Model):
     __tablename__ = "notifications"
+    # Unread count and the unread-only inbox: a user's notifications by read
+    # state; the full inbox pages newest first by id
+    __table_args__ = (
+        db.Index("ix_notifications_user_id_is_read", "user_id", "is_read"),
+        db.Index("ix_notifications_user_id_id", "user_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False)
@@ -7,6 +7,11 @@ class Orders(db.Model):
     """Order placed by a user."""
 
     __tablename__ = "orders"
+    __table_args__ = (
+        # Order history: a user's orders newest first, optionally by status
+        db.Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        db.Index("ix_orders_user_id_status", "user_id", "status"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
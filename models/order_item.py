@@ -8,12 +8,19 @@ class OrderItems(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(
-        db.Integer, db.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False
+        db.Integer,
+        db.ForeignKey("orders.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    product_id = db.Column(
+        db.Integer, db.ForeignKey("products.id"), nullable=False, index=True
     )
-    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Numeric(10, 2), nullable=False)
-    vendor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    vendor_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
 
     order = db.relationship("Orders", back_populates="order_items")
     product = db.relationship("Products", back_populates="order_items", lazy=True)
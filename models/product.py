@@ -1,9 +1,29 @@
 from instance.database import db
 from datetime import datetime
+from sqlalchemy import (
+    DDL,
+    event,
+    func,
+    inspect,
+    literal_column,
+    select,
+    table,
+    column,
+    text,
+)
 from shared import crono
 from models.category import Categories
 
 
+def search_tsvector(search_text_column):
+    """tsvector of the product search document. The GIN index and the search
+    query in product_repo must use this exact expression on Postgres."""
+    return func.to_tsvector(
+        literal_column("'simple'"),
+        func.coalesce(search_text_column, literal_column("''")),
+    )
+
+
 class Products(db.Model):
     """Product model representing items listed by vendors."""
 
@@ -27,6 +47,47 @@ class Products(db.Model):
     is_approved: bool = db.Column(db.Boolean, default=False)
     rejected: bool = db.Column(db.Boolean, default=False)
 
+    # Denormalized "name description vendor-city" document backing the
+    # full-text search index; maintained by the mapper events below.
+    search_text: str = db.Column(db.Text, nullable=True)
+
+    # Denormalized feedback aggregates, adjusted in the same transaction as
+    # each review write (product_repo.adjust_rating); rating_avg is stored
+    # so "top rated" listings can walk an index like the other sorts.
+    rating_count: int = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum: int = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_avg: float = db.Column(
+        db.Numeric(3, 2), nullable=False, default=0, server_default="0"
+    )
+
+    __table_args__ = (
+        db.Index(
+            "ix_products_search_text_tsv",
+            search_tsvector(search_text),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        # One partial index per listing sort: the public catalog filters on
+        # is_approved and pages through (sort column, id)
+        *(
+            db.Index(
+                f"ix_products_approved_{sort_column}",
+                sort_column,
+                "id",
+                sqlite_where=text("is_approved = 1"),
+                postgresql_where=text("is_approved"),
+            )
+            for sort_column in ("created_at", "price", "name", "rating_avg")
+        ),
+        # Admin moderation queue: pending (neither approved nor rejected)
+        db.Index(
+            "ix_products_pending_created_at",
+            "created_at",
+            "id",
+            sqlite_where=text("is_approved = 0 AND rejected = 0"),
+            postgresql_where=text("NOT is_approved AND NOT rejected"),
+        ),
+        db.Index("ix_products_vendor_id_is_approved", "vendor_id", "is_approved"),
+    )
 
     vendor_id: int = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     vendor = db.relationship(
@@ -50,15 +111,18 @@ class Products(db.Model):
         overlaps="categories_linked,products_linked,category",
     )
 
+    # selectin: categories arrive in one batched IN query per page instead
+    # of multiplying product rows through a JOIN. The reverse side stays lazy
+    # so loading a category never drags in all of its products.
     categories_linked = db.relationship(
         "Categories",
         secondary="product_categories",
         backref=db.backref(
             "products_linked",
-            lazy="joined",
+            lazy="select",
             overlaps="categories,categories_linked,product",
         ),
-        lazy="joined",
+        lazy="selectin",
         overlaps="categories,product,products",
     )
 
@@ -74,3 +138,62 @@ class Products(db.Model):
 
 # This alias exists ONLY to satisfy `db.relationship("Product")`
 Product = Products
+
+
+def build_search_text(name, description, city) -> str:
+    """Search document of a product; keep in sync with the SQL backfill in
+    the search migration and ``Users`` city propagation."""
+    return " ".join([name or "", description or "", city or ""])
+
+
+# SQLite (tests/local): FTS5 index kept in sync by triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(search_text)",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, search_text) VALUES (new.id, new.search_text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF search_text "
+    "ON products BEGIN "
+    "DELETE FROM products_fts WHERE rowid = old.id; "
+    "INSERT INTO products_fts(rowid, search_text) VALUES (new.id, new.search_text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "DELETE FROM products_fts WHERE rowid = old.id; "
+    "END",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(
+        Products.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Products.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"),
+)
+
+
+_users = table("users", column("id"), column("city"))
+
+
+def _vendor_city(connection, vendor_id):
+    return connection.scalar(select(_users.c.city).where(_users.c.id == vendor_id))
+
+
+@event.listens_for(Products, "before_insert")
+def _set_search_text_on_insert(mapper, connection, target):
+    target.search_text = build_search_text(
+        target.name, target.description, _vendor_city(connection, target.vendor_id)
+    )
+
+
+@event.listens_for(Products, "before_update")
+def _set_search_text_on_update(mapper, connection, target):
+    state = inspect(target)
+    if any(
+        state.attrs[attr].history.has_changes()
+        for attr in ("name", "description", "vendor_id")
+    ):
+        target.search_text = build_search_text(
+            target.name, target.description, _vendor_city(connection, target.vendor_id)
+        )
@@ -5,6 +5,10 @@ class ProductCategories(db.Model):
     """Association table for many-to-many relationship between products and categories."""
 
     __tablename__ = "product_categories"
+    # The primary key leads with product_id; category filters need their own
+    __table_args__ = (
+        db.Index("ix_product_categories_category_id", "category_id", "product_id"),
+    )
 
     product_id: int = db.Column(
         db.Integer, db.ForeignKey("products.id"), primary_key=True
@@ -1,4 +1,5 @@
 from instance.database import db
+from shared import crono
 
 
 class ProductImages(db.Model):
@@ -9,3 +10,4 @@ class ProductImages(db.Model):
     image2_url = db.Column(db.Text, nullable=True)  # ✅ must exist
     image3_url = db.Column(db.Text, nullable=True)  # ✅ must exist
     product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
+    updated_at = db.Column(db.DateTime, default=crono.now, onupdate=crono.now)
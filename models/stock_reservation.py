@@ -0,0 +1,39 @@
+from instance.database import db
+from datetime import datetime
+from shared import crono
+
+
+class StockReservations(db.Model):
+    """Units of a product held for a pending order.
+
+    Stock is decremented when the reservation is taken (order creation);
+    the reservation is then either committed (order completed) or released
+    back to stock (order cancelled, deleted, or left pending past expiry
+    when STOCK_RESERVATION_TTL_MINUTES is set; otherwise expires_at is NULL
+    and the reservation is held until the order moves on).
+    """
+
+    __tablename__ = "stock_reservations"
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    order_id: int = db.Column(
+        db.Integer,
+        db.ForeignKey("orders.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    product_id: int = db.Column(
+        db.Integer, db.ForeignKey("products.id"), nullable=False
+    )
+    quantity: int = db.Column(db.Integer, nullable=False)
+    status: str = db.Column(db.String(20), nullable=False, default="held")
+    expires_at: datetime = db.Column(db.DateTime, nullable=True)
+    created_at: datetime = db.Column(db.DateTime, default=crono.now)
+
+    __table_args__ = (
+        # Expiry sweep: held reservations ordered by expiry
+        db.Index("ix_stock_reservations_status_expires_at", "status", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<StockReservation Order {self.order_id} Product {self.product_id} x{self.quantity} {self.status}>"
@@ -0,0 +1,31 @@
+from instance.database import db
+from datetime import datetime
+from decimal import Decimal
+from shared import crono
+
+
+class TopupRequests(db.Model):
+    """A customer/vendor request to add funds to their balance, pending
+    admin approval."""
+
+    __tablename__ = "topup_requests"
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    user_id: int = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    amount: Decimal = db.Column(db.Numeric(12, 2), nullable=False)
+    status: str = db.Column(db.String(20), nullable=False, default="pending")
+    processed_by: int = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    processed_at: datetime = db.Column(db.DateTime, nullable=True)
+    created_at: datetime = db.Column(db.DateTime, default=crono.now)
+
+    __table_args__ = (
+        # Admin queue: newest requests of a given status first
+        db.Index("ix_topup_requests_status_id", "status", "id"),
+    )
+
+    def __repr__(self):
+        return f"<TopupRequest {self.id} User {self.user_id} {self.amount} {self.status}>"
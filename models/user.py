@@ -1,5 +1,6 @@
 from instance.database import db
 from datetime import datetime
+from sqlalchemy import event, inspect, literal, update
 from shared import crono
 from models.product import Products as Product
 import enum
@@ -55,3 +56,23 @@ class Users(db.Model):
 
     def __repr__(self):
         return f"<User {self.username}>"
+
+
+@event.listens_for(Users, "after_update")
+def _propagate_city_to_product_search(mapper, connection, target):
+    """Vendor city is part of every product's search document (see
+    ``models.product.build_search_text``); refresh them in one UPDATE."""
+    if not inspect(target).attrs.city.history.has_changes():
+        return
+    products = Product.__table__
+    connection.execute(
+        update(products)
+        .where(products.c.vendor_id == target.id)
+        .values(
+            search_text=products.c.name
+            + " "
+            + products.c.description
+            + " "
+            + literal(target.city or "")
+        )
+    )
@@ -11,6 +11,7 @@ class Vouchers(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     expires_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=crono.now)
+    updated_at = db.Column(db.DateTime, default=crono.now, onupdate=crono.now)
 
     def __repr__(self):
         return f"<Voucher {self.code}>"
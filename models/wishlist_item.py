@@ -8,6 +8,14 @@ class WishlistItems(db.Model):
     """Wishlist entry saved by a user."""
 
     __tablename__ = "wishlist_items"
+    # A product is wishlisted once per user; also serves the user_id lookups.
+    # The product_id index finds a product's wishlisters for notifications
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id", "product_id", name="uq_wishlist_items_user_product"
+        ),
+        db.Index("ix_wishlist_items_product_id", "product_id", "user_id"),
+    )
 
     id: int = db.Column(db.Integer, primary_key=True)
     user_id: int = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
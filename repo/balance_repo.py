@@ -0,0 +1,40 @@
+from instance.database import db
+from models.balance_transaction import BalanceTransactions
+from models.user import Users
+from sqlalchemy import select, update, func
+
+
+def increment_balance_returning(user_id, amount):
+    """Add ``amount`` to the user's balance in SQL and return the new
+    balance, or None if the user does not exist."""
+    return db.session.execute(
+        update(Users)
+        .where(Users.id == user_id)
+        .values(balance=func.coalesce(Users.balance, 0) + amount)
+        .returning(Users.balance)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+
+
+def create_transaction(data):
+    transaction = BalanceTransactions(**data)
+    db.session.add(transaction)
+    db.session.flush()
+    return transaction
+
+
+def get_transaction_by_key(user_id, idempotency_key):
+    return db.session.execute(
+        select(BalanceTransactions).where(
+            BalanceTransactions.user_id == user_id,
+            BalanceTransactions.idempotency_key == idempotency_key,
+        )
+    ).scalar_one_or_none()
+
+
+def get_transactions_by_user(user_id, limit=20, before_id=None):
+    stmt = select(BalanceTransactions).where(BalanceTransactions.user_id == user_id)
+    if before_id:
+        stmt = stmt.where(BalanceTransactions.id < before_id)
+    stmt = stmt.order_by(BalanceTransactions.id.desc()).limit(limit)
+    return db.session.execute(stmt).scalars().all()
@@ -1,5 +1,8 @@
 from instance.database import db
 from models.category import Categories
+from models.product import Products
+from models.product_category import ProductCategories
+from sqlalchemy import select, func, and_
 
 
 def create_category(data):
@@ -12,10 +15,28 @@ def get_all_categories():
     return Categories.query.all()
 
 
+def get_categories_probe():
+    """(row count, latest updated_at) of the categories table."""
+    return db.session.execute(
+        select(func.count(Categories.id), func.max(Categories.updated_at))
+    ).one()
+
+
 def get_category_by_id(category_id):
     return db.session.get(Categories, category_id)
 
 
+def get_parent_ids():
+    """Map of category id -> parent id for every nested category."""
+    return dict(
+        db.session.execute(
+            select(Categories.id, Categories.parent_id).where(
+                Categories.parent_id.is_not(None)
+            )
+        ).all()
+    )
+
+
 def update_category(category, data):
     for key, value in data.items():
         setattr(category, key, value)
@@ -25,3 +46,28 @@ def update_category(category, data):
 def delete_category(category):
     db.session.delete(category)
     return category
+
+
+def get_categories_with_product_counts():
+    """Every category with its number of approved products, in one query."""
+    stmt = (
+        select(
+            Categories.id,
+            Categories.name,
+            Categories.slug,
+            Categories.image_url,
+            Categories.parent_id,
+            func.count(Products.id).label("product_count"),
+        )
+        .outerjoin(ProductCategories, ProductCategories.category_id == Categories.id)
+        .outerjoin(
+            Products,
+            and_(
+                Products.id == ProductCategories.product_id,
+                Products.is_approved == True,
+            ),
+        )
+        .group_by(Categories.id)
+        .order_by(Categories.name, Categories.id)
+    )
+    return db.session.execute(stmt).all()
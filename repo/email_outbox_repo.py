@@ -0,0 +1,85 @@
+from instance.database import db
+from models.email_outbox import EmailOutbox
+from sqlalchemy import select, update, func
+
+
+def enqueue_email(recipient, subject, body):
+    email = EmailOutbox(recipient=recipient, subject=subject, body=body, status="pending")
+    db.session.add(email)
+    return email
+
+
+def claim_due_emails(now, limit, claim_token, claim_until):
+    """Claim up to ``limit`` due emails for one worker and return them.
+
+    A row is due when it is pending and its next attempt time has come, or
+    when a worker claimed it but did not finish before its claim expired
+    (``next_attempt_at`` doubles as the claim deadline while sending). The
+    claim is a single conditional UPDATE, so concurrent workers never get
+    the same row.
+    """
+    due = EmailOutbox.status.in_(("pending", "sending"))
+    ids = (
+        select(EmailOutbox.id)
+        .where(due, EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(ids), due, EmailOutbox.next_attempt_at <= now)
+        .values(status="sending", claim_token=claim_token, next_attempt_at=claim_until)
+        .execution_options(synchronize_session=False)
+    )
+    return (
+        db.session.execute(
+            select(EmailOutbox)
+            .where(EmailOutbox.claim_token == claim_token, EmailOutbox.status == "sending")
+            .order_by(EmailOutbox.id)
+            .execution_options(populate_existing=True)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def mark_sent(email_ids, sent_at):
+    if not email_ids:
+        return
+    db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(email_ids))
+        .values(
+            status="sent",
+            sent_at=sent_at,
+            attempts=EmailOutbox.attempts + 1,
+            claim_token=None,
+            last_error=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_attempt_failed(email_id, error, retry_at=None):
+    """Record a failed attempt: back to pending until ``retry_at``, or
+    ``failed`` for good when ``retry_at`` is None."""
+    db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id == email_id)
+        .values(
+            status="pending" if retry_at else "failed",
+            next_attempt_at=retry_at or EmailOutbox.next_attempt_at,
+            attempts=EmailOutbox.attempts + 1,
+            claim_token=None,
+            last_error=error[:1000],
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def count_emails_by_status():
+    rows = db.session.execute(
+        select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)
+    ).all()
+    return dict(rows)
@@ -1,5 +1,6 @@
 from instance.database import db
 from models.feedback import Feedbacks
+from sqlalchemy import and_, func, or_, select
 
 
 def create_feedback(data):
@@ -9,16 +10,46 @@ def create_feedback(data):
     return feedback
 
 
-def get_feedback_by_product(product_id):
-    return Feedbacks.query.filter_by(product_id=product_id).all()
-
-
-def get_feedback_by_user(user_id):
-    return Feedbacks.query.filter_by(user_id=user_id).all()
+def get_feedback_page(product_id=None, user_id=None, rating=None, before=None, limit=20):
+    """Newest first by (created_at, id); ``before`` is the (created_at, id)
+    of the last row already seen."""
+    query = select(Feedbacks)
+    if product_id is not None:
+        query = query.where(Feedbacks.product_id == product_id)
+    if user_id is not None:
+        query = query.where(Feedbacks.user_id == user_id)
+    if rating is not None:
+        query = query.where(Feedbacks.rating == rating)
+    if before is not None:
+        created_at, last_id = before
+        query = query.where(
+            or_(
+                Feedbacks.created_at < created_at,
+                and_(Feedbacks.created_at == created_at, Feedbacks.id < last_id),
+            )
+        )
+    query = query.order_by(Feedbacks.created_at.desc(), Feedbacks.id.desc())
+    return db.session.execute(query.limit(limit)).scalars().all()
+
+
+def get_rating_histogram(product_id):
+    """``{rating: count}`` of a product's reviews in one GROUP BY."""
+    rows = db.session.execute(
+        select(Feedbacks.rating, func.count())
+        .where(Feedbacks.product_id == product_id)
+        .group_by(Feedbacks.rating)
+    )
+    return dict(rows.all())
 
 
 def get_all_feedback(page=1, per_page=10):
-    return Feedbacks.query.paginate(page=page, per_page=per_page, error_out=False).items
+    # Plain OFFSET/LIMIT: paginate() would also COUNT the whole table
+    return (
+        Feedbacks.query.order_by(Feedbacks.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
 
 
 def delete_feedback(feedback_id, user_id):
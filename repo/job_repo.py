@@ -0,0 +1,109 @@
+from instance.database import db
+from models.job import Jobs
+from sqlalchemy import and_, case, select, update, func
+from sqlalchemy.exc import IntegrityError
+
+
+def create_job(task, payload, run_at, max_attempts, dedupe_key=None):
+    job = Jobs(
+        task=task,
+        payload=payload,
+        run_at=run_at,
+        max_attempts=max_attempts,
+        dedupe_key=dedupe_key,
+        status="queued",
+    )
+    db.session.add(job)
+    return job
+
+
+def create_job_once(task, payload, run_at, max_attempts, dedupe_key):
+    """Insert a job unless one with ``dedupe_key`` exists; True if inserted."""
+    try:
+        with db.session.begin_nested():
+            create_job(task, payload, run_at, max_attempts, dedupe_key)
+        return True
+    except IntegrityError:
+        return False
+
+
+def claim_due_jobs(now, limit, claim_token, claim_until):
+    """Claim up to ``limit`` due jobs in one conditional UPDATE.
+
+    Due means queued with ``run_at`` reached, or running past its claim
+    deadline (a worker died mid-job); ``run_at`` holds the deadline while a
+    job runs. The lost run counts as an attempt: an expired job with no
+    attempts left is marked failed instead of being claimed again.
+    """
+    expired = and_(Jobs.status == "running", Jobs.run_at <= now)
+    db.session.execute(
+        update(Jobs)
+        .where(expired, Jobs.attempts + 1 >= Jobs.max_attempts)
+        .values(
+            status="failed",
+            attempts=Jobs.attempts + 1,
+            claim_token=None,
+            last_error="Claim expired before the job finished",
+            finished_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    due = Jobs.status.in_(("queued", "running"))
+    ids = (
+        select(Jobs.id)
+        .where(due, Jobs.run_at <= now)
+        .order_by(Jobs.run_at, Jobs.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(Jobs)
+        .where(Jobs.id.in_(ids), due, Jobs.run_at <= now)
+        .values(
+            status="running",
+            claim_token=claim_token,
+            run_at=claim_until,
+            attempts=case(
+                (Jobs.status == "running", Jobs.attempts + 1), else_=Jobs.attempts
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return (
+        db.session.execute(
+            select(Jobs)
+            .where(Jobs.claim_token == claim_token, Jobs.status == "running")
+            .order_by(Jobs.id)
+            .execution_options(populate_existing=True)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def finish_job(job_id, claim_token, status, finished_at=None, error=None, run_at=None):
+    """Record the outcome of a claimed run; ignored if the claim was lost."""
+    values = dict(
+        status=status,
+        attempts=Jobs.attempts + 1,
+        claim_token=None,
+        last_error=error[:1000] if error else None,
+        finished_at=finished_at,
+    )
+    if run_at is not None:
+        values["run_at"] = run_at
+    result = db.session.execute(
+        update(Jobs)
+        .where(Jobs.id == job_id, Jobs.claim_token == claim_token)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def count_jobs_by_status():
+    rows = db.session.execute(
+        select(Jobs.status, func.count()).group_by(Jobs.status)
+    ).all()
+    return dict(rows)
@@ -0,0 +1,103 @@
+from instance.database import db
+from models.notification import Notification
+from models.wishlist_item import WishlistItems
+from shared import crono
+from sqlalchemy import func, insert, select, update
+
+
+def create_notification(user_id, message, link=None):
+    notification = Notification(user_id=user_id, message=message[:255], link=link)
+    db.session.add(notification)
+    return notification
+
+
+def bulk_create_notifications(user_ids, message, link=None):
+    """Insert one notification per user with a single executemany."""
+    now = crono.now()
+    rows = [
+        {
+            "user_id": user_id,
+            "message": message[:255],
+            "link": link,
+            "is_read": False,
+            "created_at": now,
+        }
+        for user_id in user_ids
+    ]
+    if rows:
+        db.session.execute(insert(Notification), rows)
+    return len(rows)
+
+
+def get_wishlister_ids(product_id, after_user_id=0, limit=1000):
+    """One keyset page of the users who wishlisted ``product_id``."""
+    return (
+        db.session.execute(
+            select(WishlistItems.user_id)
+            .where(
+                WishlistItems.product_id == product_id,
+                WishlistItems.user_id > after_user_id,
+            )
+            .order_by(WishlistItems.user_id)
+            .limit(limit)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def get_inbox(user_id, limit=20, before_id=None, unread_only=False):
+    """Newest first; ``before_id`` continues after the last row of a page."""
+    query = select(Notification).where(Notification.user_id == user_id)
+    if unread_only:
+        query = query.where(Notification.is_read.is_(False))
+    if before_id is not None:
+        query = query.where(Notification.id < before_id)
+    return (
+        db.session.execute(query.order_by(Notification.id.desc()).limit(limit))
+        .scalars()
+        .all()
+    )
+
+
+def count_unread(user_id):
+    return db.session.execute(
+        select(func.count())
+        .select_from(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+    ).scalar_one()
+
+
+def mark_read(user_id, notification_ids):
+    result = db.session.execute(
+        update(Notification)
+        .where(
+            Notification.user_id == user_id,
+            Notification.id.in_(notification_ids),
+            Notification.is_read.is_(False),
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def mark_all_read(user_id):
+    result = db.session.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def notification_exists(user_id, notification_id):
+    return (
+        db.session.execute(
+            select(Notification.id).where(
+                Notification.id == notification_id, Notification.user_id == user_id
+            )
+        ).first()
+        is not None
+    )
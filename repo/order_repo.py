@@ -1,6 +1,37 @@
 from models.order import Orders
 from models.order_item import OrderItems
+from models.product import Products
 from instance.database import db
+from sqlalchemy.orm import joinedload, selectinload, lazyload, load_only
+
+# Loads an order's items, their products and the products' vendors in a
+# fixed number of queries however many orders/items there are: one IN query
+# for the items, one for the products (vendor JOINed). Categories are not
+# part of order payloads, so their default selectin load is switched off.
+ORDER_ITEMS_OPTION = (
+    selectinload(Orders.order_items)
+    .selectinload(OrderItems.product)
+    .options(joinedload(Products.vendor), lazyload(Products.categories_linked))
+)
+ORDER_WITH_ITEMS_OPTIONS = (joinedload(Orders.voucher), ORDER_ITEMS_OPTION)
+
+
+def order_load_options(fields=None):
+    """Loader options for serializing only ``fields`` of each order: other
+    columns are not selected, and items are loaded only if requested."""
+    if fields is None:
+        return ORDER_WITH_ITEMS_OPTIONS
+
+    columns = Orders.__table__.columns
+    options = [
+        load_only(
+            Orders.id,
+            *(getattr(Orders, name) for name in fields if name in columns),
+        )
+    ]
+    if "items" in fields:
+        options.append(ORDER_ITEMS_OPTION)
+    return tuple(options)
 
 
 # Order Repo
@@ -23,6 +54,41 @@ def get_orders_by_user(user_id):
     return Orders.query.filter_by(user_id=user_id).all()
 
 
+def get_order_with_items(order_id):
+    return db.session.get(Orders, order_id, options=ORDER_WITH_ITEMS_OPTIONS)
+
+
+def get_orders_with_items_by_user(
+    user_id,
+    page=1,
+    per_page=20,
+    status=None,
+    created_from=None,
+    created_to=None,
+    fields=None,
+):
+    """Return (orders, total) for one page of a user's order history, newest
+    first, with items/products/vendors preloaded (or just what ``fields``
+    needs, see order_load_options)."""
+    query = Orders.query.filter(Orders.user_id == user_id)
+    if status:
+        query = query.filter(Orders.status == status)
+    if created_from:
+        query = query.filter(Orders.created_at >= created_from)
+    if created_to:
+        query = query.filter(Orders.created_at < created_to)
+
+    total = query.count()
+    orders = (
+        query.options(*order_load_options(fields))
+        .order_by(Orders.created_at.desc(), Orders.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+    return orders, total
+
+
 def update_order(order):
     # Removed commit/rollback to delegate transaction management to service layer
     return order
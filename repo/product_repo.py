@@ -1,21 +1,156 @@
 from instance.database import db
-from models.product import Products
+from models.product import Products, search_tsvector
 from models.product_category import ProductCategories
 from models.category import Categories
 from models.cart_item import CartItems
 from models.user import Users
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload
-from sqlalchemy import asc, desc, cast, Numeric, or_
+from sqlalchemy.orm import joinedload, selectinload, lazyload, load_only
+from sqlalchemy import (
+    asc,
+    case,
+    desc,
+    or_,
+    and_,
+    func,
+    literal_column,
+    table,
+    column,
+    text,
+)
+from datetime import datetime
+from decimal import Decimal
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Columns the listing can be ordered by; the primary key is always appended
+# as a tie-breaker so the order is total and usable as a keyset cursor.
+SORT_COLUMNS = {
+    "created_at": Products.created_at,
+    "price": Products.price,
+    "name": Products.name,
+    "rating": Products.rating_avg,
+}
+
+_products_fts = table("products_fts", column("rowid"), column("rank"))
+
+
+def _search_terms(search: str):
+    return re.findall(r"[^\W_]+", search.lower())
+
+
+def apply_search(query, search: str):
+    """Filter ``query`` to products matching ``search`` through the full-text
+    index of the current database.
+
+    Every term must match, each as a prefix ("tor" finds "Toraja"). Returns
+    ``(query, relevance)`` where relevance is an expression to sort by
+    (higher is better), or None when the backend has no ranking.
+    """
+    terms = _search_terms(search)
+    if not terms:
+        return query, None
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{t}:*" for t in terms)
+        )
+        vector = search_tsvector(Products.search_text)
+        query = query.filter(vector.op("@@")(tsquery))
+        return query, func.ts_rank(vector, tsquery)
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{t}"*' for t in terms)
+        query = query.join(_products_fts, _products_fts.c.rowid == Products.id).filter(
+            text("products_fts MATCH :fts_match").bindparams(fts_match=match)
+        )
+        # FTS5 rank is bm25, where smaller (more negative) is a better match
+        return query, -_products_fts.c.rank
+
+    for term in terms:
+        query = query.filter(Products.search_text.ilike(f"%{term}%"))
+    return query, None
 
 
 def get_all_products():
     return Products.query.all()
 
 
+# Loader options for paths that serialize products: the vendor is a
+# many-to-one (a JOIN adds no rows), categories are fetched in one batch.
+PRODUCT_SERIALIZATION_OPTIONS = (
+    joinedload(Products.vendor),
+    selectinload(Products.categories_linked),
+)
+
+
+def product_load_options(fields=None, *extra_columns):
+    """Loader options for serializing only ``fields`` of each product.
+
+    Columns outside the projection (notably ``description``) stay out of
+    the SELECT, and the vendor JOIN / categories IN query are skipped when
+    no requested field reads them. ``extra_columns`` are loaded as well,
+    e.g. the sort column a keyset cursor is built from.
+    """
+    if fields is None:
+        return PRODUCT_SERIALIZATION_OPTIONS
+
+    columns = Products.__table__.columns
+    options = [
+        load_only(
+            Products.id,
+            *extra_columns,
+            *(getattr(Products, name) for name in fields if name in columns),
+        )
+    ]
+    if fields & {"vendor_name", "location"}:
+        options.append(
+            joinedload(Products.vendor).load_only(Users.username, Users.city)
+        )
+    if "categories" in fields:
+        options.append(selectinload(Products.categories_linked))
+    else:
+        options.append(lazyload(Products.categories_linked))
+    return tuple(options)
+
+
 def get_product_by_id(product_id):
     # return Products.query.get(product_id)
-    return db.session.get(Products, product_id)
+    return db.session.get(Products, product_id, options=PRODUCT_SERIALIZATION_OPTIONS)
+
+
+def get_products_by_ids(product_ids):
+    """Load many products in a single ``IN (...)`` query (categories are
+    left unloaded; pricing and checkout never read them)."""
+    if not product_ids:
+        return []
+    return (
+        Products.query.options(lazyload(Products.categories_linked))
+        .filter(Products.id.in_(set(product_ids)))
+        .all()
+    )
+
+
+def get_product_version(product_id):
+    """Visibility and updated_at stamps of a product and of the vendor and
+    categories its payload embeds, in one round trip."""
+    return db.session.execute(
+        db.select(
+            Products.updated_at,
+            Products.is_approved,
+            Users.updated_at.label("vendor_updated_at"),
+            func.max(Categories.updated_at).label("categories_updated_at"),
+            func.count(Categories.id).label("category_count"),
+        )
+        .outerjoin(Users, Users.id == Products.vendor_id)
+        .outerjoin(ProductCategories, ProductCategories.product_id == Products.id)
+        .outerjoin(Categories, Categories.id == ProductCategories.category_id)
+        .where(Products.id == product_id)
+        .group_by(Products.id, Users.updated_at)
+    ).first()
 
 
 def get_paginated_products(page: int, limit: int):
@@ -23,7 +158,6 @@ def get_paginated_products(page: int, limit: int):
 
 
 def create_product(data):
-    print("[DEBUG] raw data:", data)
     category_ids = data.pop("category_ids", [])  # Extract category_ids
     product = Products(**data)
     db.session.add(product)
@@ -36,6 +170,103 @@ def create_product(data):
     return product
 
 
+def get_existing_slugs(slugs):
+    if not slugs:
+        return set()
+    return set(
+        db.session.execute(
+            db.select(Products.slug).where(Products.slug.in_(set(slugs)))
+        ).scalars()
+    )
+
+
+def get_existing_category_ids(category_ids):
+    if not category_ids:
+        return set()
+    return set(
+        db.session.execute(
+            db.select(Categories.id).where(Categories.id.in_(set(category_ids)))
+        ).scalars()
+    )
+
+
+def get_vendor_city(vendor_id):
+    return db.session.execute(
+        db.select(Users.city).where(Users.id == vendor_id)
+    ).scalar()
+
+
+def bulk_insert_products(rows):
+    """Insert product dicts in multi-row INSERTs; returns their ids in order.
+
+    Mapper events do not run, so rows must carry search_text themselves.
+    """
+    if not rows:
+        return []
+    result = db.session.execute(
+        db.insert(Products).returning(Products.id, sort_by_parameter_order=True),
+        rows,
+    )
+    return list(result.scalars())
+
+
+def bulk_insert_product_categories(links):
+    if links:
+        db.session.execute(db.insert(ProductCategories), links)
+
+
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "slug",
+    "description",
+    "currency",
+    "price",
+    "discount_percentage",
+    "stock_quantity",
+    "unit_quantity",
+    "image_url",
+    "featured",
+    "flash_sale",
+    "is_approved",
+    "rejected",
+)
+
+
+def iter_vendor_product_batches(vendor_id, batch_size=1000):
+    """Yield a vendor's products as lists of row mappings, paging by id.
+
+    Each batch is one keyset query plus one query for its category ids
+    (``category_ids`` key), so memory stays flat for any catalog size.
+    """
+    columns = [getattr(Products, name) for name in EXPORT_COLUMNS]
+    last_id = 0
+    while True:
+        rows = (
+            db.session.execute(
+                db.select(*columns)
+                .where(Products.vendor_id == vendor_id, Products.id > last_id)
+                .order_by(Products.id)
+                .limit(batch_size)
+            )
+            .mappings()
+            .all()
+        )
+        if not rows:
+            return
+        categories = {}
+        for product_id, category_id in db.session.execute(
+            db.select(ProductCategories.product_id, ProductCategories.category_id)
+            .where(ProductCategories.product_id.in_([row["id"] for row in rows]))
+            .order_by(ProductCategories.product_id, ProductCategories.category_id)
+        ):
+            categories.setdefault(product_id, []).append(category_id)
+        yield [
+            {**row, "category_ids": categories.get(row["id"], [])} for row in rows
+        ]
+        last_id = rows[-1]["id"]
+
+
 def update_product(product_id, data):
     # Replace deprecated Query.get() with Session.get()
     product = db.session.get(Products, product_id)
@@ -75,13 +306,31 @@ def get_all_products_filtered(
     only_unapproved=False,  
     current_user_id=None,
     current_user_role=None,
+    cursor=None,
+    with_total=True,
+    fields=None,
 ):
-    print(f"[REPO] current_user_role={current_user_role}, user_id={current_user_id}, include_unapproved={include_unapproved}, only_unapproved={only_unapproved}")
-
+    """Return (products, total) for the catalog listing.
+
+    With ``cursor`` (the (sort_value, id) of the last row already seen) the
+    page is located with a keyset predicate instead of OFFSET, so deep pages
+    cost the same as the first one. ``with_total=False`` skips the COUNT
+    over the filtered set and returns ``None`` as the total. ``fields``
+    limits the columns and relationships loaded (see product_load_options).
+    """
+    # Runs on every listing request: sampled so DEBUG can stay on in
+    # production without flooding the log
+    logger.debug(
+        "Product listing: role=%s user_id=%s include_unapproved=%s only_unapproved=%s",
+        current_user_role,
+        current_user_id,
+        include_unapproved,
+        only_unapproved,
+        extra={"sample_rate": 0.01},
+    )
 
     query = Products.query.options(
-        joinedload(Products.categories_linked),
-        joinedload(Products.vendor)
+        *product_load_options(fields, SORT_COLUMNS.get(sort_by, Products.created_at))
     )
 
     if current_user_role == "admin":
@@ -99,8 +348,6 @@ def get_all_products_filtered(
             )
 
     elif current_user_role == "vendor":
-        print(f"[DEBUG][REPO] role=vendor, include_unapproved={include_unapproved}, only_unapproved={only_unapproved}, vendor_id={current_user_id}")
-        
         if only_unapproved:
             query = query.filter(
                 (Products.is_approved == False) &
@@ -115,8 +362,6 @@ def get_all_products_filtered(
             query = query.filter(Products.is_approved == True)
 
     else:
-        
-        print("[REPO] PUBLIC fallback: applying is_approved == True filter")
         query = query.filter(Products.is_approved == True)
 
 
@@ -125,36 +370,149 @@ def get_all_products_filtered(
 # Admin: no filter
 
 
+    relevance = None
     if search:
-        query = query.join(Users, Products.vendor_id == Users.id)
-        query = query.filter(
-            or_(
-                Products.name.ilike(f"%{search}%"),
-                Users.city.ilike(f"%{search}%"),
-            )
-        )
+        query, relevance = apply_search(query, search)
 
     if category_id:
         query = query.join(ProductCategories).filter(
             ProductCategories.category_id == category_id
         )
 
-    if sort_by == "price":
-        sort_column = cast(Products.price, Numeric)
-    elif sort_by == "name":
-        sort_column = Products.name
+    if sort_by == "relevance" and relevance is not None:
+        sort_column = relevance
+        ascending = False
     else:
-        sort_column = Products.created_at
+        sort_column = SORT_COLUMNS.get(sort_by, Products.created_at)
+        ascending = sort_order.lower() == "asc"
+    order_func = asc if ascending else desc
 
-    order_func = asc if sort_order.lower() == "asc" else desc
-    query = query.order_by(order_func(sort_column))
+    total = query.order_by(None).count() if with_total else None
 
-    total = query.count()
-    products = query.offset((page - 1) * limit).limit(limit).all()
+    if cursor is not None:
+        last_value, last_id = cursor
+        if ascending:
+            query = query.filter(
+                or_(
+                    sort_column > last_value,
+                    and_(sort_column == last_value, Products.id > last_id),
+                )
+            )
+        else:
+            query = query.filter(
+                or_(
+                    sort_column < last_value,
+                    and_(sort_column == last_value, Products.id < last_id),
+                )
+            )
+
+    query = query.order_by(order_func(sort_column), order_func(Products.id))
+    if cursor is None:
+        query = query.offset((page - 1) * limit)
+    products = query.limit(limit).all()
 
     return products, total
 
 
+def cursor_value(product: Products, sort_by: str):
+    """Value of the sort column of ``product`` as stored in a cursor."""
+    column = SORT_COLUMNS.get(sort_by, Products.created_at)
+    return getattr(product, column.key)
+
+
+def parse_cursor_value(value, sort_by: str):
+    """Convert a cursor value decoded from JSON back to the column's type."""
+    if sort_by in ("price", "rating"):
+        return Decimal(value)
+    if sort_by == "name":
+        return str(value)
+    return datetime.fromisoformat(value)
+
+
+def pending_product_ids(vendor_id=None, category_id=None, created_before=None, limit=100):
+    """Ids at the head of the moderation queue (oldest first), optionally
+    narrowed to a vendor, a category or products created before a time."""
+    query = db.select(Products.id).where(
+        Products.is_approved.is_(False), Products.rejected.is_(False)
+    )
+    if vendor_id is not None:
+        query = query.where(Products.vendor_id == vendor_id)
+    if category_id is not None:
+        query = query.where(
+            Products.id.in_(
+                db.select(ProductCategories.product_id).where(
+                    ProductCategories.category_id == category_id
+                )
+            )
+        )
+    if created_before is not None:
+        query = query.where(Products.created_at < created_before)
+    query = query.order_by(Products.created_at, Products.id).limit(limit)
+    return list(db.session.execute(query).scalars())
+
+
+def set_moderation_state(product_ids, approved: bool):
+    """Approve or reject ``product_ids`` in one UPDATE.
+
+    Products already in that state are left alone. Returns (id, vendor_id,
+    name) of the rows that changed.
+    """
+    if not product_ids:
+        return []
+    result = db.session.execute(
+        db.update(Products)
+        .where(
+            Products.id.in_(product_ids),
+            or_(
+                Products.is_approved.is_not(approved),
+                Products.rejected.is_not(not approved),
+            ),
+        )
+        .values(is_approved=approved, rejected=not approved)
+        .returning(Products.id, Products.vendor_id, Products.name)
+        .execution_options(synchronize_session=False)
+    )
+    return result.all()
+
+
+def adjust_rating(product_id, rating_delta, count_delta):
+    """Add a review's rating to (or, with negative deltas, remove it from) the
+    product's aggregates in one UPDATE, so concurrent reviews cannot lose
+    increments. Returns False when the product does not exist.
+    """
+    new_count = Products.rating_count + count_delta
+    new_sum = Products.rating_sum + rating_delta
+    result = db.session.execute(
+        db.update(Products)
+        .where(Products.id == product_id)
+        .values(
+            rating_count=new_count,
+            rating_sum=new_sum,
+            # SET expressions read the pre-update row on every backend; the
+            # 1.0 literal keeps the division out of integer arithmetic
+            rating_avg=case(
+                (
+                    new_count > 0,
+                    func.round(new_sum * literal_column("1.0") / new_count, 2),
+                ),
+                else_=0,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def get_existing_product_ids(product_ids):
+    if not product_ids:
+        return set()
+    return set(
+        db.session.execute(
+            db.select(Products.id).where(Products.id.in_(product_ids))
+        ).scalars()
+    )
+
+
 def approve_product(product_id: int) -> Products:
     product = db.session.get(Products, product_id)
     if not product:
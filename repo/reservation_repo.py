@@ -0,0 +1,73 @@
+from instance.database import db
+from models.product import Products
+from models.stock_reservation import StockReservations
+from models.order import Orders
+from sqlalchemy import update, select
+
+
+def decrement_stock_if_available(product_id, quantity) -> bool:
+    """Atomically take ``quantity`` units; False if the product is missing
+    or has fewer units left. The check and the write are one statement, so
+    concurrent checkouts cannot both pass the check."""
+    result = db.session.execute(
+        update(Products)
+        .where(Products.id == product_id, Products.stock_quantity >= quantity)
+        .values(stock_quantity=Products.stock_quantity - quantity)
+    )
+    return result.rowcount == 1
+
+
+def increment_stock(product_id, quantity):
+    db.session.execute(
+        update(Products)
+        .where(Products.id == product_id)
+        .values(stock_quantity=Products.stock_quantity + quantity)
+    )
+
+
+def create_reservation(order_id, product_id, quantity, expires_at):
+    reservation = StockReservations(
+        order_id=order_id,
+        product_id=product_id,
+        quantity=quantity,
+        status="held",
+        expires_at=expires_at,
+    )
+    db.session.add(reservation)
+    return reservation
+
+
+def get_reservations_by_order(order_id, status=None):
+    query = StockReservations.query.filter_by(order_id=order_id)
+    if status:
+        query = query.filter_by(status=status)
+    return query.order_by(StockReservations.product_id).all()
+
+
+def transition_reservation(reservation_id, from_status, to_status) -> bool:
+    """Move one reservation between states; False if another transaction
+    already moved it (guards against releasing the same units twice)."""
+    result = db.session.execute(
+        update(StockReservations)
+        .where(
+            StockReservations.id == reservation_id,
+            StockReservations.status == from_status,
+        )
+        .values(status=to_status)
+    )
+    return result.rowcount == 1
+
+
+def get_order_ids_with_expired_reservations(now, limit=100):
+    stmt = (
+        select(StockReservations.order_id)
+        .join(Orders, Orders.id == StockReservations.order_id)
+        .where(
+            StockReservations.status == "held",
+            StockReservations.expires_at < now,
+            Orders.status == "pending",
+        )
+        .distinct()
+        .limit(limit)
+    )
+    return db.session.execute(stmt).scalars().all()
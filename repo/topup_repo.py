@@ -0,0 +1,68 @@
+from instance.database import db
+from models.topup_request import TopupRequests
+from sqlalchemy import select, update, func
+
+
+def create_topup_request(user_id, amount):
+    topup = TopupRequests(user_id=user_id, amount=amount, status="pending")
+    db.session.add(topup)
+    return topup
+
+
+def get_topup_request_by_id(request_id):
+    return db.session.get(TopupRequests, request_id)
+
+
+def get_topup_requests(page=1, per_page=50, status=None, user_id=None):
+    """Return (requests, total), newest first."""
+    stmt = select(TopupRequests)
+    if status:
+        stmt = stmt.where(TopupRequests.status == status)
+    if user_id:
+        stmt = stmt.where(TopupRequests.user_id == user_id)
+
+    total = db.session.execute(
+        stmt.with_only_columns(func.count()).select_from(TopupRequests).order_by(None)
+    ).scalar_one()
+    requests = (
+        db.session.execute(
+            stmt.order_by(TopupRequests.id.desc())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        )
+        .scalars()
+        .all()
+    )
+    return requests, total
+
+
+def transition_pending_request(request_id, new_status, processed_by, processed_at):
+    """Move a pending request to ``new_status`` in one conditional UPDATE.
+
+    Returns the request's (user_id, amount), or None if it does not exist or
+    was already processed, possibly by a concurrent admin.
+    """
+    row = db.session.execute(
+        select(TopupRequests.user_id, TopupRequests.amount).where(
+            TopupRequests.id == request_id
+        )
+    ).first()
+    if row is None:
+        return None
+    result = db.session.execute(
+        update(TopupRequests)
+        .where(TopupRequests.id == request_id, TopupRequests.status == "pending")
+        .values(status=new_status, processed_by=processed_by, processed_at=processed_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return None
+    return row.user_id, row.amount
+
+
+def bulk_insert_topup_requests(rows):
+    db.session.execute(TopupRequests.__table__.insert(), rows)
+
+
+def count_topup_requests():
+    return db.session.execute(select(func.count(TopupRequests.id))).scalar_one()
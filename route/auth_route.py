@@ -1,5 +1,3 @@
-import os
-import time
 from flask import Blueprint, request, jsonify, current_app  # add current_app
 from flask_jwt_extended import (
     create_access_token,
@@ -7,11 +5,13 @@ from flask_jwt_extended import (
     get_jwt_identity,
     get_jwt,
 )
-from services import user_services
+from services import user_services, balance_services
 from services.user_services import get_me_service
 from shared.auth import role_required
 from marshmallow import Schema, fields, ValidationError
 from shared.limiter import limiter
+from shared.serializers import USER_ACCOUNT, USER_PROFILE, USER_PUBLIC
+from middlewares.instrumentation import timed
 
 
 auth_bp = Blueprint("auth_bp", __name__)
@@ -52,18 +52,18 @@ def register():
     try:
         validated_data = user_schema.load(data)
     except ValidationError as err:
-        current_app.logger.warning(f"Register: Validation error - {err.messages}")
+        current_app.logger.warning("Register: Validation error - %s", err.messages)
         return jsonify({"msg": "Validation error", "errors": err.messages}), 400
 
     user, error = user_services.create_user(validated_data)
     if error:
-        current_app.logger.error(f"Register: {error}")
+        current_app.logger.error("Register: %s", error)
         return jsonify({"msg": error}), 400
     if not user:
         current_app.logger.error("Register: User registration failed")
         return jsonify({"msg": "User registration failed"}), 400
     current_app.logger.info(
-        f"Register: User {user.username if user else 'unknown'} registered successfully"
+        "Register: User %s registered successfully", user.username if user else 'unknown'
     )
     return jsonify({"msg": "User registered successfully"}), 201
 
@@ -73,40 +73,29 @@ def register():
 @limiter.limit("5 per minute")
 def login():
     current_app.logger.info("Login endpoint called")
-    overall_start = time.perf_counter()
 
     data = request.get_json()
     email = data.get("email")
     password = data.get("password")
 
-    step1 = time.perf_counter()
-    user = user_services.authenticate(email, password)
-    step2 = time.perf_counter()
+    # Step timings are reported in the Server-Timing header
+    with timed("auth", "password check"):
+        user = user_services.authenticate(email, password)
 
     if not user:
-        current_app.logger.warning(f"Login failed for email: {email}")
-        if os.getenv("FLASK_ENV") == "development":
-            print(f"[LOGIN] User not found or wrong password (in {step2 - step1:.3f}s)")
+        current_app.logger.warning("Login failed for email: %s", email)
         return jsonify({"msg": "Invalid credentials"}), 401
 
     # Refresh from DB
-    step3 = time.perf_counter()
     user = user_services.get_user_by_id(user.id)
-    step4 = time.perf_counter()
 
-    token = create_access_token(
-        identity=str(user.id),
-        additional_claims={"role": user.role.value, "city": user.city or "Unknown"},
-    )
-    step5 = time.perf_counter()
-
-    current_app.logger.info(f"Login successful for user_id: {user.id}")
+    with timed("token"):
+        token = create_access_token(
+            identity=str(user.id),
+            additional_claims={"role": user.role.value, "city": user.city or "Unknown"},
+        )
 
-    if os.getenv("FLASK_ENV") == "development":
-        print(f"[LOGIN] Auth lookup: {step2 - step1:.3f}s")
-        print(f"[LOGIN] Refresh user: {step4 - step3:.3f}s")
-        print(f"[LOGIN] Token creation: {step5 - step4:.3f}s")
-        print(f"[LOGIN] Total: {step5 - overall_start:.3f}s")
+    current_app.logger.info("Login successful for user_id: %s", user.id)
 
     return jsonify(access_token=token), 200
 
@@ -120,28 +109,12 @@ def me():
     user = user_services.get_user_by_id(user_id)
 
     if not user:
-        current_app.logger.warning(f"Me: User {user_id} not found")
+        current_app.logger.warning("Me: User %s not found", user_id)
         return jsonify({"msg": "User not found"}), 404
 
-    current_app.logger.info(f"Me: User {user_id} info returned")
+    current_app.logger.info("Me: User %s info returned", user_id)
     return (
-        jsonify(
-            {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "phone": user.phone,
-                "role": user.role.value,
-                "image_url": user.image_url,
-                "address": user.address,
-                "city": user.city,
-                "state": user.state,
-                "zip_code": user.zip_code,
-                "country": user.country,
-            }
-        ),
+        jsonify(USER_PROFILE.one(user)),
         200,
     )
 
@@ -152,9 +125,9 @@ def me():
 @jwt_required()
 @role_required("vendor", "customer", "admin")  # Optional: restrict to known roles
 def update_user(user_id):
-    current_app.logger.info(f"Update user endpoint called for user_id: {user_id}")
+    current_app.logger.info("Update user endpoint called for user_id: %s", user_id)
     if not request.is_json:
-        current_app.logger.warning(f"Update user {user_id}: Invalid content type")
+        current_app.logger.warning("Update user %s: Invalid content type", user_id)
         return jsonify({"msg": "Invalid content type"}), 400
     data = request.get_json()
 
@@ -163,25 +136,25 @@ def update_user(user_id):
         validated_data = user_schema.load(data, partial=True)
     except ValidationError as err:
         current_app.logger.warning(
-            f"Update user {user_id}: Validation error - {err.messages}"
+            "Update user %s: Validation error - %s", user_id, err.messages
         )
         return jsonify({"msg": "Validation error", "errors": err.messages}), 400
 
     current_user_id = int(get_jwt_identity())
     current_user_role = get_jwt().get("role")
     current_app.logger.info(
-        f"User {current_user_id} ({current_user_role}) attempts to update user {user_id}"
+        "User %s (%s) attempts to update user %s", current_user_id, current_user_role, user_id
     )
     user, error = user_services.update_user(
         user_id, validated_data, current_user_id, current_user_role
     )
 
     if error:
-        current_app.logger.error(f"Update user {user_id} failed: {error}")
+        current_app.logger.error("Update user %s failed: %s", user_id, error)
         return jsonify({"msg": error}), 403 if error == "Unauthorized" else 404
 
     current_app.logger.info(
-        f"User {user_id} updated successfully by user {current_user_id}"
+        "User %s updated successfully by user %s", user_id, current_user_id
     )
     return jsonify({"msg": "User updated successfully"}), 200
 
@@ -193,19 +166,7 @@ def get_all_users():
     current_app.logger.info("Get all users endpoint called")
     users = user_services.get_all_users()
     return (
-        jsonify(
-            [
-                {
-                    "id": u.id,
-                    "username": u.username,
-                    "email": u.email,
-                    "role": u.role.value,
-                    "is_active": u.is_active,
-                    "created_at": u.created_at.isoformat(),
-                }
-                for u in users
-            ]
-        ),
+        jsonify(USER_ACCOUNT.many(users)),
         200,
     )
 
@@ -214,7 +175,7 @@ def get_all_users():
 @jwt_required()
 @role_required("vendor", "customer", "admin")
 def delete_user(user_id):
-    current_app.logger.info(f"Delete user endpoint called for user_id: {user_id}")
+    current_app.logger.info("Delete user endpoint called for user_id: %s", user_id)
     current_user_id = int(get_jwt_identity())
     current_user_role = get_jwt().get("role")
 
@@ -223,10 +184,10 @@ def delete_user(user_id):
     )
 
     if error:
-        current_app.logger.error(f"Delete user {user_id} failed: {error}")
+        current_app.logger.error("Delete user %s failed: %s", user_id, error)
         return jsonify({"msg": error}), 403 if error == "Unauthorized" else 404
 
-    current_app.logger.info(f"User {user_id} deleted by user {current_user_id}")
+    current_app.logger.info("User %s deleted by user %s", user_id, current_user_id)
     return jsonify(response_message), 200
 
 
@@ -236,18 +197,7 @@ def get_all_non_admin_users():
     current_app.logger.info("Get all non-admin users endpoint called")
     users = user_services.get_all_non_admin_users()
     return (
-        jsonify(
-            [
-                {
-                    "id": u.id,
-                    "username": u.username,
-                    "city": u.city,
-                    "image_url": u.image_url,
-                    "role": u.role.value,
-                }
-                for u in users
-            ]
-        ),
+        jsonify(USER_PUBLIC.many(users)),
         200,
     )
 
@@ -255,29 +205,21 @@ def get_all_non_admin_users():
 @auth_bp.route("/users/<int:user_id>", methods=["GET"])
 @jwt_required()
 def get_user_by_id(user_id):
-    current_app.logger.info(f"Get user by id endpoint called for user_id: {user_id}")
+    current_app.logger.info("Get user by id endpoint called for user_id: %s", user_id)
     current_user_role = get_jwt().get("role")
 
     user, error = user_services.get_user_by_id_with_admin_check(
         user_id, current_user_role
     )
     if error:
-        current_app.logger.warning(f"Get user by id {user_id} failed: {error}")
+        current_app.logger.warning("Get user by id %s failed: %s", user_id, error)
         return jsonify({"msg": error}), (
             403 if error == "Unauthorized to view admin accounts" else 404
         )
 
-    current_app.logger.info(f"User {user_id} info returned")
+    current_app.logger.info("User %s info returned", user_id)
     return (
-        jsonify(
-            {
-                "id": user.id,
-                "username": user.username,
-                "city": user.city,
-                "image_url": user.image_url,
-                "role": user.role.value,
-            }
-        ),
+        jsonify(USER_PUBLIC.one(user)),
         200,
     )
 
@@ -289,18 +231,7 @@ def get_admin_users():
     current_app.logger.info("Get admin users endpoint called")
     users = user_services.get_admin_users()
     return (
-        jsonify(
-            [
-                {
-                    "id": u.id,
-                    "username": u.username,
-                    "city": u.city,
-                    "image_url": u.image_url,
-                    "role": u.role.value,
-                }
-                for u in users
-            ]
-        ),
+        jsonify(USER_PUBLIC.many(users)),
         200,
     )
 
@@ -314,20 +245,46 @@ def get_my_balance():
 
     user = user_services.get_user_by_id(current_user_id)
     if not user:
-        current_app.logger.warning(f"Get my balance: User {current_user_id} not found")
+        current_app.logger.warning("Get my balance: User %s not found", current_user_id)
         return jsonify({"msg": "User not found"}), 404
 
-    current_app.logger.info(f"Balance for user {current_user_id} returned")
+    current_app.logger.info("Balance for user %s returned", current_user_id)
     return jsonify({"balance": float(user.balance or 0.0)}), 200
 
 
+@auth_bp.route("/users/me/balance/transactions", methods=["GET"])
+@jwt_required()
+@role_required("customer", "vendor")
+def get_my_balance_transactions():
+    current_user_id = int(get_jwt_identity())
+    limit = min(max(request.args.get("limit", default=20, type=int), 1), 100)
+    before_id = request.args.get("before_id", type=int)
+
+    transactions = balance_services.get_balance_history(
+        current_user_id, limit=limit, before_id=before_id
+    )
+    next_before_id = transactions[-1].id if len(transactions) == limit else None
+
+    return (
+        jsonify(
+            {
+                "transactions": [
+                    balance_services.serialize_transaction(t) for t in transactions
+                ],
+                "next_before_id": next_before_id,
+            }
+        ),
+        200,
+    )
+
+
 # ⚠️ Deprecated: use PATCH /request-topup/<id>/approve instead
 @auth_bp.route("/users/<int:user_id>/balance", methods=["PATCH"])
 @limiter.limit("5 per minute")
 @jwt_required()
 @role_required("admin")
 def admin_update_user_balance(user_id):
-    current_app.logger.info(f"Admin update balance for user_id: {user_id} called")
+    current_app.logger.info("Admin update balance for user_id: %s called", user_id)
 
     if not request.is_json:
         return jsonify({"msg": "Invalid content type"}), 400
@@ -341,14 +298,15 @@ def admin_update_user_balance(user_id):
     if added_amount < 0:
         return jsonify({"msg": "Balance cannot be negative"}), 400
 
-    updated_user, error = user_services.update_my_balance_service(user_id, added_amount)
+    # Retried requests carrying the same key are applied only once
+    idempotency_key = request.headers.get("Idempotency-Key")
+    updated_user, error = user_services.update_my_balance_service(
+        user_id, added_amount, idempotency_key=idempotency_key
+    )
 
     if error:
         return jsonify({"msg": error}), 404
 
-    # ✅ Mark top-up request as approved in CSV
-    # user_services.mark_topup_request_as_approved(user_id, added_amount)
-
     return (
         jsonify(
             {
@@ -388,32 +346,31 @@ def request_topup():
 @jwt_required()
 @role_required("admin")
 def view_topup_requests():
-    logs, error = user_services.get_topup_requests_service()
+    page = max(request.args.get("page", default=1, type=int), 1)
+    limit = min(max(request.args.get("limit", default=50, type=int), 1), 200)
+    status = request.args.get("status")
+    user_id = request.args.get("user_id", type=int)
 
-    if error:
-        return jsonify({"msg": error}), 500
+    logs, total = user_services.get_topup_requests_service(
+        page=page, per_page=limit, status=status, user_id=user_id
+    )
 
-    return jsonify({"requests": logs}), 200
+    return jsonify({"requests": logs, "total": total, "page": page, "limit": limit}), 200
 
 
 @auth_bp.route("/request-topup/<int:request_id>/approve", methods=["POST"])
 @jwt_required()
 @role_required("admin")
 def approve_topup(request_id):
-    success, user_id, amount = user_services.mark_topup_request_status(
-        request_id, "approved"
-    )
-    if not success:
-        return jsonify({"msg": "Top-up request not found or already processed"}), 404
-
-    updated_user, error = user_services.update_my_balance_service(user_id, amount)
+    admin_id = int(get_jwt_identity())
+    updated_user, error = user_services.approve_topup_request(request_id, admin_id)
     if error:
         return jsonify({"msg": error}), 404
 
     return (
         jsonify(
             {
-                "msg": f"Top-up approved and balance updated for user {user_id}",
+                "msg": f"Top-up approved and balance updated for user {updated_user.id}",
                 "new_balance": float(updated_user.balance),
             }
         ),
@@ -425,10 +382,9 @@ def approve_topup(request_id):
 @jwt_required()
 @role_required("admin")
 def reject_topup(request_id):
-    success, user_id, _ = user_services.mark_topup_request_status(
-        request_id, "rejected"
-    )
-    if not success:
-        return jsonify({"msg": "Top-up request not found or already processed"}), 404
+    admin_id = int(get_jwt_identity())
+    _, error = user_services.reject_topup_request(request_id, admin_id)
+    if error:
+        return jsonify({"msg": error}), 404
 
     return jsonify({"msg": f"Top-up request {request_id} rejected"}), 200
@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from services import cart_services as cart_service
 from services import cart_item_services as cart_item_service
 from shared.auth import role_required
-from decimal import Decimal
+from services import pricing_services
 
 
 cart_bp = Blueprint("cart_bp", __name__)
@@ -13,7 +13,7 @@ cart_bp = Blueprint("cart_bp", __name__)
 @role_required("customer")
 def get_cart():
     user_id = int(get_jwt_identity())
-    current_app.logger.info(f"User {user_id} requested their cart.")
+    current_app.logger.info("User %s requested their cart.", user_id)
     cart = cart_service.get_or_create_cart(user_id)
     return jsonify({
         "message": "Cart retrieved successfully.",
@@ -29,7 +29,7 @@ def add_item():
     data = request.get_json()
     product_id = data.get("product_id")
     quantity = data.get("quantity", 1)
-    current_app.logger.info(f"User {user_id} adding product {product_id} (qty {quantity}) to cart.")
+    current_app.logger.info("User %s adding product %s (qty %s) to cart.", user_id, product_id, quantity)
 
     item = cart_service.add_item_to_cart(user_id, product_id, quantity)
     return jsonify({
@@ -44,7 +44,7 @@ def add_item():
 @role_required("customer")
 def get_cart_items():
     user_id = int(get_jwt_identity())
-    current_app.logger.info(f"User {user_id} requested their cart items.")
+    current_app.logger.info("User %s requested their cart items.", user_id)
     items = cart_item_service.get_cart_items(user_id)
     return jsonify({
         "message": "Cart items fetched successfully.",
@@ -65,10 +65,10 @@ def update_item(item_id):
     role = get_jwt().get("role")
     data = request.get_json()
     quantity = data.get("quantity")
-    current_app.logger.info(f"User {user_id} updating cart item {item_id} to quantity {quantity}.")
+    current_app.logger.info("User %s updating cart item %s to quantity %s.", user_id, item_id, quantity)
     updated = cart_item_service.update_item(item_id, quantity)
     if not updated:
-        current_app.logger.warning(f"User {user_id} tried to update non-existent cart item {item_id}.")
+        current_app.logger.warning("User %s tried to update non-existent cart item %s.", user_id, item_id)
         return jsonify({"message": "Cart item not found."}), 404
     return jsonify({
         "message": "Cart item updated successfully.",
@@ -82,10 +82,10 @@ def update_item(item_id):
 def delete_item(item_id):
     user_id = int(get_jwt_identity())
     role = get_jwt().get("role")
-    current_app.logger.info(f"User {user_id} deleting cart item {item_id}.")
+    current_app.logger.info("User %s deleting cart item %s.", user_id, item_id)
     success = cart_item_service.delete_item(item_id)
     if not success:
-        current_app.logger.warning(f"User {user_id} tried to delete non-existent cart item {item_id}.")
+        current_app.logger.warning("User %s tried to delete non-existent cart item %s.", user_id, item_id)
         return jsonify({"message": "Cart item not found."}), 404
     return jsonify({"message": "Item removed from cart successfully."}), 200
 
@@ -102,37 +102,13 @@ def get_cart_summary():
     if not items:
         return jsonify({"msg": "Cart is empty"}), 400
 
-    # 2. Calculate total
-    total_before = sum(i.quantity * i.product.price for i in items)
-    discount = 0
-    voucher = None
+    # 2. Price the cart from the catalog (one query for all products)
+    try:
+        pricing = pricing_services.price_items(
+            [{"product_id": i.product_id, "quantity": i.quantity} for i in items],
+            voucher_code,
+        )
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
-    if voucher_code:
-        from models.voucher import Vouchers
-        from datetime import datetime
-        voucher = Vouchers.query.filter_by(code=voucher_code, is_active=True).first()
-        if not voucher or (voucher.expires_at and voucher.expires_at < datetime.utcnow()):
-            return jsonify({"msg": "Voucher is invalid or expired"}), 400
-
-        if voucher.discount_percent:
-            discount = total_before * (Decimal(str(voucher.discount_percent)) / Decimal("100"))
-        elif voucher.discount_amount:
-            discount = Decimal(str(voucher.discount_amount))
-
-    total_after = max(total_before - discount, Decimal("0"))
-
-
-    return jsonify({
-        "total_before_discount": float(total_before),
-        "discount_amount": float(discount),
-        "total_after_discount": float(total_after),
-        "voucher_code": voucher.code if voucher else None,
-        "items": [
-            {
-                "product_id": i.product_id,
-                "product_name": i.product.name,
-                "unit_price": float(i.product.price),
-                "quantity": i.quantity
-            } for i in items
-        ]
-    }), 200
+    return jsonify(pricing_services.serialize_pricing(pricing)), 200
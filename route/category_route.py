@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from shared.auth import role_required
 from services import category_service
+from shared.conditional import conditional_response
+from shared.serializers import CATEGORY
 
 category_bp = Blueprint("category_bp", __name__)
 
@@ -10,49 +12,46 @@ category_bp = Blueprint("category_bp", __name__)
 @category_bp.route("/categories", methods=["GET"])
 def get_all_categories():
     current_app.logger.info("Fetching all categories.")
-    categories = category_service.get_all_categories()
-    return (
-        jsonify(
-            {
-                "msg": "Categories retrieved successfully",
-                "count": len(categories),
-                "categories": [
-                    {
-                        "id": c.id,
-                        "name": c.name,
-                        "slug": c.slug,
-                        "image_url": c.image_url,
-                        "vendor_id": c.vendor_id,
-                        "parent_id": c.parent_id,
-                    }
-                    for c in categories
-                ],
-            }
-        ),
-        200,
+
+    def build():
+        categories = category_service.get_all_categories()
+        return (
+            jsonify(
+                {
+                    "msg": "Categories retrieved successfully",
+                    "count": len(categories),
+                    "categories": CATEGORY.many(categories),
+                }
+            ),
+            200,
+        )
+
+    return conditional_response(category_service.get_categories_etag(), build)
+
+
+# Public: Nested category menu with approved-product counts
+@category_bp.route("/categories/tree", methods=["GET"])
+def get_category_tree():
+    tree, etag = category_service.get_category_tree()
+    return conditional_response(
+        etag,
+        lambda: jsonify({"msg": "Category tree retrieved successfully", "categories": tree}),
     )
 
 
 # Public: Get a specific category by ID
 @category_bp.route("/categories/<int:category_id>", methods=["GET"])
 def get_category(category_id):
-    current_app.logger.info(f"Fetching category with id {category_id}.")
+    current_app.logger.info("Fetching category with id %s.", category_id)
     category = category_service.get_category_by_id(category_id)
     if not category:
-        current_app.logger.warning(f"Category {category_id} not found.")
+        current_app.logger.warning("Category %s not found.", category_id)
         return jsonify({"msg": "Category not found", "category_id": category_id}), 404
     return (
         jsonify(
             {
                 "msg": "Category retrieved successfully",
-                "category": {
-                    "id": category.id,
-                    "name": category.name,
-                    "slug": category.slug,
-                    "image_url": category.image_url,
-                    "vendor_id": category.vendor_id,
-                    "parent_id": category.parent_id,
-                },
+                "category": CATEGORY.one(category),
             }
         ),
         200,
@@ -66,7 +65,7 @@ def get_category(category_id):
 def create_category():
     data = request.get_json()
     current_user = get_jwt_identity()
-    current_app.logger.info(f"User {current_user} attempting to create category with data: {data}")
+    current_app.logger.info("User %s attempting to create category with data: %s", current_user, data)
     category = None
     error = None
     try:
@@ -75,23 +74,16 @@ def create_category():
         category, error = category_service.create_category(data, current_user)
     except Exception as e:
         error = str(e)
-        current_app.logger.error(f"Error creating category: {error}")
+        current_app.logger.error("Error creating category: %s", error)
     if error or not category:
-        current_app.logger.warning(f"Failed to create category: {error}")
+        current_app.logger.warning("Failed to create category: %s", error)
         return jsonify({"msg": error or "Failed to create category"}), 400
-    current_app.logger.info(f"Category created successfully with id {category.id}")
+    current_app.logger.info("Category created successfully with id %s", category.id)
     return (
         jsonify(
             {
                 "msg": "Category created successfully",
-                "category": {
-                    "id": category.id,
-                    "name": category.name,
-                    "slug": category.slug,
-                    "image_url": category.image_url,
-                    "vendor_id": category.vendor_id,
-                    "parent_id": category.parent_id,
-                },
+                "category": CATEGORY.one(category),
             }
         ),
         201,
@@ -105,27 +97,18 @@ def create_category():
 def update_category(category_id):
     data = request.get_json()
     current_user = get_jwt_identity()
-    current_app.logger.info(f"User {current_user} attempting to update category {category_id} with data: {data}")
+    current_app.logger.info("User %s attempting to update category %s with data: %s", current_user, category_id, data)
     category, error = category_service.update_category(category_id, data, current_user)
     if error:
-        current_app.logger.warning(f"Failed to update category {category_id}: {error}")
-        return (
-            jsonify({"msg": error}),
-            403 if error == "Unauthorized" else 404,
-        )
-    current_app.logger.info(f"Category {category_id} updated successfully.")
+        current_app.logger.warning("Failed to update category %s: %s", category_id, error)
+        status = {"Unauthorized": 403, category_service.INVALID_PARENT: 400}
+        return jsonify({"msg": error}), status.get(error, 404)
+    current_app.logger.info("Category %s updated successfully.", category_id)
     return (
         jsonify(
             {
                 "msg": "Category updated successfully",
-                "category": {
-                    "id": category.id,
-                    "name": category.name,
-                    "slug": category.slug,
-                    "image_url": category.image_url,
-                    "vendor_id": category.vendor_id,
-                    "parent_id": category.parent_id,
-                },
+                "category": CATEGORY.one(category),
             }
         ),
         200,
@@ -138,13 +121,13 @@ def update_category(category_id):
 @role_required("vendor", "admin")
 def delete_category(category_id):
     current_user = get_jwt_identity()
-    current_app.logger.info(f"User {current_user} attempting to delete category {category_id}.")
+    current_app.logger.info("User %s attempting to delete category %s.", current_user, category_id)
     category, error = category_service.delete_category(category_id, current_user)
     if error:
-        current_app.logger.warning(f"Failed to delete category {category_id}: {error}")
+        current_app.logger.warning("Failed to delete category %s: %s", category_id, error)
         return (
             jsonify({"msg": error}),
             403 if error == "Unauthorized" else 404,
         )
-    current_app.logger.info(f"Category {category_id} deleted successfully.")
+    current_app.logger.info("Category %s deleted successfully.", category_id)
     return jsonify({"msg": "Category deleted successfully"}), 200
@@ -2,28 +2,56 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services import feedback_services
 from models.user import Users
+from datetime import datetime
+from shared.pagination import encode_cursor, decode_cursor
 
 feedback_bp = Blueprint("feedback_bp", __name__)
 
+MAX_FEEDBACK_PER_PAGE = 100
+
+
+def _page_args():
+    """(limit, before, rating) from ?limit, ?cursor and ?rating; raises
+    ValueError with a client-facing message."""
+    limit = min(
+        max(request.args.get("limit", default=20, type=int), 1), MAX_FEEDBACK_PER_PAGE
+    )
+    rating = request.args.get("rating", type=int)
+    if rating is not None and not 1 <= rating <= 5:
+        raise ValueError("Rating must be an integer between 1 and 5")
+    before = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor)
+            before = (datetime.fromisoformat(created_at), int(last_id))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+    return limit, before, rating
+
+
+def _next_cursor(next_before):
+    return encode_cursor(*next_before) if next_before else None
+
 
 @feedback_bp.route("/feedback", methods=["POST"])
 @jwt_required()
 def create_feedback():
     current_user_id = get_jwt_identity()
     data = request.get_json()
-    current_app.logger.info(f"User {current_user_id} submitting feedback: {data}")
+    current_app.logger.info("User %s submitting feedback: %s", current_user_id, data)
     if not data:
-        current_app.logger.warning(f"User {current_user_id} submitted invalid feedback request.")
+        current_app.logger.warning("User %s submitted invalid feedback request.", current_user_id)
         return jsonify({"msg": "Invalid request"}), 400
 
     feedback, error = feedback_services.create_feedback(data, current_user_id)
     if error:
-        current_app.logger.error(f"Create feedback error: {error}, data: {data}")
+        current_app.logger.error("Create feedback error: %s, data: %s", error, data)
         return jsonify({"msg": error}), 400
     if feedback is None:
-        current_app.logger.warning(f"User {current_user_id} failed to create feedback.")
+        current_app.logger.warning("User %s failed to create feedback.", current_user_id)
         return jsonify({"msg": "Failed to create feedback"}), 400
-    current_app.logger.info(f"Feedback {feedback.id} submitted successfully by user {current_user_id}.")
+    current_app.logger.info("Feedback %s submitted successfully by user %s.", feedback.id, current_user_id)
     return (
         jsonify(
             {
@@ -42,44 +70,59 @@ def create_feedback():
     )
 
 
+# Newest first, a page at a time: ?limit, ?rating=1..5, ?cursor=<next_cursor>,
+# ?histogram=true adds the review count per star
 @feedback_bp.route("/feedback/product/<int:product_id>", methods=["GET"])
 def get_feedback_by_product(product_id):
-    current_app.logger.info(f"Fetching feedback for product {product_id}.")
-    feedback_list = feedback_services.get_feedback_by_product(product_id)
-    return (
-        jsonify(
+    current_app.logger.info("Fetching feedback for product %s.", product_id)
+    try:
+        limit, before, rating = _page_args()
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    feedback_list, next_before = feedback_services.get_feedback_by_product(
+        product_id, limit=limit, before=before, rating=rating
+    )
+    body = {
+        "msg": "Feedback retrieved successfully",
+        "count": len(feedback_list),
+        "feedback": [
             {
-                "msg": "Feedback retrieved successfully",
-                "count": len(feedback_list),
-                "feedback": [
-                    {
-                        "id": fb.id,
-                        "user_id": fb.user_id,
-                        "product_id": fb.product_id,
-                        "rating": fb.rating,
-                        "comment": fb.comment,
-                        "created_at": fb.created_at.isoformat(),
-                    }
-                    for fb in feedback_list
-                ],
+                "id": fb.id,
+                "user_id": fb.user_id,
+                "product_id": fb.product_id,
+                "rating": fb.rating,
+                "comment": fb.comment,
+                "created_at": fb.created_at.isoformat(),
             }
-        ),
-        200,
-    )
+            for fb in feedback_list
+        ],
+        "next_cursor": _next_cursor(next_before),
+    }
+    if request.args.get("histogram", "").lower() in ("1", "true", "yes"):
+        body["histogram"] = feedback_services.get_rating_histogram(product_id)
+    return jsonify(body), 200
 
 
 @feedback_bp.route("/feedback/user/<int:user_id>", methods=["GET"])
 @jwt_required()
 def get_feedback_by_user(user_id):
     current_user_id = get_jwt_identity()
-    current_app.logger.info(f"User {current_user_id} requesting feedback for user {user_id}.")
+    current_app.logger.info("User %s requesting feedback for user %s.", current_user_id, user_id)
     user = Users.query.filter_by(id=current_user_id).first()
 
     if not user or user.id != user_id:
-        current_app.logger.warning(f"Unauthorized feedback access attempt by user {current_user_id} for user {user_id}.")
+        current_app.logger.warning("Unauthorized feedback access attempt by user %s for user %s.", current_user_id, user_id)
         return jsonify({"msg": "Unauthorized"}), 403
 
-    feedback_list = feedback_services.get_feedback_by_user(user_id)
+    try:
+        limit, before, rating = _page_args()
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    feedback_list, next_before = feedback_services.get_feedback_by_user(
+        user_id, limit=limit, before=before, rating=rating
+    )
     return (
         jsonify(
             {
@@ -95,6 +138,7 @@ def get_feedback_by_user(user_id):
                     }
                     for fb in feedback_list
                 ],
+                "next_cursor": _next_cursor(next_before),
             }
         ),
         200,
@@ -105,7 +149,7 @@ def get_feedback_by_user(user_id):
 def get_all_feedback():
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
-    current_app.logger.info(f"Fetching all feedback (page {page}, per_page {per_page}).")
+    current_app.logger.info("Fetching all feedback (page %s, per_page %s).", page, per_page)
 
     feedback_list = feedback_services.get_all_feedback(page=page, per_page=per_page)
     return (
@@ -134,10 +178,10 @@ def get_all_feedback():
 @jwt_required()
 def delete_feedback(feedback_id):
     current_user_id = get_jwt_identity()
-    current_app.logger.info(f"User {current_user_id} attempting to delete feedback {feedback_id}.")
+    current_app.logger.info("User %s attempting to delete feedback %s.", current_user_id, feedback_id)
     feedback, error = feedback_services.delete_feedback(feedback_id, current_user_id)
     if error:
-        current_app.logger.warning(f"Failed to delete feedback {feedback_id} by user {current_user_id}: {error}")
+        current_app.logger.warning("Failed to delete feedback %s by user %s: %s", feedback_id, current_user_id, error)
         return jsonify({"msg": error}), 403 if error == "Unauthorized" else 404
-    current_app.logger.info(f"Feedback {feedback_id} deleted successfully by user {current_user_id}.")
+    current_app.logger.info("Feedback %s deleted successfully by user %s.", feedback_id, current_user_id)
     return jsonify({"msg": "Feedback deleted successfully"}), 200
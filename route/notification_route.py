@@ -0,0 +1,78 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from services import notification_services
+from shared.pagination import encode_cursor, decode_cursor
+from shared.serializers import NOTIFICATION
+
+notification_bp = Blueprint("notification", __name__, url_prefix="/notifications")
+
+MAX_NOTIFICATIONS_PER_PAGE = 100
+
+
+def _current_user_id():
+    identity = get_jwt_identity()
+    return int(identity.get("id") if isinstance(identity, dict) else identity)
+
+
+# Inbox, newest first; continue with ?cursor=<next_cursor>
+@notification_bp.route("", methods=["GET"])
+@jwt_required()
+def get_notifications():
+    user_id = _current_user_id()
+    limit = min(
+        max(request.args.get("limit", default=20, type=int), 1),
+        MAX_NOTIFICATIONS_PER_PAGE,
+    )
+    unread_only = request.args.get("unread", "").lower() in ("1", "true", "yes")
+    before_id = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            (before_id,) = decode_cursor(cursor)
+            before_id = int(before_id)
+        except (ValueError, TypeError):
+            return jsonify({"msg": "Invalid cursor"}), 400
+
+    notifications, next_before_id = notification_services.get_inbox(
+        user_id, limit=limit, before_id=before_id, unread_only=unread_only
+    )
+    return (
+        jsonify(
+            {
+                "notifications": NOTIFICATION.many(notifications),
+                "next_cursor": (
+                    encode_cursor(next_before_id) if next_before_id else None
+                ),
+                "unread_count": notification_services.get_unread_count(user_id),
+            }
+        ),
+        200,
+    )
+
+
+@notification_bp.route("/unread-count", methods=["GET"])
+@jwt_required()
+def get_unread_count():
+    user_id = _current_user_id()
+    return (
+        jsonify({"unread_count": notification_services.get_unread_count(user_id)}),
+        200,
+    )
+
+
+@notification_bp.route("/<int:notification_id>/read", methods=["POST"])
+@jwt_required()
+def mark_notification_read(notification_id):
+    user_id = _current_user_id()
+    if not notification_services.mark_read(user_id, notification_id):
+        return jsonify({"msg": "Notification not found"}), 404
+    return jsonify({"msg": "Notification marked as read"}), 200
+
+
+@notification_bp.route("/read-all", methods=["POST"])
+@jwt_required()
+def mark_all_notifications_read():
+    user_id = _current_user_id()
+    updated = notification_services.mark_all_read(user_id)
+    current_app.logger.info("Marked %s notifications read for user %s", updated, user_id)
+    return jsonify({"msg": "All notifications marked as read", "updated": updated}), 200
@@ -1,9 +1,25 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from services import order_services
+from services import order_services, pricing_services
+from shared.serializers import ORDER, ORDER_ITEM, parse_fields
+from datetime import datetime, timedelta
 
 order_bp = Blueprint("order_bp", __name__)
 
+MAX_ORDERS_PER_PAGE = 100
+
+
+def _parse_date_arg(name, end_of_range=False):
+    """Parse an ISO date/datetime query arg. A bare date used as the end of a
+    range covers that whole day. Raises ValueError if malformed."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end_of_range and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
 
 # Create an order with items
 @order_bp.route("/orders", methods=["POST"])
@@ -14,17 +30,18 @@ def create_order():
     voucher_code = data.get("voucher_code")  
     current_user = get_jwt_identity()
 
-    current_app.logger.info(f"User {current_user} is attempting to create an order.")
+    current_app.logger.info("User %s is attempting to create an order.", current_user)
 
     if not items:
         current_app.logger.warning("Order creation failed: No items provided.")
         return jsonify({"msg": "No items to order"}), 400
 
-    required_keys = {"product_id", "quantity", "unit_price"}
+    # unit_price may still be sent by older clients; it is ignored
+    required_keys = {"product_id", "quantity"}
     for idx, item in enumerate(items):
         if not all(key in item for key in required_keys):
             current_app.logger.warning(
-                f"Order creation failed: Item at index {idx} missing keys."
+                "Order creation failed: Item at index %s missing keys.", idx
             )
             return (
                 jsonify(
@@ -40,24 +57,12 @@ def create_order():
     
     order, error = order_services.create_order_with_items(user_id, items, voucher_code)
     if error:
-        current_app.logger.error(f"Order creation failed: {error}")
+        current_app.logger.error("Order creation failed: %s", error)
         return jsonify({"msg": error}), 400
 
-    order_items = order_services.get_order_items(order.id)
-
-    response_items = [
-        {
-            "product_id": item.product_id,
-            "product_name": item.product.name,
-            "quantity": item.quantity,
-            "image_url": item.product.image_url,
-            "unit_price": float(item.unit_price),
-            "vendor_id": item.product.vendor_id,
-        }
-        for item in order_items
-    ]
+    order = order_services.get_order_with_items(order.id)
 
-    current_app.logger.info(f"Order {order.id} created successfully by user {user_id}.")
+    current_app.logger.info("Order %s created successfully by user %s.", order.id, user_id)
 
     return (
         jsonify(
@@ -66,7 +71,7 @@ def create_order():
                 "order_id": order.id,
                 "total_amount": float(order.total_amount),
                 "voucher_code": order.voucher.code if order.voucher else None,
-                "items": response_items,
+                "items": ORDER_ITEM.many(order.order_items),
             }
         ),
         201,
@@ -78,43 +83,14 @@ def create_order():
 @order_bp.route("/orders/<int:order_id>", methods=["GET"])
 @jwt_required()
 def get_order(order_id):
-    current_app.logger.info(f"Fetching order {order_id}.")
-    order = order_services.get_order(order_id)
+    current_app.logger.info("Fetching order %s.", order_id)
+    order = order_services.get_order_with_items(order_id)
     if not order:
-        current_app.logger.warning(f"Order {order_id} not found.")
+        current_app.logger.warning("Order %s not found.", order_id)
         return jsonify({"msg": "Order not found"}), 404
 
-    items = order_services.get_order_items(order_id)
-    current_app.logger.info(f"Order {order_id} fetched successfully.")
-    return (
-        jsonify(
-            {
-                "order": {
-                    "id": order.id,
-                    "total_amount": str(order.total_amount),
-                    "status": order.status,
-                    "created_at": order.created_at.isoformat(),
-                    "items": [
-                        {
-                            "product_id": item.product_id,
-                            "product_name": item.product.name,
-                            "quantity": item.quantity,
-                            "image_url": item.product.image_url,
-                            "unit_price": float(item.unit_price),
-                            "vendor_id": item.product.vendor_id,
-                            "vendor_name": (
-                                item.product.vendor.username
-                                if item.product.vendor
-                                else None
-                            ),
-                        }
-                        for item in items
-                    ],
-                }
-            }
-        ),
-        200,
-    )
+    current_app.logger.info("Order %s fetched successfully.", order_id)
+    return jsonify({"order": ORDER.one(order)}), 200
 
 
 # Get all orders of the current user
@@ -123,42 +99,44 @@ def get_order(order_id):
 def get_user_orders():
     current_user = get_jwt_identity()
     user_id = current_user.get("id") if isinstance(current_user, dict) else current_user
-    current_app.logger.info(f"Fetching all orders for user {user_id}.")
-    orders = order_services.get_user_orders(user_id)
-
-    orders_with_items = []
-    for order in orders:
-        order_items = order_services.get_order_items(order.id)
-        items = [
-            {
-                "product_id": item.product_id,
-                "product_name": item.product.name,
-                "quantity": item.quantity,
-                "image_url": item.product.image_url,
-                "unit_price": float(item.unit_price),
-                "vendor_id": item.product.vendor_id,
-                "vendor_name": (
-                    item.product.vendor.username if item.product.vendor else None
-                ),
-            }
-            for item in order_items
-        ]
-        orders_with_items.append(
-            {
-                "id": order.id,
-                "total_amount": str(order.total_amount),
-                "status": order.status,
-                "created_at": order.created_at.isoformat(),
-                "items": items,
-            }
-        )
+    page = max(request.args.get("page", default=1, type=int), 1)
+    per_page = min(
+        max(request.args.get("limit", default=20, type=int), 1), MAX_ORDERS_PER_PAGE
+    )
+    status = request.args.get("status")
+    try:
+        created_from = _parse_date_arg("date_from")
+        created_to = _parse_date_arg("date_to", end_of_range=True)
+    except ValueError:
+        return jsonify({"msg": "date_from/date_to must be ISO dates"}), 400
+    # Sparse fieldset, e.g. ?fields=id,status,total_amount skips the items
+    try:
+        fields = parse_fields(request.args.get("fields"), ORDER)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    current_app.logger.info("Fetching orders for user %s (page %s).", user_id, page)
+    orders, total = order_services.get_user_order_history(
+        user_id,
+        page=page,
+        per_page=per_page,
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        fields=fields,
+    )
+    serializer = ORDER.only(fields) if fields else ORDER
+    orders_with_items = serializer.many(orders)
 
-    current_app.logger.info(f"Fetched {len(orders_with_items)} orders for user {user_id}.")
+    current_app.logger.info("Fetched %s orders for user %s.", len(orders_with_items), user_id)
 
-    return (
-        jsonify(orders_with_items),
-        200,
-    )
+    # The body stays a plain list for existing clients; paging metadata
+    # travels in headers
+    response = jsonify(orders_with_items)
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Page"] = str(page)
+    response.headers["X-Per-Page"] = str(per_page)
+    return response, 200
 
 
 # Update order status
@@ -169,18 +147,18 @@ def update_order_status(order_id):
     status = data.get("status")
 
     if not status:
-        current_app.logger.warning(f"Order status update failed: No status provided for order {order_id}.")
+        current_app.logger.warning("Order status update failed: No status provided for order %s.", order_id)
         return jsonify({"msg": "Status is required"}), 400
 
     order, error = order_services.update_order_status(order_id, status)
     if error:
         if error == "Order not found.":
-            current_app.logger.warning(f"Order status update failed: {error} (order {order_id})")
+            current_app.logger.warning("Order status update failed: %s (order %s)", error, order_id)
             return jsonify({"msg": error}), 404
-        current_app.logger.error(f"Order status update failed: {error} (order {order_id})")
+        current_app.logger.error("Order status update failed: %s (order %s)", error, order_id)
         return jsonify({"msg": error}), 400
 
-    current_app.logger.info(f"Order {order_id} status updated to {status}.")
+    current_app.logger.info("Order %s status updated to %s.", order_id, status)
     return jsonify({"msg": "Order status updated"}), 200
 
 
@@ -190,10 +168,10 @@ def update_order_status(order_id):
 def delete_order(order_id):
     order, error = order_services.delete_order(order_id)
     if error:
-        current_app.logger.warning(f"Order deletion failed: {error} (order {order_id})")
+        current_app.logger.warning("Order deletion failed: %s (order %s)", error, order_id)
         return jsonify({"msg": error}), 404
 
-    current_app.logger.info(f"Order {order_id} deleted successfully.")
+    current_app.logger.info("Order %s deleted successfully.", order_id)
     return jsonify({"msg": "Order deleted"}), 200
 
 
@@ -207,36 +185,16 @@ def preview_order():
     if not items:
         return jsonify({"msg": "No items provided."}), 400
 
-    required_keys = {"product_id", "quantity", "unit_price"}
+    required_keys = {"product_id", "quantity"}
     for idx, item in enumerate(items):
         if not all(key in item for key in required_keys):
             return jsonify({
                 "msg": f"Item at index {idx} is missing required keys: {required_keys}"
             }), 400
 
-    total_before = sum(item["quantity"] * item["unit_price"] for item in items)
-
-    discount = 0
-    voucher = None
-
-    if voucher_code:
-        from models.voucher import Vouchers
-        from datetime import datetime
-
-        voucher = Vouchers.query.filter_by(code=voucher_code, is_active=True).first()
-        if not voucher or (voucher.expires_at and voucher.expires_at < datetime.utcnow()):
-            return jsonify({"msg": "Voucher is invalid or expired."}), 400
-
-        if voucher.discount_percent:
-            discount = total_before * (voucher.discount_percent / 100)
-        elif voucher.discount_amount:
-            discount = float(voucher.discount_amount)
-
-    total_after = max(total_before - discount, 0)
+    try:
+        pricing = pricing_services.price_items(items, voucher_code)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
-    return jsonify({
-        "total_before_discount": total_before,
-        "discount_amount": discount,
-        "total_after_discount": total_after,
-        "voucher_code": voucher.code if voucher else None
-    }), 200
+    return jsonify(pricing_services.serialize_pricing(pricing)), 200
@@ -10,17 +10,17 @@ product_category_bp = Blueprint("product_category_bp", __name__)
 def add_category(product_id):
     data = request.get_json()
     category_id = data.get("category_id")
-    current_app.logger.info(f"Vendor attempting to assign category {category_id} to product {product_id}.")
+    current_app.logger.info("Vendor attempting to assign category %s to product %s.", category_id, product_id)
     if not category_id:
         current_app.logger.warning("Category assignment failed: category_id required.")
         return jsonify({"message": "category_id required"}), 400
 
     relation = product_category_service.assign_category(product_id, category_id)
     if not relation:
-        current_app.logger.warning(f"Category assignment failed for product {product_id} and category {category_id}.")
+        current_app.logger.warning("Category assignment failed for product %s and category %s.", product_id, category_id)
         return jsonify({"message": "Category already assigned or failed"}), 400
 
-    current_app.logger.info(f"Category {category_id} assigned to product {product_id} successfully.")
+    current_app.logger.info("Category %s assigned to product %s successfully.", category_id, product_id)
     return (
         jsonify(
             {
@@ -36,7 +36,7 @@ def add_category(product_id):
 @product_category_bp.route("/products/<int:product_id>/categories", methods=["GET"])
 @role_required("customer", "vendor")
 def get_categories(product_id):
-    current_app.logger.info(f"Fetching categories for product {product_id}.")
+    current_app.logger.info("Fetching categories for product %s.", product_id)
     relations = product_category_service.get_product_categories(product_id)
     return (
         jsonify(
@@ -57,10 +57,10 @@ def get_categories(product_id):
 )
 @role_required("vendor")
 def delete_category(product_id, category_id):
-    current_app.logger.info(f"Vendor attempting to remove category {category_id} from product {product_id}.")
+    current_app.logger.info("Vendor attempting to remove category %s from product %s.", category_id, product_id)
     success = product_category_service.remove_category(product_id, category_id)
     if not success:
-        current_app.logger.warning(f"Category removal failed: relation not found for product {product_id} and category {category_id}.")
+        current_app.logger.warning("Category removal failed: relation not found for product %s and category %s.", product_id, category_id)
         return jsonify({"message": "Relation not found"}), 404
-    current_app.logger.info(f"Category {category_id} removed from product {product_id} successfully.")
+    current_app.logger.info("Category %s removed from product %s successfully.", category_id, product_id)
     return jsonify({"message": "Category removed"}), 200
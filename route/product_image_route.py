@@ -2,6 +2,7 @@ import os
 from flask import Blueprint, request, jsonify, send_from_directory, current_app
 from services import product_image_services as product_image_service
 from shared.auth import role_required
+from shared.conditional import compute_etag, conditional_response
 from werkzeug.utils import secure_filename
 
 product_image_bp = Blueprint("product_image_bp", __name__)
@@ -13,22 +14,22 @@ UPLOAD_FOLDER = "uploads"
 @role_required("vendor")
 def upload_image(product_id):
     if "image" not in request.files:
-        current_app.logger.warning(f"Image upload failed: No file part in request for product {product_id}.")
+        current_app.logger.warning("Image upload failed: No file part in request for product %s.", product_id)
         return jsonify({"message": "No file part in the request"}), 400
 
     file = request.files["image"]
 
     if file.filename == "":
-        current_app.logger.warning(f"Image upload failed: No selected file for product {product_id}.")
+        current_app.logger.warning("Image upload failed: No selected file for product %s.", product_id)
         return jsonify({"message": "No selected file"}), 400
 
     result = product_image_service.save_uploaded_image(product_id, file)
 
     if not result:
-        current_app.logger.error(f"Image upload failed for product {product_id}.")
+        current_app.logger.error("Image upload failed for product %s.", product_id)
         return jsonify({"message": "Failed to upload image"}), 500
 
-    current_app.logger.info(f"Image uploaded successfully for product {product_id}: {result['filename']}")
+    current_app.logger.info("Image uploaded successfully for product %s: %s", product_id, result['filename'])
     return (
         jsonify(
             {
@@ -45,7 +46,7 @@ def upload_image(product_id):
 @role_required("vendor")
 def create_images(product_id):
     data = request.get_json()
-    current_app.logger.info(f"Creating images for product {product_id}.")
+    current_app.logger.info("Creating images for product %s.", product_id)
     images = product_image_service.add_images(product_id, data)
     return (
         jsonify(
@@ -62,21 +63,26 @@ def create_images(product_id):
 
 @product_image_bp.route("/products/<int:product_id>/images", methods=["GET"])
 def get_images(product_id):
-    current_app.logger.info(f"Fetching images for product {product_id}.")
+    current_app.logger.info("Fetching images for product %s.", product_id)
     images = product_image_service.get_images(product_id)
     if not images:
-        current_app.logger.warning(f"No images found for product {product_id}.")
+        current_app.logger.warning("No images found for product %s.", product_id)
         return jsonify({"message": "No images found"}), 404
-    return (
-        jsonify(
-            {
-                "product_id": images.product_id,
-                "image1_url": images.image1_url,
-                "image2_url": images.image2_url,
-                "image3_url": images.image3_url,
-            }
+    etag = compute_etag("images", images.id, images.updated_at)
+    return conditional_response(
+        etag,
+        lambda: (
+            jsonify(
+                {
+                    "product_id": images.product_id,
+                    "image1_url": images.image1_url,
+                    "image2_url": images.image2_url,
+                    "image3_url": images.image3_url,
+                }
+            ),
+            200,
         ),
-        200,
+        last_modified=images.updated_at,
     )
 
 
@@ -84,10 +90,10 @@ def get_images(product_id):
 @role_required("vendor")
 def update_images(product_id):
     data = request.get_json()
-    current_app.logger.info(f"Updating images for product {product_id}.")
+    current_app.logger.info("Updating images for product %s.", product_id)
     updated = product_image_service.update_images(product_id, data)
     if not updated:
-        current_app.logger.warning(f"Images not found for update on product {product_id}.")
+        current_app.logger.warning("Images not found for update on product %s.", product_id)
         return jsonify({"message": "Images not found"}), 404
     return (
         jsonify(
@@ -106,10 +112,10 @@ def update_images(product_id):
 @product_image_bp.route("/products/<int:product_id>/images", methods=["DELETE"])
 @role_required("vendor", "admin")
 def delete_images(product_id):
-    current_app.logger.info(f"Deleting images for product {product_id}.")
+    current_app.logger.info("Deleting images for product %s.", product_id)
     success = product_image_service.delete_images(product_id)
     if not success:
-        current_app.logger.warning(f"Images not found for deletion on product {product_id}.")
+        current_app.logger.warning("Images not found for deletion on product %s.", product_id)
         return jsonify({"message": "Images not found"}), 404
-    current_app.logger.info(f"Images deleted successfully for product {product_id}.")
+    current_app.logger.info("Images deleted successfully for product %s.", product_id)
     return jsonify({"message": "Images deleted successfully"}), 200
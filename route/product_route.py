@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import (
     jwt_required,
     get_jwt_identity,
@@ -15,8 +15,13 @@ from services.product_services import (
     approve_product_by_id,  # Add this if needed
 )
 import services.product_services as product_services
-from marshmallow import Schema, fields, ValidationError
+from services import product_bulk_services
+from marshmallow import EXCLUDE, Schema, fields, ValidationError
+from shared import bulk_io
 from shared.limiter import limiter
+from shared.conditional import conditional_response
+from shared.serializers import PRODUCT, parse_fields
+from datetime import datetime
 
 product_bp = Blueprint("product_bp", __name__)
 
@@ -50,11 +55,25 @@ def get_all_products():
     category_slug = request.args.get("category", type=str)  # 🆕 Support category slug
     page = request.args.get("page", default=1, type=int)
     limit = request.args.get("limit", default=10, type=int)
-    sort_by = request.args.get("sort_by", default="created_at", type=str)
+    sort_by = request.args.get("sort_by", type=str)  # default: relevance if searching
     sort_order = request.args.get("sort_order", default="desc", type=str)
     include_unapproved = (
         request.args.get("include_unapproved", "false").lower() == "true"
     )
+    # Keyset pagination: opt in with ?pagination=cursor (first page) or by
+    # passing the next_cursor of a previous response
+    cursor = request.args.get("cursor") or None
+    use_cursor = cursor is not None or request.args.get("pagination") == "cursor"
+    # The COUNT over the whole filtered set is optional in cursor mode
+    include_total = (
+        request.args.get("include_total", "false" if use_cursor else "true").lower()
+        == "true"
+    )
+    # Sparse fieldset, e.g. ?fields=id,name,price,image_url for grid views
+    try:
+        product_fields = parse_fields(request.args.get("fields"), PRODUCT)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
     # 🆕 If frontend sends category slug
     if category_slug and not category_id:
@@ -83,25 +102,45 @@ def get_all_products():
         if role != "admin":
             return jsonify({"message": "Forbidden: Admins only"}), 403
 
-    products = get_all_serialized_products(
+    listing_args = dict(
         search=search,
         category_id=category_id,
         page=page,
         limit=limit,
         sort_by=sort_by,
         sort_order=sort_order,
+        use_cursor=use_cursor,
+        cursor=cursor,
+        include_total=include_total,
+        fields=product_fields,
     )
 
-    return jsonify(products), 200
+    def build():
+        try:
+            return jsonify(get_all_serialized_products(**listing_args)), 200
+        except ValueError as e:
+            current_app.logger.warning("GET /products rejected: %s", str(e))
+            return jsonify({"message": str(e)}), 400
+
+    etag = product_services.get_product_list_etag(**listing_args)
+    return conditional_response(etag, build)
 
 
 @product_bp.route("/products/<int:product_id>", methods=["GET"])
 def get_product(product_id):
     current_app.logger.info("GET /products/%s called", product_id)
-    product = get_serialized_product_by_id(product_id)
-    if not product:
+    validators = product_services.get_product_validators(product_id)
+    if not validators:
         return jsonify({"message": "Product not found"}), 404
-    return jsonify(product), 200
+    etag, last_modified = validators
+
+    def build():
+        product = get_serialized_product_by_id(product_id)
+        if not product:
+            return jsonify({"message": "Product not found"}), 404
+        return jsonify(product), 200
+
+    return conditional_response(etag, build, last_modified=last_modified)
 
 
 @product_bp.route("/products", methods=["POST"])
@@ -211,3 +250,114 @@ def reject_product(product_id):
             "Product reject failed: %s (id=%s)", str(e), product_id
         )
         return {"message": str(e)}, 404
+
+
+# Bulk import: a CSV (header row, category_ids as "1;2") or NDJSON file,
+# uploaded as multipart "file" or sent as the raw request body
+@product_bp.route("/products/import", methods=["POST"])
+@jwt_required()
+@limiter.limit("5 per minute")
+@role_required("vendor")
+def import_products():
+    vendor_id = int(get_jwt_identity())
+    upload = request.files.get("file")
+    fmt = bulk_io.detect_format(
+        request.args.get("format"),
+        upload.mimetype if upload else request.mimetype,
+        upload.filename if upload else None,
+    )
+    if fmt is None:
+        return (
+            jsonify({"msg": "Send a CSV or NDJSON file (or pass ?format=csv|ndjson)"}),
+            400,
+        )
+    stream = upload.stream if upload else request.stream
+
+    current_app.logger.info("POST /products/import (%s) called by vendor: %s", fmt, vendor_id)
+    records = bulk_io.iter_records(stream, fmt, list_fields=("category_ids",))
+    report = product_bulk_services.import_products(
+        vendor_id, records, lambda record: product_schema.load(record, unknown=EXCLUDE)
+    )
+    status = 201 if report["created"] else 400
+    return jsonify({"message": "Import finished", **report}), status
+
+
+# Streamed export of the caller's catalog (admins: any vendor's, ?vendor_id=)
+@product_bp.route("/products/export", methods=["GET"])
+@jwt_required()
+@role_required("vendor", "admin")
+def export_products():
+    fmt = bulk_io.detect_format(request.args.get("format", "csv"))
+    if fmt is None:
+        return jsonify({"msg": "format must be csv or ndjson"}), 400
+    if get_jwt().get("role") == "admin":
+        vendor_id = request.args.get("vendor_id", type=int)
+        if vendor_id is None:
+            return jsonify({"msg": "vendor_id is required"}), 400
+    else:
+        vendor_id = int(get_jwt_identity())
+
+    current_app.logger.info("GET /products/export (%s) for vendor %s", fmt, vendor_id)
+    body = stream_with_context(product_bulk_services.export_products(vendor_id, fmt))
+    return Response(
+        body,
+        mimetype=bulk_io.FORMATS[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename=products-{vendor_id}.{fmt}"
+        },
+    )
+
+
+def _parse_queue_filter(raw, max_batch):
+    """Review-queue filter of a bulk moderation request; raises ValueError
+    (or TypeError) when malformed."""
+
+    def optional(key, convert):
+        return convert(raw[key]) if raw.get(key) is not None else None
+
+    limit = min(int(raw.get("limit", max_batch)), max_batch)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return {
+        "vendor_id": optional("vendor_id", int),
+        "category_id": optional("category_id", int),
+        "created_before": optional("created_before", datetime.fromisoformat),
+        "limit": limit,
+    }
+
+
+# Batch moderation: {"ids": [...]} or {"filter": {"vendor_id", "category_id",
+# "created_before", "limit"}} picking from the head of the review queue
+@product_bp.route("/products/bulk/<action>", methods=["PATCH"])
+@jwt_required()
+@role_required("admin")
+def bulk_moderate_products(action):
+    if action not in product_bulk_services.MODERATION_ACTIONS:
+        return jsonify({"msg": "Action must be approve or reject"}), 404
+    data = request.get_json(silent=True) or {}
+    max_batch = current_app.config["PRODUCT_MODERATION_MAX_BATCH"]
+
+    ids = data.get("ids")
+    queue_filter = None
+    if ids is not None:
+        if (
+            not isinstance(ids, list)
+            or not ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+        ):
+            return jsonify({"msg": "ids must be a non-empty list of integers"}), 400
+        if len(ids) > max_batch:
+            return jsonify({"msg": f"At most {max_batch} ids per request"}), 400
+    elif isinstance(data.get("filter"), dict):
+        try:
+            queue_filter = _parse_queue_filter(data["filter"], max_batch)
+        except (TypeError, ValueError):
+            return jsonify({"msg": "Invalid filter"}), 400
+    else:
+        return jsonify({"msg": "Send ids or a filter"}), 400
+
+    current_app.logger.info(
+        "PATCH /products/bulk/%s called by user: %s", action, get_jwt_identity()
+    )
+    result = product_bulk_services.moderate_products(action, ids, queue_filter)
+    return jsonify(result), 200
@@ -4,23 +4,32 @@ from models.voucher import Vouchers
 from instance.database import db
 from datetime import datetime
 from shared.auth import role_required
+from services.voucher_services import (
+    clear_voucher_cache,
+    get_all_vouchers,
+    get_vouchers_etag,
+)
+from shared.conditional import conditional_response
 
 voucher_bp = Blueprint("voucher_bp", __name__)
 
 @voucher_bp.route("/vouchers", methods=["GET"])
 def get_vouchers():
-    vouchers = Vouchers.query.all()
-    return jsonify([
-        {
-            "id": v.id,
-            "code": v.code,
-            "discount_percent": float(v.discount_percent) if v.discount_percent else None,
-            "discount_amount": float(v.discount_amount) if v.discount_amount else None,
-            "is_active": v.is_active,
-            "expires_at": v.expires_at.isoformat() if v.expires_at else None
-        }
-        for v in vouchers
-    ])
+    def build():
+        vouchers = get_all_vouchers()
+        return jsonify([
+            {
+                "id": v.id,
+                "code": v.code,
+                "discount_percent": float(v.discount_percent) if v.discount_percent else None,
+                "discount_amount": float(v.discount_amount) if v.discount_amount else None,
+                "is_active": v.is_active,
+                "expires_at": v.expires_at.isoformat() if v.expires_at else None
+            }
+            for v in vouchers
+        ])
+
+    return conditional_response(get_vouchers_etag(), build)
 
 
 @voucher_bp.route("/vouchers/<int:voucher_id>", methods=["GET"])
@@ -53,6 +62,7 @@ def create_voucher():
     )
     db.session.add(voucher)
     db.session.commit()
+    clear_voucher_cache()
     return jsonify({"msg": "Voucher created", "id": voucher.id}), 201
 
 
@@ -73,6 +83,7 @@ def update_voucher(voucher_id):
         voucher.expires_at = datetime.fromisoformat(data["expires_at"]) if data["expires_at"] else None
 
     db.session.commit()
+    clear_voucher_cache()
     return jsonify({"msg": "Voucher updated"}), 200
 
 @voucher_bp.route("/vouchers/<int:voucher_id>", methods=["DELETE"])
@@ -90,6 +101,7 @@ def delete_voucher(voucher_id):
 
     db.session.delete(voucher)
     db.session.commit()
+    clear_voucher_cache()
     return jsonify({"msg": "Voucher deleted"}), 200
 
 
@@ -103,4 +115,5 @@ def deactivate_voucher(voucher_id):
 
     voucher.is_active = False
     db.session.commit()
+    clear_voucher_cache()
     return jsonify({"msg": f"Voucher '{voucher.code}' deactivated"}), 200
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from sqlalchemy.exc import IntegrityError
+
+from instance.database import db
+from repo import balance_repo
+
+
+def apply_balance_change(
+    user_id, amount, kind, idempotency_key=None, reference=None
+):
+    """Change a balance by ``amount`` and record it in the ledger.
+
+    The balance moves with ``SET balance = balance + :amount`` so concurrent
+    changes never overwrite each other. With an ``idempotency_key`` a
+    replayed operation is recognised (by the unique (user_id, key) index,
+    even when racing) and returns the original entry without applying it
+    again.
+
+    Returns ``(transaction, applied)``; raises ValueError if the user does
+    not exist. Does not commit.
+    """
+    amount = Decimal(str(amount))
+
+    if idempotency_key:
+        existing = balance_repo.get_transaction_by_key(user_id, idempotency_key)
+        if existing:
+            return existing, False
+
+    try:
+        with db.session.begin_nested():
+            balance_after = balance_repo.increment_balance_returning(user_id, amount)
+            if balance_after is None:
+                raise ValueError("User not found")
+            transaction = balance_repo.create_transaction(
+                {
+                    "user_id": user_id,
+                    "amount": amount,
+                    "balance_after": balance_after,
+                    "kind": kind,
+                    "reference": reference,
+                    "idempotency_key": idempotency_key,
+                }
+            )
+    except IntegrityError:
+        # A concurrent request with the same key won; its increment stands
+        # and ours was rolled back with the savepoint
+        if not idempotency_key:
+            raise
+        return balance_repo.get_transaction_by_key(user_id, idempotency_key), False
+
+    return transaction, True
+
+
+def get_balance_history(user_id, limit=20, before_id=None):
+    return balance_repo.get_transactions_by_user(user_id, limit=limit, before_id=before_id)
+
+
+def serialize_transaction(transaction):
+    return {
+        "id": transaction.id,
+        "amount": float(transaction.amount),
+        "balance_after": float(transaction.balance_after),
+        "kind": transaction.kind,
+        "reference": transaction.reference,
+        "created_at": transaction.created_at.isoformat() if transaction.created_at else None,
+    }
@@ -1,5 +1,6 @@
 from repo import cart_repo, cart_item_repo
 from instance.database import db
+from sqlalchemy.exc import IntegrityError
 
 
 def get_or_create_cart(user_id):
@@ -20,6 +21,13 @@ def add_item_to_cart(user_id, product_id, quantity):
         item = cart_item_repo.add_cart_item(cart.id, product_id, quantity)
         db.session.commit()
         return item
+    except IntegrityError:
+        # Lost a race with a concurrent insert of the same product (one row
+        # per cart and product); add to the row that won instead
+        db.session.rollback()
+        item = cart_item_repo.add_cart_item(cart.id, product_id, quantity)
+        db.session.commit()
+        return item
     except Exception:
         db.session.rollback()
         raise
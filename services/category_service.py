@@ -1,16 +1,102 @@
 # services/category_services.py
 
+import hashlib
+import json
+
+from flask import current_app
 from sqlalchemy.exc import IntegrityError
 from repo import category_repo
 from models.category import Categories
-
-
+from shared.conditional import compute_etag
+from shared.cache import (
+    cache_get,
+    cache_set,
+    get_namespace_version,
+    bump_namespace_version,
+)
+
+CATEGORY_TREE_CACHE_NAMESPACE = "categories:tree"
+INVALID_PARENT = "A category cannot be nested under itself or its subcategories"
+
+
+def build_category_tree(rows):
+    """Nest flat ``(id, name, slug, image_url, parent_id, product_count)``
+    rows under their parents. Categories whose parent is missing become
+    roots, and so does the category that would close a parent cycle;
+    siblings keep the order of ``rows``."""
+    nodes = {
+        row.id: {
+            "id": row.id,
+            "name": row.name,
+            "slug": row.slug,
+            "image_url": row.image_url,
+            "parent_id": row.parent_id,
+            "product_count": row.product_count,
+            "children": [],
+        }
+        for row in rows
+    }
+    roots = []
+    attached = {}  # child id -> parent id, acyclic by construction
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"])
+        if parent is not None and not _closes_cycle(node["id"], parent["id"], attached):
+            parent["children"].append(node)
+            attached[node["id"]] = parent["id"]
+        else:
+            roots.append(node)
+    return roots
+
+
+def _closes_cycle(category_id, parent_id, parents):
+    """Whether ``category_id`` is ``parent_id`` or one of its ancestors in
+    the ``parents`` (child id -> parent id) mapping."""
+    seen = set()
+    while parent_id is not None and parent_id not in seen:
+        if parent_id == category_id:
+            return True
+        seen.add(parent_id)
+        parent_id = parents.get(parent_id)
+    return False
+
+
+def get_category_tree():
+    """Return ``(tree, etag)`` for the nested category menu.
+
+    Built from one aggregate query and cached until a category or product
+    change bumps the namespace version.
+    """
+    version = get_namespace_version(CATEGORY_TREE_CACHE_NAMESPACE)
+    cache_key = f"{CATEGORY_TREE_CACHE_NAMESPACE}:{version}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached["tree"], cached["etag"]
+
+    tree = build_category_tree(category_repo.get_categories_with_product_counts())
+    etag = hashlib.sha1(
+        json.dumps(tree, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+    cache_set(
+        cache_key,
+        {"tree": tree, "etag": etag},
+        timeout=current_app.config.get("CATEGORY_TREE_CACHE_TIMEOUT", 300),
+    )
+    return tree, etag
+
+
+def clear_category_tree_cache():
+    bump_namespace_version(CATEGORY_TREE_CACHE_NAMESPACE)
 
 
 def get_all_categories():
     
     return category_repo.get_all_categories()
 
+
+def get_categories_etag():
+    count, last_updated = category_repo.get_categories_probe()
+    return compute_etag("categories", count, last_updated)
+
 def create_category(data, current_user):
     from instance.database import db
 
@@ -22,6 +108,7 @@ def create_category(data, current_user):
             data["vendor_id"] = current_user["id"]  # associate with logged-in vendor
         category = category_repo.create_category(data)
         db.session.commit()
+        clear_category_tree_cache()
         
         return category, None
     except IntegrityError as e:
@@ -55,10 +142,19 @@ def update_category(category_id, data, current_user):
     if category.vendor_id != current_user_id and current_user_role != "admin":
         return None, "Unauthorized"
 
+    parent_id = data.get("parent_id")
+    if parent_id is not None and _closes_cycle(
+        category.id, parent_id, category_repo.get_parent_ids()
+    ):
+        return None, INVALID_PARENT
+
     try:
         updated_category = category_repo.update_category(category, data)
         db.session.commit()
-        
+        # Product payloads embed category names and slugs (clears the tree too)
+        from services.product_services import clear_all_product_list_cache
+
+        clear_all_product_list_cache()
 
         return updated_category, None
     except Exception as e:
@@ -88,7 +184,9 @@ def delete_category(category_id, current_user):
     try:
         category_repo.delete_category(category)
         db.session.commit()
-       
+        from services.product_services import clear_all_product_list_cache
+
+        clear_all_product_list_cache()
 
         return category, None
     except Exception as e:
@@ -0,0 +1,122 @@
+import smtplib
+import uuid
+from datetime import timedelta
+from flask import current_app
+from flask_mail import Message
+from instance.database import db
+from repo import email_outbox_repo
+from shared import crono
+from shared.jobs import job
+
+DEFAULT_SENDER = "noreply@bumibrew.com"
+
+
+def queue_email(recipient, subject, body):
+    """Add an email to the outbox. Nothing is sent in-request: the row is
+    committed with the caller's transaction and delivered by the worker."""
+    return email_outbox_repo.enqueue_email(recipient, subject, body)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff after the ``attempts``-th failed attempt."""
+    base = current_app.config.get("EMAIL_RETRY_BASE_SECONDS", 30)
+    cap = current_app.config.get("EMAIL_RETRY_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(cap, base * 2 ** (attempts - 1)))
+
+
+def _sender():
+    return current_app.extensions["mail"].default_sender or DEFAULT_SENDER
+
+
+def _record_failure(email, error):
+    attempts = email.attempts + 1
+    if attempts >= current_app.config.get("EMAIL_MAX_ATTEMPTS", 5):
+        retry_at = None
+        current_app.logger.error(
+            "Giving up on email %s to %s after %s attempts: %s",
+            email.id,
+            email.recipient,
+            attempts,
+            error,
+        )
+    else:
+        retry_at = crono.now() + retry_delay(attempts)
+        current_app.logger.warning(
+            "Email %s to %s failed (attempt %s), retrying at %s: %s",
+            email.id,
+            email.recipient,
+            attempts,
+            retry_at,
+            error,
+        )
+    email_outbox_repo.mark_attempt_failed(email.id, str(error), retry_at)
+
+
+def deliver_pending_emails(batch_size=None):
+    """Send one batch of due outbox emails over a single SMTP connection.
+
+    Returns (sent, failed). A message the server rejects is retried with
+    exponential backoff up to EMAIL_MAX_ATTEMPTS; if the connection itself
+    fails, every message not yet sent in the batch is rescheduled.
+    """
+    batch_size = batch_size or current_app.config.get("EMAIL_OUTBOX_BATCH_SIZE", 50)
+    now = crono.now()
+    claim_until = now + timedelta(
+        seconds=current_app.config.get("EMAIL_CLAIM_TIMEOUT_SECONDS", 300)
+    )
+    try:
+        emails = email_outbox_repo.claim_due_emails(
+            now, batch_size, uuid.uuid4().hex, claim_until
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if not emails:
+        return 0, 0
+
+    sender = _sender()
+    sent_ids = []
+    failed = 0
+    remaining = list(emails)
+    try:
+        with current_app.extensions["mail"].connect() as connection:
+            while remaining:
+                email = remaining[0]
+                message = Message(
+                    subject=email.subject,
+                    sender=sender,
+                    recipients=[email.recipient],
+                    body=email.body,
+                )
+                try:
+                    connection.send(message)
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except smtplib.SMTPException as e:
+                    # Rejected by the server; the connection is still usable
+                    _record_failure(email, e)
+                    failed += 1
+                else:
+                    sent_ids.append(email.id)
+                remaining.pop(0)
+    except (smtplib.SMTPException, OSError) as e:
+        for email in remaining:
+            _record_failure(email, e)
+            failed += 1
+
+    try:
+        email_outbox_repo.mark_sent(sent_ids, crono.now())
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    current_app.logger.info("Outbox batch: %s sent, %s failed", len(sent_ids), failed)
+    return len(sent_ids), failed
+
+
+@job("email.deliver_outbox", max_attempts=1, every=10)
+def deliver_outbox():
+    """Periodic job: send batches until nothing is due."""
+    while any(deliver_pending_emails()):
+        pass
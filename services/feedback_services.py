@@ -1,8 +1,12 @@
-from repo import feedback_repo
+from repo import feedback_repo, product_repo
+from services.product_services import clear_all_product_list_cache
 from models.user import Users  # Needed for email to user lookup
 from instance.database import db
+import logging
 # from shared.cache import cache
 
+logger = logging.getLogger(__name__)
+
 
 
 def create_feedback(data, current_user_id):
@@ -33,28 +37,54 @@ def create_feedback(data, current_user_id):
 
     try:
         feedback = feedback_repo.create_feedback(data)
+        # Aggregates move in the same transaction as the review row
+        if not product_repo.adjust_rating(feedback.product_id, feedback.rating, 1):
+            db.session.rollback()
+            return None, "Product not found"
         db.session.commit()
+        # Listings show (and sort by) the rating
+        clear_all_product_list_cache()
 
     # ✅ Add these below existing lines
      
 
     except Exception as e:
         db.session.rollback()
-        print(f"Exception creating feedback: {e}, data: {data}")
+        logger.exception(
+            "Creating feedback failed (user %s, product %s)",
+            user.id,
+            data.get("product_id"),
+        )
         return None, "Failed to create feedback"
 
     return feedback, None
 
-#@cache.cached(timeout=60)
-def get_feedback_by_product(product_id):
-    return feedback_repo.get_feedback_by_product(product_id)
+RATINGS = range(1, 6)
+
+
+def _feedback_page(limit, **filters):
+    # One extra row tells whether another page exists
+    rows = feedback_repo.get_feedback_page(limit=limit + 1, **filters)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, ((rows[-1].created_at, rows[-1].id) if has_more else None)
+
 
+def get_feedback_by_product(product_id, limit=20, before=None, rating=None):
+    """Return (feedback, next_before); the latter is None on the last page."""
+    return _feedback_page(limit, product_id=product_id, rating=rating, before=before)
 
-def get_feedback_by_user(user_id):
-    return feedback_repo.get_feedback_by_user(user_id)
 
+def get_feedback_by_user(user_id, limit=20, before=None, rating=None):
+    """Return (feedback, next_before); the latter is None on the last page."""
+    return _feedback_page(limit, user_id=user_id, rating=rating, before=before)
+
+
+def get_rating_histogram(product_id):
+    """Review count per star, every star present (``{"1": 0, ...}``)."""
+    counts = feedback_repo.get_rating_histogram(product_id)
+    return {str(star): counts.get(star, 0) for star in RATINGS}
 
-# ✅ Fix here: accept page and per_page
 
 def get_all_feedback(page=1, per_page=10):
     return feedback_repo.get_all_feedback(page=page, per_page=per_page)
@@ -68,9 +98,9 @@ def delete_feedback(feedback_id, current_user_id):
     if error:
         return None, error
     try:
+        product_repo.adjust_rating(feedback.product_id, -feedback.rating, -1)
         db.session.commit()
-        
-
+        clear_all_product_list_cache()
         return feedback, None
     except Exception:
         db.session.rollback()
@@ -0,0 +1,119 @@
+"""In-app notifications.
+
+Writes run on the job worker (``notify_user.delay(...)`` and friends), so a
+fan-out to thousands of wishlisters never holds up a request. The unread
+badge is served from a per-user cached counter that is dropped whenever the
+user's notifications change, so page loads do not run COUNT(*).
+"""
+
+from flask import current_app
+from instance.database import db
+from repo import notification_repo
+from shared.cache import cache_delete, cache_get, cache_set
+from shared.jobs import job
+
+
+def _unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def forget_unread_counts(user_ids):
+    keys = [_unread_key(user_id) for user_id in user_ids]
+    for start in range(0, len(keys), 1000):
+        cache_delete(*keys[start : start + 1000])
+
+
+def get_unread_count(user_id):
+    key = _unread_key(user_id)
+    count = cache_get(key)
+    if count is None:
+        count = notification_repo.count_unread(user_id)
+        cache_set(
+            key, count, timeout=current_app.config["NOTIFICATION_UNREAD_CACHE_TTL"]
+        )
+    return count
+
+
+def get_inbox(user_id, limit=20, before_id=None, unread_only=False):
+    """Return (notifications, next_before_id); the latter is None on the
+    last page."""
+    rows = notification_repo.get_inbox(
+        user_id, limit=limit + 1, before_id=before_id, unread_only=unread_only
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1].id if has_more else None)
+
+
+def mark_read(user_id, notification_id):
+    """Mark one notification read; False if it is not the user's."""
+    if not notification_repo.notification_exists(user_id, notification_id):
+        return False
+    try:
+        changed = notification_repo.mark_read(user_id, [notification_id])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if changed:
+        forget_unread_counts([user_id])
+    return True
+
+
+def mark_all_read(user_id):
+    """One UPDATE for the whole inbox; returns how many were unread."""
+    try:
+        changed = notification_repo.mark_all_read(user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    forget_unread_counts([user_id])
+    return changed
+
+
+@job("notifications.notify_user", max_attempts=5)
+def notify_user(user_id, message, link=None):
+    """Store an in-app notification; enqueued with ``notify_user.delay``."""
+    notification_repo.create_notification(user_id, message, link)
+    db.session.commit()
+    forget_unread_counts([user_id])
+
+
+@job("notifications.notify_users", max_attempts=5)
+def notify_users(user_ids, message, link=None):
+    """Fan one message out to many users in batched multi-row inserts."""
+    batch_size = current_app.config["NOTIFICATION_FANOUT_BATCH_SIZE"]
+    user_ids = list(dict.fromkeys(user_ids))
+    # One transaction, so a retried job never delivers twice
+    for start in range(0, len(user_ids), batch_size):
+        notification_repo.bulk_create_notifications(
+            user_ids[start : start + batch_size], message, link
+        )
+    db.session.commit()
+    forget_unread_counts(user_ids)
+    return len(user_ids)
+
+
+@job("notifications.notify_wishlisters", max_attempts=5)
+def notify_wishlisters(product_id, message, link=None):
+    """Notify everyone who wishlisted ``product_id``, a batch at a time."""
+    batch_size = current_app.config["NOTIFICATION_FANOUT_BATCH_SIZE"]
+    notified = []
+    last_user_id = 0
+    while True:
+        user_ids = notification_repo.get_wishlister_ids(
+            product_id, after_user_id=last_user_id, limit=batch_size
+        )
+        if not user_ids:
+            break
+        notification_repo.bulk_create_notifications(user_ids, message, link)
+        notified.extend(user_ids)
+        last_user_id = user_ids[-1]
+    db.session.commit()
+    forget_unread_counts(notified)
+    if notified:
+        current_app.logger.info(
+            "Notified %s wishlisters of product %s", len(notified), product_id
+        )
+    return len(notified)
@@ -1,6 +1,6 @@
 from models.product import Products
-from models.voucher import Vouchers
-from repo import order_repo
+from repo import order_repo, reservation_repo
+from services import notification_services, pricing_services, reservation_services
 from sqlalchemy.exc import IntegrityError
 from instance.database import db
 from datetime import datetime
@@ -17,56 +17,33 @@ ALLOWED_STATUS_TRANSITIONS = {
 
 
 def create_order_with_items(user_id, items, voucher_code=None):  # ✅ Accept voucher_code
-    total_amount = sum(item["quantity"] * item["unit_price"] for item in items)
-
-    # ✅ Voucher logic before DB transaction
-    voucher = None
-    discount_amount = 0
-
-    if voucher_code:
-        voucher = Vouchers.query.filter_by(code=voucher_code, is_active=True).first()
-        if not voucher or (voucher.expires_at and voucher.expires_at < datetime.utcnow()):
-            raise ValueError("Voucher is invalid or expired.")
-
-        if voucher.discount_percent:
-            discount_amount += total_amount * (voucher.discount_percent / 100)
-        elif voucher.discount_amount:
-            discount_amount += float(voucher.discount_amount)
-
-    final_amount = max(total_amount - discount_amount, 0)
-
+    """Place an order priced from the catalog; client-sent unit prices are
+    ignored."""
     try:
+        pricing = pricing_services.price_items(items, voucher_code)
+
         with db.session.begin_nested():
             order_data = {
                 "user_id": user_id,
-                "total_amount": final_amount,
+                "total_amount": pricing["total"],
                 "status": "pending",
             }
-            if voucher:
-                order_data["voucher_id"] = voucher.id  # ✅ Add if voucher valid
+            if pricing["voucher"]:
+                order_data["voucher_id"] = pricing["voucher"].id  # ✅ Add if voucher valid
 
             order = order_repo.create_order(order_data)
 
-            for item in items:
-                product = db.session.get(Products, item["product_id"])
-                if not product:
-                    raise ValueError(f"Product with id {item['product_id']} not found.")
-
-                if product.stock_quantity <= 0:
-                    raise ValueError(f"Product {product.name} is out of stock.")
-
-                if item["quantity"] > product.stock_quantity:
-                    raise ValueError(
-                        f"Requested quantity for {product.name} exceeds stock."
-                    )
+            # Take the stock now, atomically, rather than at completion
+            reservation_services.reserve_stock(order.id, pricing["lines"])
 
+            for line in pricing["lines"]:
                 order_repo.create_order_item(
                     {
                         "order_id": order.id,
-                        "product_id": item["product_id"],
-                        "quantity": item["quantity"],
-                        "unit_price": item["unit_price"],
-                        "vendor_id": product.vendor_id,
+                        "product_id": line["product_id"],
+                        "quantity": line["quantity"],
+                        "unit_price": line["unit_price"],
+                        "vendor_id": line["vendor_id"],
                     }
                 )
 
@@ -77,8 +54,6 @@ def create_order_with_items(user_id, items, voucher_code=None):  # ✅ Accept vo
         db.session.rollback()
         return None, str(e)
 
-    
-
 
 def get_order(order_id):
     return order_repo.get_order_by_id(order_id)
@@ -88,6 +63,30 @@ def get_user_orders(user_id):
     return order_repo.get_orders_by_user(user_id)
 
 
+def get_order_with_items(order_id):
+    return order_repo.get_order_with_items(order_id)
+
+
+def get_user_order_history(
+    user_id,
+    page=1,
+    per_page=20,
+    status=None,
+    created_from=None,
+    created_to=None,
+    fields=None,
+):
+    return order_repo.get_orders_with_items_by_user(
+        user_id,
+        page=page,
+        per_page=per_page,
+        status=status.lower() if status else None,
+        created_from=created_from,
+        created_to=created_to,
+        fields=fields,
+    )
+
+
 def get_order_items(order_id):
     return order_repo.get_order_items_by_order_id(order_id)
 
@@ -125,25 +124,25 @@ def update_order_status(order_id, new_status):
                     f"Cannot change status from '{current_status}' to '{new_status}'. Allowed transitions: {allowed_next_statuses}",
                 )
 
-            # If moving to 'completed', decrease product stock
+            # Stock was taken when the order was placed: completing it makes
+            # the sale final, cancelling puts the units back on the shelf
             if new_status == "completed":
-                for item in order.order_items:
-                    product = db.session.get(Products, item.product_id)
-                    if not product:
-                        raise ValueError(
-                            f"Product with ID {item.product_id} not found."
-                        )
-
-                    if product.stock_quantity < item.quantity:
-                        raise ValueError(
-                            f"Not enough stock for product {product.name}."
-                        )
-
-                    product.stock_quantity -= item.quantity
+                if not reservation_services.commit_reservations(order_id):
+                    if not reservation_services.has_reservations(order_id):
+                        _decrement_stock_for_legacy_order(order)
+            elif new_status == "cancelled":
+                reservation_services.release_reservations(order_id)
 
             # Update order status
             order.status = new_status
 
+        # Delivered by the job worker once this commits
+        notification_services.notify_user.delay(
+            user_id=order.user_id,
+            message=f"Your order #{order.id} is now {new_status}.",
+            link=f"/orders/{order.id}",
+        )
+        db.session.commit()
         return order, None
 
     except (IntegrityError, ValueError) as e:
@@ -154,11 +153,25 @@ def update_order_status(order_id, new_status):
         return None, str(e)
 
 
+def _decrement_stock_for_legacy_order(order):
+    """Orders placed before stock reservations existed still take their
+    stock on completion."""
+    for item in order.order_items:
+        if not reservation_repo.decrement_stock_if_available(
+            item.product_id, item.quantity
+        ):
+            product = db.session.get(Products, item.product_id)
+            if not product:
+                raise ValueError(f"Product with ID {item.product_id} not found.")
+            raise ValueError(f"Not enough stock for product {product.name}.")
+
+
 def delete_order(order_id):
     order = order_repo.get_order_by_id(order_id)
     if not order:
         return None, "Order not found"
 
+    reservation_services.release_reservations(order_id)
     order_repo.delete_order(order)
     try:
         db.session.commit()
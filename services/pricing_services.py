@@ -0,0 +1,104 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from repo import product_repo
+from services import voucher_services
+
+CENT = Decimal("0.01")
+HUNDRED = Decimal("100")
+
+
+def _money(value) -> Decimal:
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def unit_price(product) -> Decimal:
+    """Selling price of one unit: list price less the product's own discount."""
+    price = Decimal(product.price)
+    discount = Decimal(product.discount_percentage or 0)
+    return _money(price * (HUNDRED - discount) / HUNDRED)
+
+
+def voucher_discount(voucher, subtotal: Decimal) -> Decimal:
+    """Amount a voucher takes off ``subtotal``, never more than the subtotal."""
+    if voucher.discount_percent:
+        discount = subtotal * Decimal(str(voucher.discount_percent)) / HUNDRED
+    elif voucher.discount_amount:
+        discount = Decimal(voucher.discount_amount)
+    else:
+        discount = Decimal("0")
+    return min(_money(discount), subtotal)
+
+
+def price_items(items, voucher_code=None):
+    """Price a basket from the catalog, ignoring any client-sent prices.
+
+    ``items`` is a list of ``{"product_id", "quantity"}`` dicts. Every product
+    is loaded with one query. Returns a dict with the priced ``lines`` (in
+    input order), ``subtotal``, ``discount``, ``total`` and the applied
+    ``voucher``; raises ValueError for unknown products, bad quantities or an
+    unusable voucher.
+    """
+    product_ids = []
+    for item in items:
+        try:
+            product_ids.append(int(item["product_id"]))
+            quantity = int(item["quantity"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Each item needs a numeric product_id and quantity.")
+        if quantity < 1:
+            raise ValueError("Quantity must be at least 1.")
+
+    products = {p.id: p for p in product_repo.get_products_by_ids(product_ids)}
+
+    lines = []
+    subtotal = Decimal("0")
+    for item, product_id in zip(items, product_ids):
+        product = products.get(product_id)
+        if not product:
+            raise ValueError(f"Product with id {product_id} not found.")
+        quantity = int(item["quantity"])
+        price = unit_price(product)
+        line_total = price * quantity
+        subtotal += line_total
+        lines.append(
+            {
+                "product_id": product.id,
+                "product_name": product.name,
+                "vendor_id": product.vendor_id,
+                "quantity": quantity,
+                "unit_price": price,
+                "line_total": line_total,
+            }
+        )
+
+    voucher = None
+    discount = Decimal("0")
+    if voucher_code:
+        voucher = voucher_services.get_valid_voucher(voucher_code)
+        discount = voucher_discount(voucher, subtotal)
+
+    return {
+        "lines": lines,
+        "subtotal": subtotal,
+        "discount": discount,
+        "total": subtotal - discount,
+        "voucher": voucher,
+    }
+
+
+def serialize_pricing(pricing):
+    return {
+        "total_before_discount": float(pricing["subtotal"]),
+        "discount_amount": float(pricing["discount"]),
+        "total_after_discount": float(pricing["total"]),
+        "voucher_code": pricing["voucher"].code if pricing["voucher"] else None,
+        "items": [
+            {
+                "product_id": line["product_id"],
+                "product_name": line["product_name"],
+                "unit_price": float(line["unit_price"]),
+                "quantity": line["quantity"],
+            }
+            for line in pricing["lines"]
+        ],
+    }
@@ -0,0 +1,248 @@
+"""Bulk catalog operations: streamed import and export of vendor products,
+and batch moderation of the review queue."""
+
+import logging
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from flask import current_app
+from instance.database import db
+from marshmallow import ValidationError
+from models.product import build_search_text
+from repo import product_repo
+from services import notification_services
+from services.product_services import (
+    clear_all_product_list_cache,
+    queue_listing_cache_warm,
+)
+from shared import bulk_io
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = (*product_repo.EXPORT_COLUMNS, "category_ids")
+IMPORT_DEFAULTS = {
+    "currency": "IDR",
+    "discount_percentage": 0,
+    "stock_quantity": 0,
+    "unit_quantity": "pcs",
+    "image_url": "http://example.com/image.jpg",
+    "featured": False,
+    "flash_sale": False,
+}
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ImportReport:
+    def __init__(self, max_errors):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def fail(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _validate_chunk(chunk, validate, vendor_id, vendor_city, seen_slugs, report):
+    """Turn raw records into insertable rows, reporting the rejects."""
+    candidates = []
+    for line, record, error in chunk:
+        if error:
+            report.fail(line, {"_row": [error]})
+            continue
+        try:
+            data = validate(record)
+        except ValidationError as err:
+            report.fail(line, err.messages)
+            continue
+        try:
+            data["price"] = Decimal(data["price"])
+        except (InvalidOperation, TypeError):
+            report.fail(line, {"price": ["Invalid price format"]})
+            continue
+        candidates.append((line, data))
+
+    taken = product_repo.get_existing_slugs([data["slug"] for _, data in candidates])
+    known_categories = product_repo.get_existing_category_ids(
+        [cid for _, data in candidates for cid in data.get("category_ids", [])]
+    )
+
+    valid = []
+    for line, data in candidates:
+        slug = data["slug"]
+        if slug in taken or slug in seen_slugs:
+            report.fail(line, {"slug": ["Duplicate slug. Product already exists."]})
+            continue
+        category_ids = list(dict.fromkeys(data.pop("category_ids", [])))
+        unknown = [cid for cid in category_ids if cid not in known_categories]
+        if unknown:
+            report.fail(line, {"category_ids": [f"Unknown categories: {unknown}"]})
+            continue
+        seen_slugs.add(slug)
+        data.pop("location", None)
+        row = {**IMPORT_DEFAULTS, **data}
+        row.setdefault("description", "")
+        row.update(
+            vendor_id=vendor_id,
+            is_approved=False,
+            rejected=False,
+            search_text=build_search_text(row["name"], row["description"], vendor_city),
+        )
+        valid.append((line, row, category_ids))
+    return valid
+
+
+def _insert_chunk(valid):
+    ids = product_repo.bulk_insert_products([row for _, row, _ in valid])
+    product_repo.bulk_insert_product_categories(
+        [
+            {"product_id": product_id, "category_id": category_id}
+            for product_id, (_, _, category_ids) in zip(ids, valid)
+            for category_id in category_ids
+        ]
+    )
+
+
+def import_products(vendor_id, records, validate):
+    """Create products for ``vendor_id`` from ``(line, record, error)`` tuples
+    (see bulk_io.iter_records), validated with ``validate``.
+
+    Rows are validated and inserted a chunk at a time, each chunk committed
+    on its own: invalid rows are reported by line and skipped, the rest of the
+    file still goes in. Imported products await moderation like new ones.
+    Returns the report dict.
+    """
+    config = current_app.config
+    report = ImportReport(config["PRODUCT_IMPORT_MAX_ERRORS"])
+    vendor_city = product_repo.get_vendor_city(vendor_id)
+    seen_slugs = set()
+
+    for chunk in _chunks(records, config["PRODUCT_IMPORT_CHUNK_SIZE"]):
+        valid = _validate_chunk(
+            chunk, validate, vendor_id, vendor_city, seen_slugs, report
+        )
+        if not valid:
+            continue
+        try:
+            _insert_chunk(valid)
+            db.session.commit()
+            report.created += len(valid)
+        except Exception:
+            # Lost a race on a slug (or similar): retry the chunk row by row
+            # so only the offending rows are reported
+            db.session.rollback()
+            logger.warning("Bulk insert of %s products failed, retrying per row", len(valid))
+            for entry in valid:
+                try:
+                    _insert_chunk([entry])
+                    db.session.commit()
+                    report.created += 1
+                except Exception as e:
+                    db.session.rollback()
+                    report.fail(entry[0], {"_row": [str(getattr(e, "orig", e))]})
+
+    if report.created:
+        clear_all_product_list_cache()
+    logger.info(
+        "Vendor %s imported %s products (%s rejected)",
+        vendor_id,
+        report.created,
+        report.failed,
+    )
+    return report.as_dict()
+
+
+def _export_record(row):
+    row = dict(row)
+    if row["price"] is not None:
+        row["price"] = float(row["price"])
+    return row
+
+
+def export_products(vendor_id, fmt):
+    """Generator of text chunks with the vendor's whole catalog."""
+    batch_size = current_app.config["PRODUCT_EXPORT_BATCH_SIZE"]
+    batches = (
+        map(_export_record, batch)
+        for batch in product_repo.iter_vendor_product_batches(vendor_id, batch_size)
+    )
+    return bulk_io.write_records(batches, fmt, EXPORT_COLUMNS)
+
+
+MODERATION_ACTIONS = {"approve": (True, "approved"), "reject": (False, "rejected")}
+
+
+def _notify_vendors(changed, decision):
+    # One notification per vendor for the whole batch
+    by_vendor = {}
+    for row in changed:
+        by_vendor.setdefault(row.vendor_id, []).append(row)
+    for vendor_id, rows in by_vendor.items():
+        if len(rows) == 1:
+            message = f"Your product '{rows[0].name}' was {decision}."
+            link = f"/products/{rows[0].id}"
+        else:
+            message = f"{len(rows)} of your products were {decision}."
+            link = None
+        notification_services.notify_user.delay(
+            user_id=vendor_id, message=message, link=link
+        )
+
+
+def moderate_products(action, product_ids=None, queue_filter=None):
+    """Approve or reject many products with a single UPDATE.
+
+    Takes explicit ``product_ids`` or a ``queue_filter`` (keyword arguments
+    of product_repo.pending_product_ids) selecting from the review queue.
+    Returns ``{"updated": n, "results": {id: status}}`` where status is the
+    new state, "unchanged" (already in it) or "not_found". Listing caches
+    are invalidated once for the batch.
+    """
+    approved, decision = MODERATION_ACTIONS[action]
+    if product_ids is None:
+        product_ids = product_repo.pending_product_ids(**(queue_filter or {}))
+    product_ids = list(dict.fromkeys(product_ids))
+
+    try:
+        changed = product_repo.set_moderation_state(product_ids, approved)
+        changed_ids = {row.id for row in changed}
+        existing = product_repo.get_existing_product_ids(
+            [pid for pid in product_ids if pid not in changed_ids]
+        )
+        if changed:
+            _notify_vendors(changed, decision)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if changed:
+        clear_all_product_list_cache()
+        if approved:
+            queue_listing_cache_warm()
+    logger.info("Bulk %s: %s of %s products changed", action, len(changed), len(product_ids))
+
+    results = {}
+    for pid in product_ids:
+        if pid in changed_ids:
+            results[str(pid)] = decision
+        elif pid in existing:
+            results[str(pid)] = "unchanged"
+        else:
+            results[str(pid)] = "not_found"
+    return {"updated": len(changed), "results": results}
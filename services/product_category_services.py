@@ -1,6 +1,7 @@
 from repo import product_category_repo
 from models.product_category import ProductCategories
 from instance.database import db
+from services.product_services import clear_all_product_list_cache
 
 
 def assign_category(product_id: int, category_id: int):
@@ -15,6 +16,7 @@ def assign_category(product_id: int, category_id: int):
             product_id, category_id
         )
         db.session.commit()
+        clear_all_product_list_cache()
         return result
     except Exception:
         db.session.rollback()
@@ -31,6 +33,7 @@ def remove_category(product_id, category_id):
             product_id, category_id
         )
         db.session.commit()
+        clear_all_product_list_cache()
         return result
     except Exception:
         db.session.rollback()
@@ -2,6 +2,9 @@ import os
 from repo import product_image_repo as product_image_repo
 from werkzeug.utils import secure_filename
 from instance.database import db
+import logging
+
+logger = logging.getLogger(__name__)
 
 UPLOAD_FOLDER = "uploads"
 
@@ -21,7 +24,7 @@ def save_uploaded_image(product_id, file):
         return {"filename": filename, "url": f"/uploads/{filename}"}
     except Exception as e:
         db.session.rollback()
-        print(f"Error saving uploaded image: {str(e)}")
+        logger.exception("Saving uploaded image for product %s failed", product_id)
         return None
 
 
@@ -6,59 +6,64 @@ from instance.database import db
 from repo import product_repo
 from decimal import Decimal
 from werkzeug.exceptions import HTTPException
+from sqlalchemy import inspect
 from sqlalchemy.exc import IntegrityError
-
-# from shared.cache import cache
+from shared.pagination import encode_cursor, decode_cursor
+from shared.conditional import compute_etag
+from shared import serializers
+from services.category_service import clear_category_tree_cache
+from services import notification_services
+from shared.jobs import job
+from shared.cache import (
+    cache_get,
+    cache_set,
+    cache_is_shared,
+    get_namespace_version,
+    bump_namespace_version,
+)
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_LIST_CACHE_NAMESPACE = "products:list"
 
 
 def serialize_product(product: Products) -> dict:
-    return {
-        "id": product.id,
-        "name": product.name,
-        "slug": product.slug,
-        "description": product.description,
-        "currency": product.currency,
-        "price": (
-            float(product.price)
-            if isinstance(product.price, Decimal)
-            else product.price
-        ),
-        "discount_percentage": product.discount_percentage,
-        "stock_quantity": product.stock_quantity,
-        "unit_quantity": product.unit_quantity,
-        "image_url": product.image_url,
-        "location": product.location,
-        "featured": product.featured,
-        "flash_sale": product.flash_sale,
-        "vendor_id": product.vendor_id,
-        "vendor_name": (product.vendor.username if product.vendor else None),
-        "created_at": product.created_at.isoformat() if product.created_at else None,
-        "updated_at": product.updated_at.isoformat() if product.updated_at else None,
-        "is_approved": product.is_approved,
-        "rejected": product.rejected,
-        "categories": [
-            {
-                "id": category.id,
-                "name": category.name,
-                "slug": category.slug,
-            }
-            for category in product.categories_linked
-        ],
-    }
-
-
-# @cache.cached(timeout=60, query_string=True)
-def get_all_serialized_products(
-    search=None,
-    category_id=None,
-    page=1,
-    limit=10,
-    sort_by="created_at",
-    sort_order="desc",
-):
-    print("[CACHE MISS] Fetching products from DB...")
-
-    # Allow JWT if available
+    return serializers.PRODUCT.one(product)
+
+
+def _listing_scope(role, user_id, include_unapproved, only_unapproved) -> str:
+    """Collapse the caller's role and flags into the visibility scope the
+    repository filter will apply, so callers that see the same rows share
+    a cache entry (customers and anonymous visitors both get "public")."""
+    if role == "admin":
+        if only_unapproved or include_unapproved:
+            return "admin:pending"
+        return "public"
+    if role == "vendor":
+        if only_unapproved:
+            return f"vendor:{user_id}:pending"
+        if include_unapproved:
+            return f"vendor:{user_id}:all"
+    return "public"
+
+
+def _normalize_sort(search, sort_by, sort_order):
+    # Searches rank by relevance unless the client asks for another order
+    if not sort_by:
+        sort_by = "relevance" if search else "created_at"
+    if sort_by not in product_repo.SORT_COLUMNS and not (
+        sort_by == "relevance" and search
+    ):
+        sort_by = "created_at"
+    sort_order = "asc" if (sort_order or "").lower() == "asc" else "desc"
+    return sort_by, sort_order
+
+
+def _listing_viewer():
+    """Return (role, user_id, include_unapproved, only_unapproved) for the
+    current request; the JWT is optional on listings."""
     try:
         verify_jwt_in_request()
         claims = get_jwt()
@@ -75,32 +80,237 @@ def get_all_serialized_products(
 
     only_unapproved = request.args.get("only_unapproved", "false").lower() == "true"
 
-    print(
-        f"[DEBUG] role={role}, include_unapproved={include_unapproved}, only_unapproved={only_unapproved}, user_id={user_id}"
-    )
-
     if include_unapproved and role not in ["admin"]:
         include_unapproved = False
 
+    return role, user_id, include_unapproved, only_unapproved
+
+
+def _product_list_cache_key(
+    scope,
+    search,
+    category_id,
+    page,
+    limit,
+    sort_by,
+    sort_order,
+    cursor=None,
+    include_total=True,
+    fields=None,
+):
+    version = get_namespace_version(PRODUCT_LIST_CACHE_NAMESPACE)
+    normalized = "|".join(
+        [
+            scope,
+            (search or "").lower(),  # search is matched case-insensitively
+            str(category_id or ""),
+            sort_by,
+            sort_order,
+            str(page),
+            str(limit),
+            cursor or "",
+            "total" if include_total else "",
+            ",".join(sorted(fields)) if fields else "",
+        ]
+    )
+    return f"{PRODUCT_LIST_CACHE_NAMESPACE}:{version}:{normalized}"
+
+
+def _listing_window():
+    """Index of the current PRODUCT_LIST_CACHE_TIMEOUT-long window and the
+    whole seconds left in it.
+
+    Cached listings expire at the end of the window they were built in and
+    their ETag names that window, so stock sold without a cache bump shows
+    up, and changes the ETag, within one window.
+    """
+    timeout = current_app.config["PRODUCT_LIST_CACHE_TIMEOUT"]
+    now = time.time()
+    return int(now // timeout), int(timeout - now % timeout)
+
+
+def clear_all_product_list_cache():
+    """Invalidate every cached product listing (all scopes and query combos),
+    and the category tree whose product counts derive from the same rows."""
+    bump_namespace_version(PRODUCT_LIST_CACHE_NAMESPACE)
+    clear_category_tree_cache()
+
+
+def get_all_serialized_products(
+    search=None,
+    category_id=None,
+    page=1,
+    limit=10,
+    sort_by=None,
+    sort_order="desc",
+    use_cursor=False,
+    cursor=None,
+    include_total=True,
+    fields=None,
+):
+    """Serialized catalog listing.
+
+    In cursor mode (``use_cursor``) ``page`` is ignored: the next page starts
+    after the row encoded in ``cursor`` and the response carries the
+    ``next_cursor`` to continue from. Raises ValueError for a cursor that
+    cannot be decoded or belongs to a different sort.
+
+    ``fields`` (from serializers.parse_fields) is a sparse fieldset: only
+    those keys are emitted and only the columns they need are loaded.
+    """
+    sort_by, sort_order = _normalize_sort(search, sort_by, sort_order)
+    if use_cursor and sort_by == "relevance":
+        raise ValueError(
+            "Cursor pagination needs sort_by=created_at, price, name or rating when searching"
+        )
+
+    keyset = None
+    if use_cursor and cursor:
+        try:
+            cursor_sort_by, cursor_sort_order, value, last_id = decode_cursor(cursor)
+            if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+                raise ValueError("Cursor does not match the requested sort order")
+            keyset = (product_repo.parse_cursor_value(value, sort_by), int(last_id))
+        except (ValueError, TypeError, ArithmeticError) as e:
+            raise ValueError(f"Invalid cursor: {e}") from e
+
+    role, user_id, include_unapproved, only_unapproved = _listing_viewer()
+    scope = _listing_scope(role, user_id, include_unapproved, only_unapproved)
+    cache_key = _product_list_cache_key(
+        scope,
+        search,
+        category_id,
+        page if not use_cursor else None,
+        limit,
+        sort_by,
+        sort_order,
+        cursor=cursor if use_cursor else None,
+        include_total=include_total,
+        fields=fields,
+    )
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     products, total = product_repo.get_all_products_filtered(
         search=search,
         category_id=category_id,
-        page=page,
-        limit=limit,
+        page=1 if use_cursor else page,
         sort_by=sort_by,
         sort_order=sort_order,
         include_unapproved=include_unapproved,
         only_unapproved=only_unapproved,
         current_user_id=user_id,
         current_user_role=role,
+        # One extra row tells us whether another page exists
+        limit=limit + 1 if use_cursor else limit,
+        cursor=keyset,
+        with_total=include_total,
+        fields=fields,
+    )
+    serializer = serializers.PRODUCT.only(fields) if fields else serializers.PRODUCT
+
+    if use_cursor:
+        has_more = len(products) > limit
+        products = products[:limit]
+        last = products[-1] if products else None
+        result = {
+            "products": serializer.many(products),
+            "total": total,
+            "limit": limit,
+            "next_cursor": (
+                encode_cursor(
+                    sort_by,
+                    sort_order,
+                    product_repo.cursor_value(last, sort_by),
+                    last.id,
+                )
+                if has_more
+                else None
+            ),
+        }
+    else:
+        result = {
+            "products": serializer.many(products),
+            "total": total,
+            "page": page,
+            "limit": limit,
+        }
+    _, seconds_left = _listing_window()
+    if seconds_left > 0:  # a timeout of 0 would never expire
+        cache_set(cache_key, result, timeout=seconds_left)
+    return result
+
+
+def get_product_list_etag(
+    search=None,
+    category_id=None,
+    page=1,
+    limit=10,
+    sort_by=None,
+    sort_order="desc",
+    use_cursor=False,
+    cursor=None,
+    include_total=True,
+    fields=None,
+):
+    """ETag of the listing get_all_serialized_products would return, or
+    None when the listing cannot be validated.
+
+    Derived from the listing's cache key (visibility scope, query arguments
+    and the namespace version) and the cache window, so answering a
+    conditional GET needs no database work. Writes to what a product payload
+    shows (products, ratings, categories, vendor names) must therefore go
+    through clear_all_product_list_cache; stock changes are left to the
+    window (see PRODUCT_LIST_CACHE_TIMEOUT). The bump only reaches the worker
+    that made it when the cache is per-process, so no ETag is issued then.
+    """
+    if not cache_is_shared():
+        return None
+    sort_by, sort_order = _normalize_sort(search, sort_by, sort_order)
+    role, user_id, include_unapproved, only_unapproved = _listing_viewer()
+    scope = _listing_scope(role, user_id, include_unapproved, only_unapproved)
+    cache_key = _product_list_cache_key(
+        scope,
+        search,
+        category_id,
+        page if not use_cursor else None,
+        limit,
+        sort_by,
+        sort_order,
+        cursor=cursor if use_cursor else None,
+        include_total=include_total,
+        fields=fields,
     )
+    window, _ = _listing_window()
+    return compute_etag(cache_key, window)
 
-    return {
-        "products": [serialize_product(p) for p in products],
-        "total": total,
-        "page": page,
-        "limit": limit,
-    }
+
+def get_product_validators(product_id: int):
+    """Return (etag, last_modified) of a public product, or None if it is
+    not visible.
+
+    Built from the updated_at stamps of the product, its vendor and its
+    categories (one aggregate query), so it holds whichever worker or cache
+    answers.
+    """
+    row = product_repo.get_product_version(product_id)
+    if not row or not row.is_approved:
+        return None
+    etag = compute_etag(
+        "product",
+        product_id,
+        row.updated_at,
+        row.vendor_updated_at,
+        row.categories_updated_at,
+        row.category_count,
+    )
+    stamps = [
+        stamp
+        for stamp in (row.updated_at, row.vendor_updated_at, row.categories_updated_at)
+        if stamp is not None
+    ]
+    return etag, max(stamps) if stamps else None
 
 
 def get_paginated_serialized_products(page: int, limit: int):
@@ -133,7 +343,7 @@ def create_product_with_serialization(data: dict):
     try:
         data["price"] = Decimal(data["price"])
     except Exception as e:
-        print(f"[PRICE ERROR] {e}")
+        logger.warning("Rejected product price %r: %s", data.get("price"), e)
         abort(400, "Invalid price format")
 
     data.pop("location", None)
@@ -141,18 +351,19 @@ def create_product_with_serialization(data: dict):
     data.setdefault("featured", False)
     data.setdefault("flash_sale", False)
 
-    print("[DEBUG] Final product payload BEFORE commit:", data)
+    logger.debug(
+        "Creating product %s for vendor %s", data.get("slug"), vendor_id
+    )
 
     try:
         product = product_repo.create_product(data)
         if not product:
-            print("[DEBUG] product_repo.create_product returned None")
             abort(409, "Duplicate slug. Product already exists.")
 
         db.session.commit()
 
         # ✅ Invalidate cached /products list
-        # clear_all_product_list_cache()
+        clear_all_product_list_cache()
 
         return serialize_product(product)
 
@@ -160,13 +371,11 @@ def create_product_with_serialization(data: dict):
         raise e
     except IntegrityError as e:
         db.session.rollback()
-        print("[INTEGRITY ERROR DURING PRODUCT CREATION]")
-        print(e)
+        logger.warning("Product creation conflict for %s: %s", data.get("slug"), e.orig)
         abort(409, "Duplicate slug. Product already exists.")
     except Exception as e:
         db.session.rollback()
-        print("[CRITICAL ERROR DURING PRODUCT CREATION]")
-        print(e)
+        logger.exception("Product creation failed for %s", data.get("slug"))
         abort(500, f"Server Error: {str(e)}")
 
 
@@ -174,10 +383,17 @@ def update_product_with_serialization(product_id: int, data: dict):
     product = product_repo.update_product(product_id, data)
     if not product:
         return None
+    if data.get("flash_sale") and inspect(product).attrs.flash_sale.history.deleted:
+        # Flash sale just started: tell everyone who wishlisted it
+        notification_services.notify_wishlisters.delay(
+            product_id=product.id,
+            message=f"'{product.name}' from your wishlist is on flash sale!",
+            link=f"/products/{product.id}",
+        )
     try:
         db.session.commit()
 
-        # clear_all_product_list_cache()
+        clear_all_product_list_cache()
 
     except Exception:
         db.session.rollback()
@@ -192,7 +408,7 @@ def delete_product_and_return_message(product_id: int):
     try:
         db.session.commit()
 
-        # clear_all_product_list_cache()
+        clear_all_product_list_cache()
 
     except Exception:
         db.session.rollback()
@@ -200,6 +416,40 @@ def delete_product_and_return_message(product_id: int):
     return {"message": "Product deleted"}
 
 
+def _notify_vendor(product, decision):
+    # Runs on the job worker after the moderation commits
+    notification_services.notify_user.delay(
+        user_id=product.vendor_id,
+        message=f"Your product '{product.name}' was {decision}.",
+        link=f"/products/{product.id}",
+    )
+
+
+@job("products.warm_listing_cache", max_attempts=1)
+def warm_product_listing_cache(limit=10):
+    """Rebuild the first public listing page after the catalog changed, so
+    the next visitor does not pay for the cache miss."""
+    with current_app.test_request_context("/products"):
+        get_all_serialized_products(limit=limit)
+
+
+def queue_listing_cache_warm():
+    """Enqueue warm_product_listing_cache and commit it on its own.
+
+    Call after clear_all_product_list_cache: a job queued before the bump
+    could run first and warm a key nobody reads any more. Skipped when the
+    cache is per-process, as it would only warm the job worker's memory.
+    """
+    if not cache_is_shared():
+        return
+    try:
+        warm_product_listing_cache.delay()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("Could not queue listing cache warm-up: %s", e)
+
+
 def approve_product_by_id(product_id: int):
     product = product_repo.approve_product(product_id)
     if not product:
@@ -208,12 +458,15 @@ def approve_product_by_id(product_id: int):
     # ✅ clear any previous rejection
     product.rejected = False
 
+    _notify_vendor(product, "approved")
     try:
         db.session.commit()
-        # clear_all_product_list_cache()
     except Exception:
         db.session.rollback()
         raise
+
+    clear_all_product_list_cache()
+    queue_listing_cache_warm()
     return serialize_product(product)
 
 
@@ -224,13 +477,15 @@ def reject_product_by_id(product_id: int):
 
     product.is_approved = False
     product.rejected = True  # ✅ mark as rejected
+    _notify_vendor(product, "rejected")
     try:
         db.session.commit()
     except Exception:
         db.session.rollback()
         raise
 
-    # clear_all_product_list_cache()
+    clear_all_product_list_cache()
+    queue_listing_cache_warm()
 
     return serialize_product(product)
 
@@ -0,0 +1,122 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from flask import current_app
+
+from instance.database import db
+from models.order import Orders
+from models.product import Products
+from repo import reservation_repo
+from services import notification_services
+from shared import crono
+from shared.jobs import job
+
+
+def _reservation_ttl():
+    return current_app.config.get("STOCK_RESERVATION_TTL_MINUTES")
+
+
+def _reservation_expiry():
+    """Expiry of a new reservation, or None when expiry is not enabled."""
+    minutes = _reservation_ttl()
+    return crono.now() + timedelta(minutes=minutes) if minutes else None
+
+
+def _stock_error(product_id, quantity):
+    """Explain why a conditional decrement matched no row."""
+    product = db.session.get(Products, product_id)
+    if not product:
+        return f"Product with id {product_id} not found."
+    if product.stock_quantity <= 0:
+        return f"Product {product.name} is out of stock."
+    return f"Requested quantity for {product.name} exceeds stock."
+
+
+def reserve_stock(order_id, items):
+    """Take stock for every item of an order and record the reservations.
+
+    Each product is decremented with a single conditional UPDATE, so two
+    checkouts can never both see the last unit. Products are visited in id
+    order, which keeps row locks acquired in the same order by every
+    transaction (no deadlocks between overlapping carts). Raises ValueError
+    when a product cannot cover its quantity; the caller rolls back. Does
+    not commit.
+    """
+    quantities = defaultdict(int)
+    for item in items:
+        quantities[item["product_id"]] += item["quantity"]
+
+    expires_at = _reservation_expiry()
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        if quantity <= 0:
+            raise ValueError("Quantity must be at least 1.")
+        if not reservation_repo.decrement_stock_if_available(product_id, quantity):
+            raise ValueError(_stock_error(product_id, quantity))
+        reservation_repo.create_reservation(order_id, product_id, quantity, expires_at)
+
+
+def release_reservations(order_id) -> int:
+    """Return the held stock of an order to the products. Does not commit."""
+    released = 0
+    for reservation in reservation_repo.get_reservations_by_order(order_id, "held"):
+        if reservation_repo.transition_reservation(reservation.id, "held", "released"):
+            reservation_repo.increment_stock(reservation.product_id, reservation.quantity)
+            released += 1
+    return released
+
+
+def commit_reservations(order_id) -> int:
+    """Mark the held stock of an order as sold. Does not commit."""
+    committed = 0
+    for reservation in reservation_repo.get_reservations_by_order(order_id, "held"):
+        if reservation_repo.transition_reservation(reservation.id, "held", "committed"):
+            committed += 1
+    return committed
+
+
+def has_reservations(order_id) -> bool:
+    return bool(reservation_repo.get_reservations_by_order(order_id))
+
+
+@job(
+    "reservations.release_expired",
+    max_attempts=1,
+    every=60,
+    enabled_if="STOCK_RESERVATION_TTL_MINUTES",
+)
+def release_expired_reservations(batch_size=100) -> int:
+    """Cancel pending orders whose reservations expired, restock them and
+    tell the customers.
+
+    Does nothing unless STOCK_RESERVATION_TTL_MINUTES is set, so orders
+    placed while it was (and kept their expiry) are not cancelled after it
+    is turned off. Returns the number of orders cancelled.
+    """
+    if not _reservation_ttl():
+        return 0
+    cancelled = 0
+    while True:
+        order_ids = reservation_repo.get_order_ids_with_expired_reservations(
+            crono.now(), limit=batch_size
+        )
+        if not order_ids:
+            break
+        for order_id in order_ids:
+            order = db.session.get(Orders, order_id)
+            release_reservations(order_id)
+            if order and order.status == "pending":
+                order.status = "cancelled"
+                cancelled += 1
+                notification_services.notify_user.delay(
+                    user_id=order.user_id,
+                    message=(
+                        f"Your order #{order.id} was cancelled: it was not "
+                        "shipped in time and its items were released."
+                    ),
+                    link=f"/orders/{order.id}",
+                )
+        db.session.commit()
+    if cancelled:
+        current_app.logger.info("Released stock of %s expired orders", cancelled)
+    return cancelled
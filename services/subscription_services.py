@@ -1,4 +1,6 @@
-from utils.email import send_welcome_email
+from instance.database import db
+from services import email_services
+from utils.email import welcome_email
 
 
 class SubscriptionService:
@@ -7,8 +9,13 @@ class SubscriptionService:
         if not email:
             raise ValueError("Email is required")
         # Additional email validation can be added here
+        # The welcome email goes through the outbox; SMTP is never contacted
+        # in-request (the job worker delivers it)
+        subject, body = welcome_email()
         try:
-            send_welcome_email(email)
+            email_services.queue_email(email, subject, body)
+            db.session.commit()
             return True
-        except Exception as e:
-            raise e
+        except Exception:
+            db.session.rollback()
+            raise
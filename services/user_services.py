@@ -1,5 +1,7 @@
 from werkzeug.security import generate_password_hash, check_password_hash
-from repo import user_repo
+from repo import user_repo, topup_repo
+from services import balance_services
+from services.product_services import clear_all_product_list_cache
 from models.user import Users
 from models.product import Products
 from models.feedback import Feedbacks
@@ -9,22 +11,23 @@ from repo.user_repo import get_user_by_id
 from flask import jsonify
 from instance.database import db
 from utils.security import hash_password
+import logging
 from decimal import Decimal
 import csv
-from tempfile import NamedTemporaryFile
-import shutil
+import math
 from datetime import datetime
 from shared.crono import now
 
 
 from models.user import RoleType
 
-CSV_TOPUP_FILE = "logs/topup_requests.csv"
+logger = logging.getLogger(__name__)
 
 
 def create_user(data):
     try:
-        print("[DEBUG] Incoming user data:", data)
+        # Never log the payload itself: it carries the password
+        logger.debug("Creating user with fields %s", sorted(data))
 
         # Get and normalize email
         email = data.get("email", "").lower()
@@ -69,7 +72,7 @@ def create_user(data):
         return user, None
 
     except IntegrityError as e:
-        print("IntegrityError:", e)
+        logger.warning("create_user integrity error: %s", e.orig)
         db.session.rollback()
 
         if "users_email_key" in str(e) or "users_username_key" in str(e):
@@ -80,7 +83,7 @@ def create_user(data):
             return None, "Failed to create user due to constraint violation"
 
     except Exception as e:
-        print("Exception in create_user:", e)
+        logger.exception("create_user failed")
         db.session.rollback()
         return None, "Failed to create user due to server error."
 
@@ -110,6 +113,11 @@ def update_user(user_id, data, current_user_id, current_user_role):
         for field in protected_fields:
             data.pop(field, None)
 
+    # Product payloads show the vendor's username and city
+    catalog_changed = user.role == RoleType.vendor and any(
+        field in data and data[field] != getattr(user, field)
+        for field in ("username", "city")
+    )
     updated_user = user_repo.update_user(user, data)
 
     try:
@@ -118,6 +126,8 @@ def update_user(user_id, data, current_user_id, current_user_role):
         db.session.rollback()
         return None, "Failed to update user"
 
+    if catalog_changed:
+        clear_all_product_list_cache()
     return updated_user, None
 
 
@@ -155,6 +165,9 @@ def delete_user(target_user_id, current_user_id, current_user_role):
         db.session.rollback()
         raise
 
+    if deleted_products_count:
+        clear_all_product_list_cache()
+
     # Step 3: Return success message
     if deleted_products_count > 0:
         return {
@@ -227,94 +240,149 @@ def get_user_balance_service(
     return user.balance or 0.0, None
 
 
-def update_my_balance_service(user_id: int, added_amount: float):
-    user = user_repo.get_user_by_id(user_id)
-    if not user:
-        return None, "User not found"
-
-    current_balance = user.balance or Decimal("0.00")
-    new_balance = current_balance + Decimal(str(added_amount))
-
-    updated_user = user_repo.update_user_balance(user_id, new_balance)
-
+def update_my_balance_service(
+    user_id: int, added_amount: float, idempotency_key: str = None
+):
     try:
+        balance_services.apply_balance_change(
+            user_id,
+            added_amount,
+            kind="admin_adjustment",
+            idempotency_key=idempotency_key,
+        )
         db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return None, str(e)
     except Exception:
         db.session.rollback()
         return None, "Failed to update balance"
 
-    return updated_user, None
+    return user_repo.get_user_by_id(user_id), None
 
 
-def request_topup_service(user_id: int, amount: float):
-    if amount <= 0:
-        return None, "Invalid top-up amount"
+def serialize_topup_request(topup):
+    return {
+        "request_id": topup.id,
+        "timestamp": str(topup.created_at),
+        "user_id": topup.user_id,
+        "amount": float(topup.amount),
+        "status": topup.status,
+    }
 
-    # Read current lines to determine ID
-    try:
-        with open(globals()["CSV_TOPUP_FILE"], "r") as file:
-            request_id = sum(1 for _ in file)
-    except FileNotFoundError:
-        request_id = 0
 
-    log_entry = [str(now()), user_id, float(amount), "pending"]
+def request_topup_service(user_id: int, amount: float):
+    # bool is an int subclass: JSON true must not become a top-up of 1
+    if (
+        isinstance(amount, bool)
+        or not isinstance(amount, (int, float))
+        or not math.isfinite(amount)
+        or amount <= 0
+    ):
+        return None, "Invalid top-up amount"
 
     try:
-        with open(globals()["CSV_TOPUP_FILE"], "a", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(log_entry)
+        topup = topup_repo.create_topup_request(user_id, Decimal(str(amount)))
+        db.session.commit()
     except Exception as e:
+        db.session.rollback()
         return None, f"Failed to save top-up request: {str(e)}"
 
     return {
-        "request_id": request_id,
+        "request_id": topup.id,
         "requested_by": user_id,
         "amount": float(amount),
     }, None
 
 
-def get_topup_requests_service():
-    try:
-        with open(CSV_TOPUP_FILE, "r") as file:
-            reader = csv.reader(file)
-            logs = [
-                {
-                    "request_id": idx,
-                    "timestamp": row[0],
-                    "user_id": int(row[1]),
-                    "amount": float(row[2]),
-                    "status": row[3],
-                }
-                for idx, row in enumerate(reader)
-            ]
-        return logs, None
-    except FileNotFoundError:
-        return [], None
-    except Exception as e:
-        return None, f"Failed to read top-up requests: {str(e)}"
-
+def get_topup_requests_service(page=1, per_page=50, status=None, user_id=None):
+    requests, total = topup_repo.get_topup_requests(
+        page=page, per_page=per_page, status=status, user_id=user_id
+    )
+    return [serialize_topup_request(r) for r in requests], total
 
-def mark_topup_request_status(request_id: int, status: str):
-    updated = False
-    user_id = None
-    amount = None
 
-    temp_file = NamedTemporaryFile(mode="w", delete=False, newline="")
+def approve_topup_request(request_id: int, admin_id: int):
+    """Approve a pending top-up and credit the balance in one transaction.
 
+    The status flip is a conditional UPDATE, so a request can only be
+    credited once even when two admins approve it at the same time.
+    """
     try:
-        with open(globals()["CSV_TOPUP_FILE"], "r", newline="") as csvfile, temp_file:
-            reader = csv.reader(csvfile)
-            writer = csv.writer(temp_file)
-
-            for i, row in enumerate(reader):
-                if i == request_id and row[3] == "pending":
-                    row[3] = status
-                    updated = True
-                    user_id = int(row[1])
-                    amount = float(row[2])
-                writer.writerow(row)
-
-        shutil.move(temp_file.name, globals()["CSV_TOPUP_FILE"])
-        return updated, user_id, amount
+        claimed = topup_repo.transition_pending_request(
+            request_id, "approved", admin_id, now()
+        )
+        if not claimed:
+            return None, "Top-up request not found or already processed"
+
+        user_id, amount = claimed
+        reference = f"topup_request:{request_id}"
+        balance_services.apply_balance_change(
+            user_id, amount, kind="topup", idempotency_key=reference, reference=reference
+        )
+
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return None, str(e)
     except Exception:
-        return False, None, None
+        db.session.rollback()
+        return None, "Failed to update balance"
+
+    return user_repo.get_user_by_id(user_id), None
+
+
+def reject_topup_request(request_id: int, admin_id: int):
+    claimed = topup_repo.transition_pending_request(
+        request_id, "rejected", admin_id, now()
+    )
+    if not claimed:
+        db.session.rollback()
+        return None, "Top-up request not found or already processed"
+
+    db.session.commit()
+    return claimed[0], None
+
+
+def import_legacy_topup_csv(path, batch_size=1000):
+    """Load the old logs/topup_requests.csv ledger into the table.
+
+    Rows are ``timestamp,user_id,amount,status``. Rows of users that no
+    longer exist are skipped. Returns (imported, skipped).
+    """
+    known_users = set(db.session.execute(db.select(Users.id)).scalars())
+    imported = skipped = 0
+    batch = []
+
+    with open(path, newline="") as file:
+        for row in csv.reader(file):
+            try:
+                created_at = datetime.fromisoformat(row[0])
+                user_id = int(row[1])
+                amount = Decimal(row[2])
+                status = row[3]
+            except (IndexError, ValueError, ArithmeticError):
+                skipped += 1
+                continue
+            if user_id not in known_users:
+                skipped += 1
+                continue
+
+            batch.append(
+                {
+                    "user_id": user_id,
+                    "amount": amount,
+                    "status": status,
+                    "created_at": created_at,
+                }
+            )
+            if len(batch) >= batch_size:
+                topup_repo.bulk_insert_topup_requests(batch)
+                imported += len(batch)
+                batch = []
+
+    if batch:
+        topup_repo.bulk_insert_topup_requests(batch)
+        imported += len(batch)
+    db.session.commit()
+    return imported, skipped
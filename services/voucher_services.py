@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from flask import current_app
+
+from models.voucher import Vouchers
+from instance.database import db
+from sqlalchemy import func
+from shared.conditional import compute_etag
+from shared.cache import LocalTTLCache, get_namespace_version, bump_namespace_version
+
+VOUCHER_CACHE_NAMESPACE = "vouchers"
+
+_local_vouchers = LocalTTLCache(maxsize=256)
+# Last namespace version read from the shared cache, kept alongside the
+# vouchers (codes are strings, so this key cannot collide)
+_VERSION_KEY = ("namespace-version",)
+
+
+@dataclass(frozen=True)
+class VoucherSnapshot:
+    """Detached copy of a voucher row, safe to share between requests."""
+
+    id: int
+    code: str
+    discount_percent: Optional[float]
+    discount_amount: Optional[Decimal]
+    expires_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, voucher):
+        return cls(
+            id=voucher.id,
+            code=voucher.code,
+            discount_percent=voucher.discount_percent,
+            discount_amount=voucher.discount_amount,
+            expires_at=voucher.expires_at,
+        )
+
+
+def get_all_vouchers():
+    return Vouchers.query.all()
+
+
+def get_vouchers_etag():
+    """ETag of the voucher list from a count/max(updated_at) probe."""
+    count, last_updated = db.session.execute(
+        db.select(func.count(Vouchers.id), func.max(Vouchers.updated_at))
+    ).one()
+    return compute_etag("vouchers", count, last_updated)
+
+
+def _load_active_voucher(code):
+    voucher = Vouchers.query.filter_by(code=code, is_active=True).first()
+    return VoucherSnapshot.from_model(voucher) if voucher else None
+
+
+def _shared_version():
+    """Namespace version, read from the shared cache at most once per
+    VOUCHER_VERSION_CHECK_SECONDS."""
+    version = _local_vouchers.get(_VERSION_KEY)
+    if version is None:
+        version = get_namespace_version(VOUCHER_CACHE_NAMESPACE)
+        _local_vouchers.set(
+            _VERSION_KEY,
+            version,
+            current_app.config.get("VOUCHER_VERSION_CHECK_SECONDS", 5),
+        )
+    return version
+
+
+def get_active_voucher(code):
+    """Active voucher with ``code`` (expired or not), or None.
+
+    Answers come from a per-worker LRU, including "no such voucher" so that
+    retyped bad codes do not hit the database either. Entries carry the
+    shared namespace version, which is itself re-read only every few
+    seconds: a mutation clears this worker's entries at once and the other
+    workers' within VOUCHER_VERSION_CHECK_SECONDS, and most lookups make no
+    cache round trip at all.
+    """
+    version = _shared_version()
+    cached = _local_vouchers.get(code)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    snapshot = _load_active_voucher(code)
+    if snapshot:
+        ttl = current_app.config.get("VOUCHER_CACHE_TTL", 60)
+    else:
+        ttl = current_app.config.get("VOUCHER_NEGATIVE_CACHE_TTL", 10)
+    _local_vouchers.set(code, (version, snapshot), ttl)
+    return snapshot
+
+
+def get_valid_voucher(code):
+    """Return the active, unexpired voucher with ``code``; raises ValueError
+    if there is none."""
+    voucher = get_active_voucher(code)
+    if not voucher or (voucher.expires_at and voucher.expires_at < datetime.utcnow()):
+        raise ValueError("Voucher is invalid or expired.")
+    return voucher
+
+
+def clear_voucher_cache():
+    """Drop cached vouchers on every worker; call after committing a change."""
+    _local_vouchers.clear()
+    bump_namespace_version(VOUCHER_CACHE_NAMESPACE)
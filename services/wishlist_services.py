@@ -1,7 +1,7 @@
 from repo import wishlist_repo
 from models.wishlist_item import WishlistItems
 from instance.database import db
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 import logging
 
 
@@ -24,9 +24,15 @@ def add_to_wishlist(user_id: int, product_id: int, vendor_id: int):
     db.session.add(item)
     try:
         db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        # A concurrent request added the same product first
+        if WishlistItems.query.filter_by(user_id=user_id, product_id=product_id).first():
+            return None
+        raise
     except SQLAlchemyError as e:
         db.session.rollback()
-        logging.error(f"Error committing add_to_wishlist: {e}")
+        logging.error("Error committing add_to_wishlist: %s", e)
         raise
     return item
 
@@ -38,7 +44,7 @@ def remove_from_wishlist(user_id: int, product_id: int):
         return result
     except SQLAlchemyError as e:
         db.session.rollback()
-        logging.error(f"Error committing remove_from_wishlist: {e}")
+        logging.error("Error committing remove_from_wishlist: %s", e)
         raise
 
 
@@ -49,5 +55,5 @@ def clear_wishlist(user_id: int):
         return result
     except SQLAlchemyError as e:
         db.session.rollback()
-        logging.error(f"Error committing clear_wishlist: {e}")
+        logging.error("Error committing clear_wishlist: %s", e)
         raise
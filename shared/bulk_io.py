@@ -0,0 +1,105 @@
+"""Streaming CSV / NDJSON readers and writers for bulk endpoints.
+
+Readers pull one line at a time from the upload stream and writers yield
+text chunks for a streamed response, so neither side holds a whole file in
+memory.
+"""
+
+import codecs
+import csv
+import io
+import json
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+LIST_SEPARATOR = ";"
+
+
+def detect_format(explicit=None, mimetype=None, filename=None):
+    """Pick "csv" or "ndjson" from a query arg, content type or file name;
+    None when nothing matches."""
+    if explicit:
+        return explicit.lower() if explicit.lower() in FORMATS else None
+    mimetype = (mimetype or "").lower()
+    if "ndjson" in mimetype or "jsonlines" in mimetype:
+        return "ndjson"
+    if "csv" in mimetype:
+        return "csv"
+    filename = (filename or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if filename.endswith(".csv"):
+        return "csv"
+    return None
+
+
+def iter_records(stream, fmt, list_fields=()):
+    """Yield ``(line, record, error)`` for each row of a binary stream.
+
+    CSV cells that are empty are left out of the record and ``list_fields``
+    cells are split on ";". A row that cannot be parsed yields its error
+    instead of a record.
+    """
+    lines = codecs.iterdecode(stream, "utf-8-sig", errors="replace")
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            record = {}
+            for key, value in row.items():
+                if key is None:
+                    continue  # cells beyond the header
+                value = (value or "").strip()
+                if not value:
+                    continue
+                if key in list_fields:
+                    value = [v.strip() for v in value.split(LIST_SEPARATOR) if v.strip()]
+                record[key.strip()] = value
+            yield reader.line_num, record, None
+        return
+
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Each line must be a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return LIST_SEPARATOR.join(str(v) for v in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else value
+
+
+def write_records(batches, fmt, columns):
+    """Yield text chunks for ``batches`` (iterables of dicts), one per batch."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in batches:
+            for record in batch:
+                writer.writerow([_csv_value(record.get(column)) for column in columns])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+
+    for batch in batches:
+        yield "".join(
+            json.dumps({column: record.get(column) for column in columns}, default=str)
+            + "\n"
+            for record in batch
+        )
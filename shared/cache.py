@@ -1,4 +1,104 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
 
-#from flask_caching import Cache
+from flask import current_app
+from flask_caching import Cache
 
-#cache = Cache()
+cache = Cache()
+
+logger = logging.getLogger(__name__)
+
+
+def cache_get(key):
+    """Read a key from the cache, treating backend errors as a miss."""
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning("Cache get failed for %s: %s", key, e)
+        return None
+
+
+def cache_set(key, value, timeout=None):
+    """Write a key to the cache; a failing backend must never fail the request."""
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception as e:
+        logger.warning("Cache set failed for %s: %s", key, e)
+
+
+def cache_delete(*keys):
+    try:
+        cache.delete_many(*keys)
+    except Exception as e:
+        logger.warning("Cache delete failed for %s: %s", keys, e)
+
+
+def cache_is_shared() -> bool:
+    """Whether every worker sees the same cache (CACHE_SHARED, which defaults
+    to False for the per-process SimpleCache)."""
+    return bool(current_app.config.get("CACHE_SHARED"))
+
+
+def get_namespace_version(namespace: str) -> str:
+    """Return the current version token of a cache namespace.
+
+    Keys of a namespace embed this token, so bumping it invalidates every key
+    at once without scanning the backend (Redis has no cheap prefix delete).
+    """
+    version_key = f"{namespace}:version"
+    version = cache_get(version_key)
+    if version is None:
+        candidate = uuid.uuid4().hex
+        try:
+            # add() only writes if no other worker initialised it first
+            cache.add(version_key, candidate, timeout=0)
+        except Exception as e:
+            logger.warning("Cache add failed for %s: %s", version_key, e)
+        version = cache_get(version_key) or candidate
+    return version
+
+
+def bump_namespace_version(namespace: str):
+    cache_set(f"{namespace}:version", uuid.uuid4().hex, timeout=0)
+
+
+class LocalTTLCache:
+    """Small thread-safe LRU with per-entry expiry, private to one worker.
+
+    For read-mostly lookups where even a Redis round trip is worth saving;
+    callers handle cross-worker invalidation themselves (e.g. by storing a
+    namespace version alongside each value).
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
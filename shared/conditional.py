@@ -0,0 +1,55 @@
+import hashlib
+from datetime import timezone
+
+from flask import current_app, request
+
+
+def compute_etag(*parts) -> str:
+    """Strong ETag from the values that determine a representation
+    (ids, updated_at stamps, counts, cache versions, query args)."""
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def _client_copy_is_fresh(etag, last_modified):
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional_response(etag, build, last_modified=None):
+    """Answer 304 when the client already holds this representation,
+    otherwise return ``build()`` (anything a view may return) tagged with
+    validators.
+
+    ``build`` is only called on a miss, so matching requests skip the main
+    query and serialization. Non-200 results are passed through untagged,
+    and so is everything when ``etag`` is None (no safe validator exists).
+    """
+    if etag is None:
+        return build()
+    last_modified = _as_utc(last_modified)
+    if _client_copy_is_fresh(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.make_response(build())
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Caches may store it but must revalidate before reuse
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,196 @@
+"""Background jobs: deferred work stored in the ``jobs`` table.
+
+Services mark a function as a task with ``@job("name")`` and enqueue it
+with ``fn.delay(**kwargs)`` (or ``fn.schedule(run_at, **kwargs)``). The job
+row is added to the caller's session, so it is committed, and later run,
+only if the business change that caused it commits too. Task arguments must
+be JSON-serializable keyword arguments.
+
+``python worker.py`` runs due jobs on a thread pool, retries failures with
+exponential backoff up to the task's ``max_attempts`` and enqueues the
+periodic tasks (``@job(..., every=seconds)``) once per interval across all
+workers; ``enabled_if`` names a config key that must be set for a periodic
+task to be scheduled.
+"""
+
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Optional
+
+from flask import current_app
+from instance.database import db
+from repo import job_repo
+from shared import crono
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    fn: Callable
+    max_attempts: int
+    retry_base_seconds: int
+    every: Optional[int]
+    enabled_if: Optional[str] = None
+
+
+_tasks = {}
+
+
+def job(name, max_attempts=3, retry_base_seconds=30, every=None, enabled_if=None):
+    """Register the decorated function as task ``name``.
+
+    The function stays directly callable and gains ``delay(**kwargs)`` and
+    ``schedule(run_at, **kwargs)``. ``every`` (seconds) makes it periodic,
+    only while config ``enabled_if`` is truthy when that is given.
+    """
+
+    def decorator(fn):
+        _tasks[name] = TaskSpec(fn, max_attempts, retry_base_seconds, every, enabled_if)
+        fn.task_name = name
+        fn.delay = lambda **kwargs: enqueue(name, **kwargs)
+        fn.schedule = lambda run_at, **kwargs: enqueue(name, run_at=run_at, **kwargs)
+        return fn
+
+    return decorator
+
+
+def get_task(name) -> Optional[TaskSpec]:
+    return _tasks.get(name)
+
+
+def enqueue(task, run_at=None, **kwargs):
+    """Add a run of ``task`` to the current session (not committed)."""
+    spec = _tasks[task]
+    return job_repo.create_job(
+        task,
+        json.dumps(kwargs, default=str),
+        run_at or crono.now(),
+        spec.max_attempts,
+    )
+
+
+def enqueue_periodic(now=None) -> int:
+    """Enqueue every periodic task whose interval slot has no job yet.
+
+    The slot number is part of a unique dedupe key, so several workers
+    polling at once still produce one run per interval.
+    """
+    now = now or crono.now()
+    added = 0
+    try:
+        for name, spec in _tasks.items():
+            if not spec.every:
+                continue
+            if spec.enabled_if and not current_app.config.get(spec.enabled_if):
+                continue
+            slot = int(now.timestamp() // spec.every)
+            added += job_repo.create_job_once(
+                name, "{}", now, spec.max_attempts, f"{name}@{slot}"
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return added
+
+
+def retry_delay(spec: TaskSpec, attempts: int) -> timedelta:
+    cap = current_app.config.get("JOB_RETRY_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(cap, spec.retry_base_seconds * 2 ** (attempts - 1)))
+
+
+def _run_claimed(app, job_id, task, payload, attempts, claim_token):
+    with app.app_context():
+        spec = _tasks.get(task)
+        try:
+            if spec is None:
+                raise LookupError(f"Unknown task {task!r}")
+            spec.fn(**json.loads(payload))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            attempts += 1
+            if spec is not None and attempts < spec.max_attempts:
+                retry_at = crono.now() + retry_delay(spec, attempts)
+                current_app.logger.warning(
+                    "Job %s (%s) failed, attempt %s, retrying at %s: %s",
+                    job_id,
+                    task,
+                    attempts,
+                    retry_at,
+                    e,
+                )
+                job_repo.finish_job(
+                    job_id, claim_token, "queued", error=repr(e), run_at=retry_at
+                )
+            else:
+                current_app.logger.exception(
+                    "Job %s (%s) failed for good after %s attempts",
+                    job_id,
+                    task,
+                    attempts,
+                )
+                job_repo.finish_job(
+                    job_id, claim_token, "failed", finished_at=crono.now(), error=repr(e)
+                )
+        else:
+            job_repo.finish_job(job_id, claim_token, "succeeded", finished_at=crono.now())
+        db.session.commit()
+
+
+def run_due_jobs(app, executor=None, batch_size=None) -> int:
+    """Claim one batch of due jobs and run it, on ``executor`` if given
+    (inline otherwise). Returns the number of jobs run."""
+    with app.app_context():
+        batch_size = batch_size or app.config.get("JOB_BATCH_SIZE", 20)
+        now = crono.now()
+        claim_until = now + timedelta(
+            seconds=app.config.get("JOB_CLAIM_TIMEOUT_SECONDS", 600)
+        )
+        token = uuid.uuid4().hex
+        try:
+            claimed = [
+                (j.id, j.task, j.payload, j.attempts, token)
+                for j in job_repo.claim_due_jobs(now, batch_size, token, claim_until)
+            ]
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    if executor is None:
+        for args in claimed:
+            _run_claimed(app, *args)
+    else:
+        wait([executor.submit(_run_claimed, app, *args) for args in claimed])
+    return len(claimed)
+
+
+def run_worker(app, stop_event=None):
+    """Poll for jobs until ``stop_event`` is set."""
+    stop_event = stop_event or threading.Event()
+    threads = app.config.get("JOB_WORKER_THREADS", 4)
+    poll_seconds = app.config.get("JOB_POLL_SECONDS", 1)
+    app.logger.info("Job worker started with %s threads", threads)
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="job") as executor:
+        while not stop_event.is_set():
+            with app.app_context():
+                enqueue_periodic()
+            if not run_due_jobs(app, executor, batch_size=threads * 2):
+                stop_event.wait(poll_seconds)
+    app.logger.info("Job worker stopped")
+
+
+@job("jobs.purge_finished", max_attempts=1, every=3600)
+def purge_finished_jobs():
+    """Delete succeeded jobs (periodic dedupe rows included) past retention."""
+    from models.job import Jobs
+
+    days = current_app.config.get("JOB_RETENTION_DAYS", 7)
+    Jobs.query.filter(
+        Jobs.status == "succeeded", Jobs.finished_at < crono.back_days(days)
+    ).delete(synchronize_session=False)
+    db.session.commit()
@@ -0,0 +1,25 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(*values) -> str:
+    """Encode the position of the last row of a page into an opaque token.
+
+    Values are JSON encoded (datetimes/Decimals as strings) and base64url'd so
+    the token can travel safely in a query string.
+    """
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    """Decode a token produced by encode_cursor; raises ValueError if invalid."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
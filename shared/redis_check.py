@@ -13,4 +13,4 @@ def check_redis_connection(app):
         redis_client.ping()
         app.logger.info("✅ Redis limiter storage connected successfully.")
     except Exception as e:
-        app.logger.error(f"❌ Failed to connect to Redis Limiter: {e}")
+        app.logger.error("❌ Failed to connect to Redis Limiter: %s", e)
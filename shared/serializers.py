@@ -0,0 +1,189 @@
+"""Model serializers shared by the routes.
+
+Each serializer's field plan (output name, attribute getter, converter) is
+resolved once at import time, so serializing a row is a single loop over
+prebuilt getters with no per-field type checks.
+"""
+
+from operator import attrgetter
+
+
+def as_float(value):
+    return None if value is None else float(value)
+
+
+def as_str(value):
+    return None if value is None else str(value)
+
+
+def as_iso(value):
+    return None if value is None else value.isoformat()
+
+
+def enum_value(value):
+    return None if value is None else value.value
+
+
+class Serializer:
+    """Serialize objects to dicts from a fixed list of fields.
+
+    A field is either an attribute name, or a ``(name, source)`` /
+    ``(name, source, convert)`` tuple where ``source`` is a (dotted)
+    attribute name or a callable taking the object.
+    """
+
+    __slots__ = ("_plan", "_subsets")
+
+    def __init__(self, *fields):
+        plan = []
+        for field in fields:
+            if isinstance(field, str):
+                field = (field, field)
+            name, source, convert = (tuple(field) + (None,))[:3]
+            getter = source if callable(source) else attrgetter(source)
+            plan.append((name, getter, convert))
+        self._plan = tuple(plan)
+        self._subsets = {}
+
+    @property
+    def names(self) -> tuple:
+        return tuple(name for name, _, _ in self._plan)
+
+    def only(self, names) -> "Serializer":
+        """Serializer emitting just ``names`` (kept in declaration order).
+
+        Subsets are built once per distinct field set and reused.
+        """
+        key = frozenset(names)
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = Serializer.__new__(Serializer)
+            subset._plan = tuple(entry for entry in self._plan if entry[0] in key)
+            subset._subsets = {}
+            self._subsets[key] = subset
+        return subset
+
+    def one(self, obj) -> dict:
+        return {
+            name: convert(getter(obj)) if convert else getter(obj)
+            for name, getter, convert in self._plan
+        }
+
+    def many(self, objs) -> list:
+        one = self.one
+        return [one(obj) for obj in objs]
+
+
+def parse_fields(value, serializer, always=("id",)):
+    """Parse a sparse fieldset query arg (``fields=id,name,price``).
+
+    Returns a frozenset of field names including ``always``, or None when no
+    projection was asked for. Raises ValueError on unknown names.
+    """
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(serializer.names)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(serializer.names)}"
+        )
+    return frozenset(requested.union(always))
+
+
+def _vendor_name(obj):
+    vendor = obj.vendor
+    return vendor.username if vendor else None
+
+
+CATEGORY_SUMMARY = Serializer("id", "name", "slug")
+
+CATEGORY = Serializer("id", "name", "slug", "image_url", "vendor_id", "parent_id")
+
+PRODUCT = Serializer(
+    "id",
+    "name",
+    "slug",
+    "description",
+    "currency",
+    ("price", "price", as_float),
+    "discount_percentage",
+    "stock_quantity",
+    "unit_quantity",
+    "image_url",
+    "location",
+    "featured",
+    "flash_sale",
+    "vendor_id",
+    ("vendor_name", _vendor_name),
+    ("created_at", "created_at", as_iso),
+    ("updated_at", "updated_at", as_iso),
+    "is_approved",
+    "rejected",
+    ("rating_avg", "rating_avg", as_float),
+    "rating_count",
+    ("categories", "categories_linked", CATEGORY_SUMMARY.many),
+)
+
+ORDER_ITEM = Serializer(
+    "product_id",
+    ("product_name", "product.name"),
+    "quantity",
+    ("image_url", "product.image_url"),
+    ("unit_price", "unit_price", as_float),
+    ("vendor_id", "product.vendor_id"),
+    ("vendor_name", lambda item: _vendor_name(item.product)),
+)
+
+ORDER = Serializer(
+    "id",
+    ("total_amount", "total_amount", as_str),
+    "status",
+    ("created_at", "created_at", as_iso),
+    ("items", "order_items", ORDER_ITEM.many),
+)
+
+# What a user sees of their own account
+USER_PROFILE = Serializer(
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "phone",
+    ("role", "role", enum_value),
+    "image_url",
+    "address",
+    "city",
+    "state",
+    "zip_code",
+    "country",
+)
+
+# Admin user management list
+USER_ACCOUNT = Serializer(
+    "id",
+    "username",
+    "email",
+    ("role", "role", enum_value),
+    "is_active",
+    ("created_at", "created_at", as_iso),
+)
+
+# What anyone may see of another user
+USER_PUBLIC = Serializer(
+    "id",
+    "username",
+    "city",
+    "image_url",
+    ("role", "role", enum_value),
+)
+
+NOTIFICATION = Serializer(
+    "id",
+    "message",
+    "link",
+    "is_read",
+    ("created_at", "created_at", as_iso),
+)
@@ -0,0 +1,83 @@
+"""A minimal in-process SMTP server for tests (no TLS, no auth)."""
+
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.sessions += 1
+        self.reply("220 localhost test SMTP ready")
+        envelope = {"from": None, "to": []}
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                envelope = {"from": command[10:].strip("<> "), "to": []}
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                envelope["to"].append(command[8:].strip("<> "))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b".\n", b""):
+                        break
+                    data.append(chunk.decode())
+                if server.reject_next:
+                    server.reject_next -= 1
+                    self.reply("451 Temporary failure, try again later")
+                else:
+                    server.messages.append({**envelope, "data": "".join(data)})
+                    self.reply("250 OK queued")
+            elif verb == "RSET":
+                envelope = {"from": None, "to": []}
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Records delivered messages; ``reject_next = n`` makes the next n
+    messages fail with a transient 451."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = []
+        self.sessions = 0
+        self.reject_next = 0
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -2,3 +2,20 @@ def test_index(client):
     """Test the index route."""
     response = client.get("/")
     assert response.status_code == 200
+
+
+def test_json_provider_matches_flask_defaults(app):
+    """The fast JSON provider must not change how values are encoded."""
+    import json
+    from datetime import datetime
+    from decimal import Decimal
+    from flask.json.provider import DefaultJSONProvider
+
+    payload = {"b": Decimal("12.50"), "a": datetime(2025, 1, 2, 3, 4, 5)}
+    assert json.loads(app.json.dumps(payload)) == json.loads(
+        DefaultJSONProvider(app).dumps(payload)
+    )
+    with app.test_request_context():
+        assert app.json.response(payload).get_data() == DefaultJSONProvider(
+            app
+        ).response(payload).get_data()
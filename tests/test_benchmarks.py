@@ -0,0 +1,49 @@
+from benchmarks import load, seed
+from instance.database import db
+from models.order_item import OrderItems
+from models.product import Products
+
+
+def test_seeder_fills_search_text_for_bulk_rows(app, init_db):
+    with app.app_context():
+        counts = seed.seed(scale=0.001, echo=lambda *_: None)
+        assert counts["order_items"] == counts["orders"] * 4
+        assert OrderItems.query.count() == counts["order_items"]
+        product = Products.query.filter(Products.slug.like("bench-product-%")).first()
+        assert product.search_text.startswith(product.name)
+
+
+def test_every_scenario_runs_against_the_test_client(app, init_db):
+    with app.app_context():
+        seed.seed(scale=0.001, echo=lambda *_: None)
+        db.session.remove()
+
+    results = load.run(
+        app, load.ClientTarget(app), duration=0.1, warmup=1, echo=lambda *_: None
+    )
+    assert set(results["scenarios"]) == set(load.SCENARIOS)
+    for name, summary in results["scenarios"].items():
+        assert summary["requests"] > 0, name
+        assert summary["errors"] == 0, (name, summary["status_counts"])
+        assert summary["queries_per_request"] is not None
+        assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+
+
+def test_compare_flags_regressions():
+    def doc(rps, p95, queries):
+        return {
+            "scenarios": {
+                "browse": {
+                    "rps": rps,
+                    "p95_ms": p95,
+                    "p99_ms": p95,
+                    "queries_per_request": queries,
+                }
+            }
+        }
+
+    assert load.compare(doc(100, 10, 2), doc(100, 10, 2), 0.1) == []
+    assert load.compare(doc(95, 10.5, 2), doc(100, 10, 2), 0.1) == []
+    problems = load.compare(doc(80, 15, 3), doc(100, 10, 2), 0.1)
+    assert len(problems) == 4
+    assert problems[0] == "browse: rps 100 -> 80"
@@ -129,3 +129,21 @@ def test_remove_cart_item(client, app, customer_token, seed_product):
         assert response.status_code == 200
         assert response.get_json()["message"] == "Item removed from cart successfully."
 
+
+
+def test_cart_holds_one_row_per_product(client, app, customer_token, seed_product):
+    from sqlalchemy.exc import IntegrityError
+
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    for quantity in (2, 3):
+        client.post("/cart/items", json={"product_id": 1, "quantity": quantity}, headers=headers)
+
+    items = client.get("/cart/items", headers=headers).get_json()["items"]
+    assert [(i["product_id"], i["quantity"]) for i in items] == [(1, 5)]
+
+    with app.app_context():
+        cart_id = CartItems.query.first().cart_id
+        db.session.add(CartItems(cart_id=cart_id, product_id=1, quantity=1))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
@@ -127,3 +127,118 @@ def test_delete_category(client, vendor_token):
     if response.status_code == 200:
         data = response.get_json()
         assert data["msg"] == "Category deleted successfully"
+
+
+def test_category_tree_nests_and_counts_approved_products(client, app, vendor_token):
+    from models.category import Categories
+    from models.product import Products
+    from models.product_category import ProductCategories
+
+    with app.app_context():
+        root = db.session.get(Categories, app.test_category_id)
+        child = Categories(name="Arabica", slug="arabica", vendor_id=app.test_vendor_id, parent_id=root.id)
+        db.session.add(child)
+        db.session.flush()
+        for i, approved in enumerate([True, True, False]):
+            product = Products(
+                name=f"Tree Coffee {i}",
+                slug=f"tree-coffee-{i}",
+                description="Tree fixture",
+                price=1000,
+                stock_quantity=1,
+                unit_quantity="pcs",
+                vendor_id=app.test_vendor_id,
+                is_approved=approved,
+            )
+            db.session.add(product)
+            db.session.flush()
+            db.session.add(ProductCategories(product_id=product.id, category_id=child.id))
+        db.session.commit()
+        child_id = child.id
+
+    response = client.get("/categories/tree")
+    assert response.status_code == 200
+    (root_node,) = response.get_json()["categories"]
+    assert root_node["id"] == app.test_category_id
+    assert root_node["product_count"] == 0
+    (child_node,) = root_node["children"]
+    assert (child_node["id"], child_node["product_count"]) == (child_id, 2)
+
+    etag = response.headers["ETag"]
+    response = client.get("/categories/tree", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Category changes invalidate the cached tree
+    headers = {"Authorization": f"Bearer {vendor_token}"}
+    client.put(f"/categories/{child_id}", json={"name": "Robusta"}, headers=headers)
+    response = client.get("/categories/tree", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["categories"][0]["children"][0]["name"] == "Robusta"
+
+
+def test_category_cannot_be_nested_under_its_own_subcategory(client, app, vendor_token):
+    from models.category import Categories
+
+    with app.app_context():
+        child = Categories(name="Liberica", slug="liberica", vendor_id=app.test_vendor_id, parent_id=app.test_category_id)
+        db.session.add(child)
+        db.session.commit()
+        child_id = child.id
+
+    headers = {"Authorization": f"Bearer {vendor_token}"}
+    for parent_id in (app.test_category_id, child_id):
+        response = client.put(f"/categories/{app.test_category_id}", json={"parent_id": parent_id}, headers=headers)
+        assert response.status_code == 400
+    with app.app_context():
+        assert db.session.get(Categories, app.test_category_id).parent_id is None
+
+
+def test_category_tree_survives_a_parent_cycle(client, app):
+    from models.category import Categories
+
+    # Written straight to the database, bypassing the update check
+    with app.app_context():
+        a = Categories(name="Cycle A", slug="cycle-a", vendor_id=app.test_vendor_id)
+        b = Categories(name="Cycle B", slug="cycle-b", vendor_id=app.test_vendor_id)
+        db.session.add_all([a, b])
+        db.session.flush()
+        a.parent_id, b.parent_id = b.id, a.id
+        db.session.commit()
+        a_id, b_id = a.id, b.id
+
+    response = client.get("/categories/tree")
+    assert response.status_code == 200
+    roots = {node["id"]: node for node in response.get_json()["categories"]}
+    # The cycle is cut at one edge: B becomes a root holding A
+    assert [child["id"] for child in roots[b_id]["children"]] == [a_id]
+    assert a_id not in roots
+
+
+def test_get_all_categories_conditional_get(client, vendor_token):
+    etag = client.get("/categories").headers["ETag"]
+    assert client.get("/categories", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(
+        "/categories",
+        json={"name": "Tea", "slug": "tea"},
+        headers={"Authorization": f"Bearer {vendor_token}"},
+    )
+    res = client.get("/categories", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.get_json()["count"] == 2
+
+
+def test_category_rename_refreshes_product_listing(client, app, vendor_token, seed_product):
+    def listed_categories():
+        products = client.get("/products").get_json()["products"]
+        return [c["name"] for c in products[0]["categories"]]
+
+    before = listed_categories()  # now cached
+    response = client.put(
+        f"/categories/{app.test_category_id}",
+        json={"name": "Renamed Beans"},
+        headers={"Authorization": f"Bearer {vendor_token}"},
+    )
+    assert response.status_code == 200
+    assert before != ["Renamed Beans"]
+    assert listed_categories() == ["Renamed Beans"]
@@ -1,8 +1,14 @@
 import pytest
 from instance.database import db
 import json
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
+from sqlalchemy import event
+
+from models.feedback import Feedbacks
+from models.product import Products
+
 
 def test_create_feedback(client, customer_token, seed_product):
     payload = {"product_id": seed_product.id, "rating": 4, "comment": "Great coffee!"}
@@ -116,3 +122,169 @@ def test_delete_feedback(client, app, customer_token, seed_product):
     )
     assert response.status_code == 200
     assert response.get_json()["msg"] == "Feedback deleted successfully"
+
+
+def _review(client, token, product_id, rating):
+    return client.post(
+        "/feedback",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"product_id": product_id, "rating": rating, "comment": "Review"},
+    )
+
+
+def test_feedback_maintains_product_rating(client, customer_token, seed_product):
+    assert client.get("/products").get_json()["products"][0]["rating_count"] == 0
+    created = [_review(client, customer_token, seed_product.id, r) for r in (5, 4, 4)]
+    assert all(response.status_code == 201 for response in created)
+
+    product = client.get(f"/products/{seed_product.id}").get_json()
+    assert product["rating_count"] == 3
+    assert product["rating_avg"] == 4.33
+    # The cached listing was invalidated too
+    listed = client.get("/products").get_json()["products"][0]
+    assert (listed["rating_count"], listed["rating_avg"]) == (3, 4.33)
+
+    feedback_id = created[0].get_json()["feedback"]["id"]
+    client.delete(
+        f"/feedback/{feedback_id}",
+        headers={"Authorization": f"Bearer {customer_token}"},
+    )
+    product = client.get(f"/products/{seed_product.id}").get_json()
+    assert product["rating_count"] == 2
+    assert product["rating_avg"] == 4.0
+
+
+def test_feedback_for_unknown_product(client, customer_token, init_db):
+    response = _review(client, customer_token, 9999, 5)
+    assert response.status_code == 400
+    assert response.get_json()["msg"] == "Product not found"
+
+
+def test_products_sorted_by_rating(client, app, customer_token):
+    with app.app_context():
+        products = [
+            Products(
+                name=f"Rated {i}",
+                slug=f"rated-{i}",
+                description="Rating sort fixture",
+                price=10000,
+                stock_quantity=5,
+                unit_quantity="250g",
+                vendor_id=app.test_vendor_id,
+                is_approved=True,
+            )
+            for i in range(4)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        ids = [p.id for p in products]
+
+    for product_id, ratings in zip(ids, [(3,), (5, 4), (5,), ()]):
+        for rating in ratings:
+            _review(client, customer_token, product_id, rating)
+
+    res = client.get("/products?sort_by=rating&pagination=cursor&limit=2").get_json()
+    assert [p["id"] for p in res["products"]] == [ids[2], ids[1]]
+    res = client.get(f"/products?sort_by=rating&cursor={res['next_cursor']}&limit=2").get_json()
+    assert [p["id"] for p in res["products"]] == [ids[0], ids[3]]
+    assert res["products"][1]["rating_avg"] == 0.0
+
+
+def _seed_reviews(app, product_id, ratings):
+    start = datetime(2026, 1, 1)
+    with app.app_context():
+        reviews = [
+            Feedbacks(
+                user_id=app.test_customer_id,
+                product_id=product_id,
+                rating=rating,
+                comment=f"Review {i}",
+                # Pairs share a timestamp so the id tie-breaker is exercised
+                created_at=start + timedelta(minutes=i // 2),
+            )
+            for i, rating in enumerate(ratings)
+        ]
+        db.session.add_all(reviews)
+        db.session.commit()
+        return [r.id for r in reviews]
+
+
+def _walk(client, url, **headers):
+    seen = []
+    res = client.get(url, headers=headers).get_json()
+    while True:
+        seen.extend(fb["id"] for fb in res["feedback"])
+        if not res["next_cursor"]:
+            return seen
+        separator = "&" if "?" in url else "?"
+        res = client.get(
+            f"{url}{separator}cursor={res['next_cursor']}", headers=headers
+        ).get_json()
+
+
+def test_feedback_by_product_cursor_pages(client, app, seed_product):
+    ids = _seed_reviews(app, seed_product.id, [5, 4, 5, 3, 1, 5, 4])
+
+    first = client.get(f"/feedback/product/{seed_product.id}?limit=3").get_json()
+    assert first["count"] == 3
+    assert "histogram" not in first
+
+    assert _walk(client, f"/feedback/product/{seed_product.id}?limit=3") == ids[::-1]
+    five_stars = _walk(client, f"/feedback/product/{seed_product.id}?limit=2&rating=5")
+    assert five_stars == [ids[5], ids[2], ids[0]]
+
+
+def test_feedback_by_user_cursor_pages(client, app, customer_token, seed_product):
+    ids = _seed_reviews(app, seed_product.id, [2, 3, 4, 5])
+    seen = _walk(
+        client,
+        f"/feedback/user/{app.test_customer_id}?limit=3",
+        Authorization=f"Bearer {customer_token}",
+    )
+    assert seen == ids[::-1]
+
+
+def test_feedback_histogram(client, app, seed_product):
+    _seed_reviews(app, seed_product.id, [5, 4, 5, 3, 5])
+    res = client.get(f"/feedback/product/{seed_product.id}?histogram=true&limit=1")
+    assert res.get_json()["histogram"] == {"1": 0, "2": 0, "3": 1, "4": 1, "5": 3}
+
+
+def test_feedback_pages_reject_bad_arguments(client, seed_product):
+    url = f"/feedback/product/{seed_product.id}"
+    assert client.get(f"{url}?cursor=not-a-cursor").status_code == 400
+    assert client.get(f"{url}?rating=6").status_code == 400
+
+
+def test_feedback_page_uses_index(client, app, seed_product):
+    _seed_reviews(app, seed_product.id, [5, 4, 3])
+    with app.app_context():
+        engine = db.engine
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().startswith("SELECT") and "feedback" in statement:
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            client.get(f"/feedback/product/{seed_product.id}?limit=1&rating=5")
+            first = client.get(f"/feedback/product/{seed_product.id}?limit=1")
+            client.get(
+                f"/feedback/product/{seed_product.id}?limit=1"
+                f"&cursor={first.get_json()['next_cursor']}"
+            )
+            client.get(f"/feedback/product/{seed_product.id}?limit=1&histogram=true")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                plan = [
+                    row[-1]
+                    for row in conn.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                ]
+                assert any("USING" in step and "INDEX ix_feedback" in step for step in plan), plan
+                assert not any("TEMP B-TREE" in step for step in plan), plan
@@ -0,0 +1,104 @@
+import re
+import pytest
+from middlewares.instrumentation import registry
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def _scrape(client, app):
+    app.config["METRICS_TOKEN"] = "scrape-secret"
+    return client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+
+def _metric(body, name, **labels):
+    selector = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf"^{name}{{{re.escape(selector)}[^}}]*}} (\S+)$", body, re.M)
+    return float(match.group(1)) if match else None
+
+
+def test_server_timing_header(client):
+    res = client.get("/products")
+    assert res.status_code == 200
+
+    timing = res.headers["Server-Timing"]
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+    assert match and int(match.group(1)) >= 2
+    assert "ser;dur=" in timing
+    assert "total;dur=" in timing
+
+
+def test_metrics_aggregate_per_endpoint(client, app):
+    for _ in range(3):
+        client.get("/products")
+    client.get("/no-such-page")
+
+    res = _scrape(client, app)
+    assert res.status_code == 200
+    assert res.mimetype == "text/plain"
+    body = res.get_data(as_text=True)
+
+    endpoint = {"endpoint": "product_bp.get_all_products", "method": "GET"}
+    assert _metric(body, "http_requests_total", **endpoint, status=200) == 3
+    assert _metric(body, "http_request_duration_seconds_count", **endpoint) == 3
+    # COUNT and page of the first request; the other two hit the listing cache
+    assert _metric(body, "db_queries_total", **endpoint) == 2
+    assert _metric(body, "http_response_bytes_total", **endpoint) > 0
+    assert _metric(body, "n_plus_one_requests_total", **endpoint) == 0
+    assert (
+        _metric(body, "http_requests_total", endpoint="unmatched", method="GET", status=404)
+        == 1
+    )
+    # Scrapes are not counted
+    assert "endpoint=\"metrics\"" not in body
+
+
+def test_n_plus_one_requests_are_flagged(client, app, caplog):
+    app.config["N_PLUS_ONE_QUERY_THRESHOLD"] = 1
+    client.get("/products")
+
+    body = _scrape(client, app).get_data(as_text=True)
+    assert (
+        _metric(
+            body,
+            "n_plus_one_requests_total",
+            endpoint="product_bp.get_all_products",
+            method="GET",
+        )
+        == 1
+    )
+    assert "Possible N+1: GET /products" in caplog.text
+
+
+def test_metrics_token(client, app):
+    # Hidden until a token is configured
+    assert client.get("/metrics").status_code == 404
+
+    app.config["METRICS_TOKEN"] = "scrape-secret"
+    assert client.get("/metrics").status_code == 401
+    res = client.get("/metrics", headers={"Authorization": "Bearer scrape-secrét"})
+    assert res.status_code == 401
+    res = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert res.status_code == 200
+
+
+def test_failed_statements_do_not_leak_timings(app, init_db):
+    from flask import g
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from instance.database import db
+    from middlewares.instrumentation import RequestMetrics
+
+    with app.test_request_context("/products"):
+        g._request_metrics = RequestMetrics()
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+            assert conn.info["_query_started"] == []
+        assert g._request_metrics.query_count == 4
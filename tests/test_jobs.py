@@ -0,0 +1,213 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from instance.database import db
+from models.job import Jobs
+from models.notification import Notification
+from models.product import Products
+from repo import job_repo
+from services import order_services, product_services
+from shared import crono
+from shared.jobs import enqueue_periodic, job, run_due_jobs
+
+calls = []
+
+
+@job("tests.record", max_attempts=2, retry_base_seconds=60)
+def record_call(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def _jobs(task=None):
+    query = Jobs.query.order_by(Jobs.id)
+    if task:
+        query = query.filter_by(task=task)
+    return query.all()
+
+
+def _make_due(job_row):
+    job_row.run_at = crono.now() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_delay_joins_the_callers_transaction(app, init_db):
+    with app.app_context():
+        record_call.delay(value=1)
+        db.session.rollback()
+        assert _jobs() == []
+
+        record_call.delay(value=2)
+        db.session.commit()
+        (row,) = _jobs()
+        assert row.task == "tests.record"
+        assert json.loads(row.payload) == {"value": 2}
+        assert row.status == "queued"
+
+    assert run_due_jobs(app) == 1
+    assert calls == [2]
+    with app.app_context():
+        row = _jobs()[0]
+        assert row.status == "succeeded"
+        assert row.attempts == 1
+        assert row.finished_at is not None
+
+
+def test_scheduled_job_waits_for_run_at(app, init_db):
+    with app.app_context():
+        record_call.schedule(crono.now() + timedelta(hours=1), value=3)
+        db.session.commit()
+
+    assert run_due_jobs(app) == 0
+    assert calls == []
+
+
+def test_failed_job_is_retried_with_backoff_then_marked_failed(app, init_db):
+    with app.app_context():
+        record_call.delay(value=4, fail=True)
+        db.session.commit()
+
+    assert run_due_jobs(app) == 1
+    with app.app_context():
+        row = _jobs()[0]
+        assert row.status == "queued"
+        assert row.attempts == 1
+        assert "boom" in row.last_error
+        assert row.run_at > (crono.now() + timedelta(seconds=50)).replace(tzinfo=None)
+
+        # Not due yet
+        assert run_due_jobs(app) == 0
+        _make_due(row)
+
+    assert run_due_jobs(app) == 1
+    assert calls == [4, 4]
+    with app.app_context():
+        row = _jobs()[0]
+        assert row.status == "failed"
+        assert row.attempts == 2
+
+
+def test_stale_claim_is_picked_up_again(app, init_db):
+    with app.app_context():
+        record_call.delay(value=5)
+        db.session.commit()
+        now = crono.now()
+        # A worker claimed it and died before finishing
+        job_repo.claim_due_jobs(now, 10, "deadworker", now - timedelta(seconds=1))
+        db.session.commit()
+
+    assert run_due_jobs(app) == 1
+    assert calls == [5]
+    with app.app_context():
+        row = _jobs()[0]
+        assert row.status == "succeeded"
+        # The lost run and the successful one
+        assert row.attempts == 2
+
+
+def test_job_that_keeps_losing_its_claim_fails(app, init_db):
+    with app.app_context():
+        record_call.delay(value=6)
+        db.session.commit()
+        # max_attempts=2: two workers die holding it
+        for _ in range(2):
+            now = crono.now()
+            job_repo.claim_due_jobs(now, 10, "deadworker", now - timedelta(seconds=1))
+            db.session.commit()
+
+    assert run_due_jobs(app) == 0
+    assert calls == []
+    with app.app_context():
+        row = _jobs()[0]
+        assert row.status == "failed"
+        assert row.attempts == 2
+        assert row.claim_token is None
+        assert "Claim expired" in row.last_error
+
+
+def test_periodic_jobs_are_enqueued_once_per_slot(app, init_db):
+    with app.app_context():
+        now = crono.now()
+        first = enqueue_periodic(now)
+        assert first > 0
+        assert enqueue_periodic(now) == 0
+        tasks = [row.task for row in _jobs()]
+        # Reservation expiry is opt-in (STOCK_RESERVATION_TTL_MINUTES)
+        assert "reservations.release_expired" not in tasks
+        assert "email.deliver_outbox" in tasks
+        assert len(tasks) == len(set(tasks)) == first
+
+    assert run_due_jobs(app) == first
+    with app.app_context():
+        assert {row.status for row in _jobs()} == {"succeeded"}
+
+    app.config["STOCK_RESERVATION_TTL_MINUTES"] = 30
+    with app.app_context():
+        assert enqueue_periodic(now) == 1
+        assert _jobs()[-1].task == "reservations.release_expired"
+
+
+def test_jobs_run_on_a_thread_pool(app, init_db):
+    with app.app_context():
+        for value in range(6):
+            record_call.delay(value=value)
+        db.session.commit()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert run_due_jobs(app, executor) == 6
+    assert sorted(calls) == list(range(6))
+    with app.app_context():
+        assert {row.status for row in _jobs()} == {"succeeded"}
+
+
+def test_order_status_notification_is_deferred(app, init_db, seed_product):
+    with app.app_context():
+        order, error = order_services.create_order_with_items(
+            app.test_customer_id,
+            [{"product_id": 1, "quantity": 1}],
+        )
+        assert error is None
+        order_id = order.id
+        _, error = order_services.update_order_status(order_id, "shipped")
+        assert error is None
+
+        # Nothing is written on the request path beyond the job row
+        assert Notification.query.count() == 0
+        (row,) = _jobs("notifications.notify_user")
+        assert json.loads(row.payload)["user_id"] == app.test_customer_id
+
+    run_due_jobs(app)
+    with app.app_context():
+        (notification,) = Notification.query.all()
+        assert notification.user_id == app.test_customer_id
+        assert "shipped" in notification.message
+        assert notification.link == f"/orders/{order_id}"
+
+
+def test_product_approval_notifies_vendor_and_warms_cache(app, init_db, seed_product):
+    with app.app_context():
+        product_services.approve_product_by_id(1)
+        tasks = [row.task for row in _jobs()]
+        assert tasks == ["notifications.notify_user", "products.warm_listing_cache"]
+
+    run_due_jobs(app)
+    with app.app_context():
+        assert {row.status for row in _jobs()} == {"succeeded"}
+        (notification,) = Notification.query.all()
+        assert notification.user_id == db.session.get(Products, 1).vendor_id
+        assert "approved" in notification.message
+
+
+def test_cache_warm_is_skipped_without_a_shared_cache(app, init_db, seed_product):
+    app.config["CACHE_SHARED"] = False
+    with app.app_context():
+        product_services.reject_product_by_id(1)
+        assert [row.task for row in _jobs()] == ["notifications.notify_user"]
@@ -0,0 +1,71 @@
+import json
+import logging
+import sys
+from flask import g
+from utils.logger import (
+    DebugSamplingFilter,
+    JsonFormatter,
+    LocalQueueHandler,
+    RequestIdFilter,
+    parse_levels,
+)
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("repo.product_repo", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_request_id_is_echoed_or_generated(client):
+    res = client.get("/", headers={"X-Request-ID": "edge-1234"})
+    assert res.headers["X-Request-ID"] == "edge-1234"
+
+    generated = client.get("/").headers["X-Request-ID"]
+    assert len(generated) == 32 and generated != client.get("/").headers["X-Request-ID"]
+
+
+def test_json_records_carry_request_id_and_extra_fields(app):
+    record = _record(order_id=7)
+    with app.test_request_context():
+        g.request_id = "req-1"
+        RequestIdFilter().filter(record)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "repo.product_repo"
+    assert entry["request_id"] == "req-1"
+    assert entry["order_id"] == 7
+
+
+def test_queue_handler_defers_formatting_but_snapshots_arguments():
+    payload = ["before"]
+    handler = LocalQueueHandler(None)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = _record(level=logging.ERROR, msg="payload %s", args=(payload,))
+        record.exc_info = sys.exc_info()
+    prepared = handler.prepare(record)
+    payload.append("after")
+
+    entry = json.loads(JsonFormatter().format(prepared))
+    assert entry["message"] == "payload ['before']"
+    assert "ValueError: boom" in entry["exc_info"]
+
+
+def test_debug_sampling():
+    drop_all = DebugSamplingFilter(rate=0.0)
+    assert not drop_all.filter(_record(level=logging.DEBUG))
+    assert drop_all.filter(_record(level=logging.INFO))
+    # A call site may ask for its own rate
+    assert drop_all.filter(_record(level=logging.DEBUG, sample_rate=1.0))
+    assert DebugSamplingFilter(rate=1.0).filter(_record(level=logging.DEBUG))
+
+
+def test_parse_levels():
+    assert parse_levels("repo.product_repo=debug, werkzeug=WARNING,,bad") == {
+        "repo.product_repo": logging.DEBUG,
+        "werkzeug": logging.WARNING,
+    }
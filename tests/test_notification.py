@@ -0,0 +1,135 @@
+from instance.database import db
+from models.notification import Notification
+from models.user import Users
+from models.wishlist_item import WishlistItems
+from repo import notification_repo
+from services import notification_services, product_services
+from shared.jobs import run_due_jobs
+
+
+def _headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _add_shoppers(count):
+    users = [
+        Users(
+            username=f"shopper{i}",
+            first_name="Shop",
+            last_name=str(i),
+            email=f"shopper{i}@mail.com",
+            password_hash="test",
+            city="Jakarta",
+            role="customer",
+        )
+        for i in range(count)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+
+def test_flash_sale_notifies_every_wishlister(app, init_db, seed_product):
+    app.config["NOTIFICATION_FANOUT_BATCH_SIZE"] = 2
+    with app.app_context():
+        shopper_ids = _add_shoppers(5)
+        db.session.add_all(
+            WishlistItems(user_id=user_id, product_id=1, vendor_id=app.test_vendor_id)
+            for user_id in shopper_ids
+        )
+        db.session.commit()
+
+        product_services.update_product_with_serialization(1, {"flash_sale": True})
+        # Fan-out happens on the worker, not in the request
+        assert Notification.query.count() == 0
+        # Already on sale: no second round
+        product_services.update_product_with_serialization(1, {"flash_sale": True})
+
+    assert run_due_jobs(app) == 1
+    with app.app_context():
+        notified = sorted(n.user_id for n in Notification.query.all())
+        assert notified == sorted(shopper_ids)
+        assert notification_services.get_unread_count(shopper_ids[0]) == 1
+
+
+def test_notify_users_inserts_in_batches(app, init_db):
+    app.config["NOTIFICATION_FANOUT_BATCH_SIZE"] = 2
+    with app.app_context():
+        user_ids = [app.test_customer_id, app.test_vendor_id, app.test_admin_id]
+        assert notification_services.notify_users(user_ids + [user_ids[0]], "Hi") == 3
+        assert Notification.query.count() == 3
+
+
+def test_inbox_pages_newest_first(client, app, customer_token):
+    with app.app_context():
+        notification_services.notify_users([app.test_customer_id], "first")
+        for i in range(4):
+            notification_services.notify_user(app.test_customer_id, f"message {i}")
+        notification_services.notify_user(app.test_vendor_id, "not yours")
+
+    response = client.get("/notifications?limit=3", headers=_headers(customer_token))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [n["message"] for n in body["notifications"]] == [
+        "message 3",
+        "message 2",
+        "message 1",
+    ]
+    assert body["unread_count"] == 5
+    assert body["next_cursor"]
+
+    response = client.get(
+        f"/notifications?limit=3&cursor={body['next_cursor']}",
+        headers=_headers(customer_token),
+    )
+    body = response.get_json()
+    assert [n["message"] for n in body["notifications"]] == ["message 0", "first"]
+    assert body["next_cursor"] is None
+
+    response = client.get("/notifications?cursor=nope", headers=_headers(customer_token))
+    assert response.status_code == 400
+
+
+def test_unread_count_is_cached_until_it_changes(client, app, customer_token):
+    with app.app_context():
+        notification_services.notify_user(app.test_customer_id, "hello")
+
+    response = client.get("/notifications/unread-count", headers=_headers(customer_token))
+    assert response.get_json() == {"unread_count": 1}
+
+    with app.app_context():
+        # Written behind the service's back: the cached counter is served
+        notification_repo.create_notification(app.test_customer_id, "sneaky")
+        db.session.commit()
+    response = client.get("/notifications/unread-count", headers=_headers(customer_token))
+    assert response.get_json() == {"unread_count": 1}
+
+    response = client.post("/notifications/read-all", headers=_headers(customer_token))
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == 2
+    response = client.get("/notifications/unread-count", headers=_headers(customer_token))
+    assert response.get_json() == {"unread_count": 0}
+
+
+def test_mark_single_notification_read(client, app, customer_token):
+    with app.app_context():
+        notification_services.notify_user(app.test_customer_id, "mine")
+        notification_services.notify_user(app.test_vendor_id, "theirs")
+        mine, theirs = [n.id for n in Notification.query.order_by(Notification.id)]
+
+    response = client.post(
+        f"/notifications/{theirs}/read", headers=_headers(customer_token)
+    )
+    assert response.status_code == 404
+
+    response = client.post(f"/notifications/{mine}/read", headers=_headers(customer_token))
+    assert response.status_code == 200
+    body = client.get(
+        "/notifications?unread=true", headers=_headers(customer_token)
+    ).get_json()
+    assert body["notifications"] == []
+    assert body["unread_count"] == 0
+
+
+def test_notifications_require_login(client):
+    assert client.get("/notifications").status_code == 401
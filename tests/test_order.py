@@ -438,3 +438,415 @@ def test_delete_order_not_found(client, customer_token):
 def test_delete_order_unauthorized(client):
     response = client.delete("/orders/1")
     assert response.status_code == 401
+
+
+def _seed_orders(app, count, items_per_order=2, status="pending"):
+    from decimal import Decimal
+    from instance.database import db
+    from models.order import Orders
+    from models.order_item import OrderItems
+    from models.product import Products
+
+    with app.app_context():
+        products = []
+        for i in range(items_per_order):
+            product = Products(
+                name=f"History Coffee {i}",
+                slug=f"history-coffee-{count}-{i}-{status}",
+                description="Order history fixture",
+                price=Decimal("1000"),
+                stock_quantity=100,
+                unit_quantity="pcs",
+                vendor_id=app.test_vendor_id,
+                is_approved=True,
+            )
+            db.session.add(product)
+            products.append(product)
+        db.session.flush()
+        for _ in range(count):
+            order = Orders(
+                user_id=app.test_customer_id, total_amount=Decimal("2000"), status=status
+            )
+            db.session.add(order)
+            db.session.flush()
+            for product in products:
+                db.session.add(
+                    OrderItems(
+                        order_id=order.id,
+                        product_id=product.id,
+                        quantity=1,
+                        unit_price=product.price,
+                        vendor_id=product.vendor_id,
+                    )
+                )
+        db.session.commit()
+
+
+def _count_queries(app, fn):
+    from sqlalchemy import event
+    from instance.database import db
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return result, len(statements)
+
+
+@patch_jwt_identity(2)
+def test_get_user_orders_constant_query_count(
+    mock_get_jwt_identity, client, app, customer_token
+):
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    _seed_orders(app, 1)
+    res, few_queries = _count_queries(
+        app, lambda: client.get("/orders", headers=headers)
+    )
+    assert len(res.get_json()) == 1
+
+    _seed_orders(app, 8, items_per_order=3)
+    res, many_queries = _count_queries(
+        app, lambda: client.get("/orders", headers=headers)
+    )
+    orders = res.get_json()
+    assert len(orders) == 9
+    assert all(item["vendor_name"] for order in orders for item in order["items"])
+    assert many_queries == few_queries
+
+
+@patch_jwt_identity(2)
+def test_get_user_orders_sparse_fieldset(
+    mock_get_jwt_identity, client, app, customer_token
+):
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    _seed_orders(app, 3, items_per_order=2)
+
+    res, queries = _count_queries(
+        app, lambda: client.get("/orders?fields=status,total_amount", headers=headers)
+    )
+    orders = res.get_json()
+    assert len(orders) == 3
+    assert set(orders[0]) == {"id", "status", "total_amount"}
+    # COUNT and the page of orders; items are never loaded
+    assert queries == 2
+
+    res = client.get("/orders?fields=items", headers=headers)
+    assert all(len(order["items"]) == 2 for order in res.get_json())
+
+    res = client.get("/orders?fields=user_id", headers=headers)
+    assert res.status_code == 400
+
+
+@patch_jwt_identity(2)
+def test_get_user_orders_pagination_and_filters(
+    mock_get_jwt_identity, client, app, customer_token
+):
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    _seed_orders(app, 3, status="pending")
+    _seed_orders(app, 2, status="shipped")
+
+    res = client.get("/orders?limit=2&page=2", headers=headers)
+    assert res.status_code == 200
+    assert len(res.get_json()) == 2
+    assert res.headers["X-Total-Count"] == "5"
+
+    res = client.get("/orders?status=shipped", headers=headers)
+    assert {o["status"] for o in res.get_json()} == {"shipped"}
+    assert res.headers["X-Total-Count"] == "2"
+
+    res = client.get("/orders?date_to=2000-01-01", headers=headers)
+    assert res.get_json() == []
+
+    res = client.get("/orders?date_from=yesterday", headers=headers)
+    assert res.status_code == 400
+
+
+def _stock_of(app, product_id):
+    from instance.database import db
+    from models.product import Products
+
+    with app.app_context():
+        return db.session.get(Products, product_id).stock_quantity
+
+
+def _place_order(client, headers, product_id, quantity):
+    data = {
+        "items": [{"product_id": product_id, "quantity": quantity, "unit_price": 85000}]
+    }
+    return client.post(
+        "/orders",
+        data=json.dumps(data),
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+@patch_jwt_identity(2)
+def test_order_reserves_and_cancel_releases_stock(
+    mock_get_jwt_identity, client, app, customer_token, seed_product
+):
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    res = _place_order(client, headers, seed_product.id, 4)
+    assert res.status_code == 201
+    assert _stock_of(app, seed_product.id) == 6
+
+    res = _place_order(client, headers, seed_product.id, 7)
+    assert res.status_code == 400
+    assert "exceeds stock" in res.get_json()["msg"]
+    assert _stock_of(app, seed_product.id) == 6
+
+    order_id = _place_order(client, headers, seed_product.id, 2).get_json()["order_id"]
+    res = client.put(
+        f"/orders/{order_id}/status",
+        data=json.dumps({"status": "cancelled"}),
+        headers=headers,
+        content_type="application/json",
+    )
+    assert res.status_code == 200
+    assert _stock_of(app, seed_product.id) == 6
+
+
+@patch_jwt_identity(2)
+def test_completed_order_keeps_reserved_stock(
+    mock_get_jwt_identity, client, app, customer_token, seed_product
+):
+    from instance.database import db
+    from models.stock_reservation import StockReservations
+
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    order_id = _place_order(client, headers, seed_product.id, 3).get_json()["order_id"]
+    for status in ("shipped", "delivered", "completed"):
+        res = client.put(
+            f"/orders/{order_id}/status",
+            data=json.dumps({"status": status}),
+            headers=headers,
+            content_type="application/json",
+        )
+        assert res.status_code == 200
+
+    # Stock is taken once, at checkout, not again on completion
+    assert _stock_of(app, seed_product.id) == 7
+    with app.app_context():
+        reservation = db.session.execute(
+            db.select(StockReservations).filter_by(order_id=order_id)
+        ).scalar_one()
+        assert reservation.status == "committed"
+
+
+def test_expired_reservations_are_released(app, client, seed_product):
+    from datetime import timedelta
+    from instance.database import db
+    from models.job import Jobs
+    from models.order import Orders
+    from models.stock_reservation import StockReservations
+    from services import order_services, reservation_services
+
+    app.config["STOCK_RESERVATION_TTL_MINUTES"] = 30
+    with app.app_context():
+        items = [{"product_id": seed_product.id, "quantity": 5, "unit_price": 85000}]
+        order, error = order_services.create_order_with_items(
+            app.test_customer_id, items
+        )
+        assert error is None
+        order_id = order.id
+
+        assert reservation_services.release_expired_reservations() == 0
+
+        reservation = db.session.execute(
+            db.select(StockReservations).filter_by(order_id=order_id)
+        ).scalar_one()
+        reservation.expires_at = reservation.expires_at - timedelta(days=1)
+        db.session.commit()
+
+        assert reservation_services.release_expired_reservations() == 1
+        assert db.session.get(Orders, order_id).status == "cancelled"
+        # The customer is told why the order went away
+        notices = [
+            json.loads(job.payload)
+            for job in Jobs.query.filter_by(task="notifications.notify_user")
+        ]
+        assert notices[-1]["user_id"] == app.test_customer_id
+        assert f"#{order_id} was cancelled" in notices[-1]["message"]
+    assert _stock_of(app, seed_product.id) == 10
+
+
+def test_pending_orders_do_not_expire_by_default(app, client, seed_product):
+    from datetime import timedelta
+    from instance.database import db
+    from models.order import Orders
+    from models.stock_reservation import StockReservations
+    from services import order_services, reservation_services
+
+    assert app.config["STOCK_RESERVATION_TTL_MINUTES"] is None
+    with app.app_context():
+        items = [{"product_id": seed_product.id, "quantity": 5, "unit_price": 85000}]
+        order, error = order_services.create_order_with_items(
+            app.test_customer_id, items
+        )
+        assert error is None
+        order_id = order.id
+        reservation = db.session.execute(
+            db.select(StockReservations).filter_by(order_id=order_id)
+        ).scalar_one()
+        assert reservation.expires_at is None
+
+        # Awaiting shipment for a day: still pending, stock still held
+        order.created_at = order.created_at - timedelta(days=1)
+        reservation.created_at = reservation.created_at - timedelta(days=1)
+        db.session.commit()
+
+        assert reservation_services.release_expired_reservations() == 0
+        assert db.session.get(Orders, order_id).status == "pending"
+        assert reservation.status == "held"
+    assert _stock_of(app, seed_product.id) == 5
+
+
+def test_concurrent_checkouts_do_not_oversell(app, client):
+    """Many threads race for a flash-sale product on the (file based) test
+    database; exactly the available units may be sold."""
+    import threading
+    from decimal import Decimal
+    from instance.database import db
+    from models.product import Products
+    from models.stock_reservation import StockReservations
+    from services import order_services
+
+    stock, buyers = 5, 20
+    with app.app_context():
+        product = Products(
+            name="Flash Sale Coffee",
+            slug="flash-sale-coffee",
+            description="Limited flash sale",
+            price=Decimal("50000"),
+            stock_quantity=stock,
+            unit_quantity="250g",
+            flash_sale=True,
+            vendor_id=app.test_vendor_id,
+            is_approved=True,
+        )
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+
+    barrier = threading.Barrier(buyers)
+    results = []
+
+    def checkout():
+        with app.app_context():
+            barrier.wait()
+            items = [{"product_id": product_id, "quantity": 1, "unit_price": 50000}]
+            try:
+                results.append(
+                    order_services.create_order_with_items(app.test_customer_id, items)
+                )
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=checkout) for _ in range(buyers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sold = [order for order, error in results if error is None]
+    assert len(results) == buyers
+    assert len(sold) == stock
+    assert all("out of stock" in error for order, error in results if error)
+    with app.app_context():
+        assert db.session.get(Products, product_id).stock_quantity == 0
+        held = db.session.execute(
+            db.select(db.func.sum(StockReservations.quantity)).filter_by(
+                product_id=product_id, status="held"
+            )
+        ).scalar()
+        assert held == stock
+
+
+def _seed_priced_products(app, prices, discount_percentage=0):
+    from instance.database import db
+    from models.product import Products
+
+    with app.app_context():
+        products = [
+            Products(
+                name=f"Priced Coffee {i}",
+                slug=f"priced-coffee-{i}-{price}",
+                description="Pricing fixture",
+                price=price,
+                discount_percentage=discount_percentage,
+                stock_quantity=10,
+                unit_quantity="pcs",
+                vendor_id=app.test_vendor_id,
+                is_approved=True,
+            )
+            for i, price in enumerate(prices)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        return [p.id for p in products]
+
+
+@patch_jwt_identity(2)
+def test_create_order_uses_catalog_prices(
+    mock_get_jwt_identity, client, app, customer_token
+):
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    (product_id,) = _seed_priced_products(app, [85000], discount_percentage=10)
+    data = {"items": [{"product_id": product_id, "quantity": 2, "unit_price": 1}]}
+    res = client.post(
+        "/orders",
+        data=json.dumps(data),
+        headers=headers,
+        content_type="application/json",
+    )
+    assert res.status_code == 201
+    body = res.get_json()
+    assert body["total_amount"] == 153000.0
+    assert body["items"][0]["unit_price"] == 76500.0
+
+
+@patch_jwt_identity(2)
+def test_create_order_loads_products_in_one_query(
+    mock_get_jwt_identity, client, app, customer_token
+):
+    from sqlalchemy import event
+    from instance.database import db
+
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    product_ids = _seed_priced_products(app, [1000, 2000, 3000, 4000])
+    data = {"items": [{"product_id": pid, "quantity": 1} for pid in product_ids]}
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.post(
+            "/orders",
+            data=json.dumps(data),
+            headers=headers,
+            content_type="application/json",
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert res.status_code == 201
+    assert res.get_json()["total_amount"] == 10000.0
+    # Only the pricing lookup reads products before the order is written
+    writes = next(i for i, s in enumerate(statements) if s.lstrip().startswith("INSERT"))
+    product_reads = [
+        s for s in statements[:writes] if s.lstrip().startswith("SELECT") and "FROM products" in s
+    ]
+    assert len(product_reads) == 1
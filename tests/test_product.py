@@ -1,8 +1,13 @@
 import pytest
 from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy import event
 from models.product import Products
 from models.product_category import ProductCategories
+from models.category import Categories
 from instance.database import db
+from services import product_services
+from shared.cache import cache
 
 
 def test_get_all_products(client, seed_product):
@@ -386,3 +391,473 @@ def test_admin_can_fetch_only_unapproved_products(client, admin_token, vendor_to
     # Step 3: Confirm that our product is in the list and not approved
     assert any(p["id"] == product_id and p["is_approved"] is False for p in data["products"])
 
+
+
+def test_product_listing_is_served_from_cache(client, seed_product, monkeypatch):
+    from repo import product_repo
+
+    calls = []
+    original = product_repo.get_all_products_filtered
+
+    def counting_get_all_products_filtered(*args, **kwargs):
+        calls.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(
+        product_repo, "get_all_products_filtered", counting_get_all_products_filtered
+    )
+
+    first = client.get("/products?page=1&limit=10")
+    second = client.get("/products?limit=10&page=1")
+    assert first.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert len(calls) == 1
+
+    # A different query is a different cache entry
+    client.get("/products?page=2&limit=10")
+    assert len(calls) == 2
+
+
+def test_product_listing_cache_invalidated_on_approve(
+    client, admin_token, vendor_token, seed_product
+):
+    headers_vendor = {"Authorization": f"Bearer {vendor_token}"}
+    payload = {
+        "name": "Cached Listing Product",
+        "slug": "cached-listing-product",
+        "description": "Appears after approval",
+        "currency": "IDR",
+        "price": "11000.00",
+        "stock_quantity": 2,
+        "unit_quantity": "pcs",
+        "image_url": "http://example.com/cached.jpg",
+    }
+    res = client.post("/products", json=payload, headers=headers_vendor)
+    product_id = res.get_json()["id"]
+
+    before = client.get("/products").get_json()
+    assert all(p["id"] != product_id for p in before["products"])
+
+    headers_admin = {"Authorization": f"Bearer {admin_token}"}
+    client.patch(f"/products/{product_id}/approve", headers=headers_admin)
+
+    after = client.get("/products").get_json()
+    assert any(p["id"] == product_id for p in after["products"])
+    assert after["total"] == before["total"] + 1
+
+
+def _seed_listing_products(app, count):
+    with app.app_context():
+        for i in range(count):
+            db.session.add(
+                Products(
+                    name=f"Keyset Coffee {i:02d}",
+                    slug=f"keyset-coffee-{i}",
+                    description="Keyset pagination fixture",
+                    currency="IDR",
+                    # Duplicate prices force the id tie-breaker to be used
+                    price=Decimal(10000 + (i // 2) * 500),
+                    stock_quantity=5,
+                    unit_quantity="pcs",
+                    vendor_id=app.test_vendor_id,
+                    is_approved=True,
+                )
+            )
+        db.session.commit()
+
+
+@pytest.mark.parametrize(
+    "sort_by,sort_order",
+    [
+        ("created_at", "desc"),
+        ("price", "asc"),
+        ("price", "desc"),
+        ("name", "asc"),
+        ("rating", "desc"),
+    ],
+)
+def test_product_listing_cursor_pagination(client, app, sort_by, sort_order):
+    _seed_listing_products(app, 7)
+
+    offset_ids = [
+        p["id"]
+        for p in client.get(
+            f"/products?limit=50&sort_by={sort_by}&sort_order={sort_order}"
+        ).get_json()["products"]
+    ]
+
+    seen = []
+    res = client.get(
+        f"/products?pagination=cursor&limit=3&sort_by={sort_by}&sort_order={sort_order}"
+    ).get_json()
+    assert res["total"] is None  # COUNT is skipped unless requested
+    while True:
+        seen.extend(p["id"] for p in res["products"])
+        if not res["next_cursor"]:
+            break
+        res = client.get(
+            f"/products?limit=3&sort_by={sort_by}&sort_order={sort_order}"
+            f"&cursor={res['next_cursor']}"
+        ).get_json()
+
+    assert seen == offset_ids
+    assert len(seen) == 7
+
+
+def test_product_listing_cursor_with_total(client, app):
+    _seed_listing_products(app, 3)
+    res = client.get("/products?pagination=cursor&limit=2&include_total=true")
+    data = res.get_json()
+    assert data["total"] == 3
+    assert len(data["products"]) == 2
+    assert data["next_cursor"]
+
+
+def test_product_listing_rejects_invalid_cursor(client, app):
+    _seed_listing_products(app, 3)
+    first = client.get("/products?pagination=cursor&limit=1&sort_by=price").get_json()
+
+    assert client.get("/products?cursor=not-a-cursor").status_code == 400
+    # A cursor minted for one sort cannot be replayed against another
+    res = client.get(f"/products?cursor={first['next_cursor']}&sort_by=name")
+    assert res.status_code == 400
+
+
+def _seed_search_products(app):
+    with app.app_context():
+        fixtures = [
+            ("Toraja Sapan", "toraja-sapan", "Single origin Toraja highlands"),
+            ("Gayo Wine", "gayo-wine", "Fermented Aceh coffee, notes like Toraja"),
+            ("Kintamani", "kintamani", "Bright citrus coffee from Bali"),
+        ]
+        for name, slug, description in fixtures:
+            db.session.add(
+                Products(
+                    name=name,
+                    slug=slug,
+                    description=description,
+                    currency="IDR",
+                    price=Decimal("90000"),
+                    stock_quantity=5,
+                    unit_quantity="250g",
+                    vendor_id=app.test_vendor_id,
+                    is_approved=True,
+                )
+            )
+        db.session.commit()
+
+
+def _names(res):
+    return {p["name"] for p in res.get_json()["products"]}
+
+
+def test_search_matches_name_description_and_city_prefixes(client, app):
+    _seed_search_products(app)
+
+    assert _names(client.get("/products?search=kinta")) == {"Kintamani"}
+    assert _names(client.get("/products?search=citrus")) == {"Kintamani"}
+    # Vendor city (Jakarta) is part of every product's search document
+    assert _names(client.get("/products?search=jakarta")) == {
+        "Toraja Sapan",
+        "Gayo Wine",
+        "Kintamani",
+    }
+    # All terms must match
+    assert _names(client.get("/products?search=aceh toraja")) == {"Gayo Wine"}
+    assert client.get("/products?search=robusta").get_json()["total"] == 0
+
+
+def test_search_ranks_by_relevance(client, app):
+    _seed_search_products(app)
+    res = client.get("/products?search=toraja")
+    products = res.get_json()["products"]
+    assert [p["name"] for p in products] == ["Toraja Sapan", "Gayo Wine"]
+
+    # An explicit sort still wins over relevance
+    res = client.get("/products?search=toraja&sort_by=name&sort_order=asc")
+    assert [p["name"] for p in res.get_json()["products"]] == [
+        "Gayo Wine",
+        "Toraja Sapan",
+    ]
+
+
+def test_search_follows_vendor_city_changes(client, app):
+    _seed_search_products(app)
+    from models.user import Users
+
+    with app.app_context():
+        vendor = db.session.get(Users, app.test_vendor_id)
+        vendor.city = "Makassar"
+        db.session.commit()
+
+    assert client.get("/products?search=makassar").get_json()["total"] == 3
+    assert client.get("/products?search=jakarta").get_json()["total"] == 0
+
+
+def _capture_selects(app):
+    """Record every SELECT the app's engine executes (statement, params)."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return engine, statements, before_cursor_execute
+
+
+def _rows_fetched(engine, statements):
+    with engine.connect() as conn:
+        return sum(
+            len(conn.exec_driver_sql(statement, parameters).fetchall())
+            for statement, parameters in statements
+        )
+
+
+def _seed_cross_linked_catalog(app, products=15, categories=3):
+    """Every product in every category: the worst case for joined loading."""
+    with app.app_context():
+        category_ids = [app.test_category_id]
+        for i in range(categories - 1):
+            category = Categories(
+                name=f"Extra {i}", slug=f"extra-{i}", vendor_id=app.test_vendor_id
+            )
+            db.session.add(category)
+            db.session.flush()
+            category_ids.append(category.id)
+        for i in range(products):
+            product = Products(
+                name=f"Linked {i}",
+                slug=f"linked-{i}",
+                description="Cross-linked fixture",
+                price=Decimal("1000"),
+                stock_quantity=1,
+                unit_quantity="pcs",
+                vendor_id=app.test_vendor_id,
+                is_approved=True,
+            )
+            db.session.add(product)
+            db.session.flush()
+            for cid in category_ids:
+                db.session.add(
+                    ProductCategories(product_id=product.id, category_id=cid)
+                )
+        db.session.commit()
+
+
+def test_product_listing_query_count_and_row_volume(client, app):
+    _seed_cross_linked_catalog(app, products=15, categories=3)
+    engine, statements, listener = _capture_selects(app)
+    try:
+        res = client.get("/products?limit=10")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert res.status_code == 200
+    data = res.get_json()
+    assert len(data["products"]) == 10
+    assert all(len(p["categories"]) == 3 for p in data["products"])
+
+    # COUNT, one page of products (vendor joined), one batched category
+    # load; the ETag needs no query
+    assert len(statements) == 3
+    # 1 count row + 10 product rows + 10 x 3 category rows
+    assert _rows_fetched(engine, statements) == 41
+
+
+def test_product_listing_sparse_fieldset(client, app):
+    _seed_cross_linked_catalog(app, products=15, categories=3)
+    engine, statements, listener = _capture_selects(app)
+    try:
+        res = client.get("/products?limit=10&fields=name,price,image_url")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert res.status_code == 200
+    products = res.get_json()["products"]
+    assert len(products) == 10
+    assert set(products[0]) == {"id", "name", "price", "image_url"}
+    assert products[0]["price"] == 1000.0
+
+    # COUNT, one page of products: no vendor JOIN, no category load and no
+    # description column
+    assert len(statements) == 2
+    page_sql = statements[-1][0]
+    assert "description" not in page_sql
+    assert "users" not in page_sql
+
+    res = client.get("/products?fields=name,vendor_name,categories&limit=1")
+    product = res.get_json()["products"][0]
+    assert product["vendor_name"] and len(product["categories"]) == 3
+
+    res = client.get("/products?fields=name,secret")
+    assert res.status_code == 400
+    assert "secret" in res.get_json()["message"]
+
+
+def _listing_query_plan(client, app, url):
+    """EXPLAIN QUERY PLAN of the statement that fetches the listing page."""
+    engine, statements, listener = _capture_selects(app)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    statement, parameters = next(
+        (st, params) for st, params in statements if "LIMIT" in st and "ORDER BY" in st
+    )
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        ("", "ix_products_approved_created_at"),
+        ("?sort_by=price&sort_order=asc", "ix_products_approved_price"),
+        ("?sort_by=name", "ix_products_approved_name"),
+        ("?sort_by=rating", "ix_products_approved_rating_avg"),
+        ("?pagination=cursor", "ix_products_approved_created_at"),
+    ],
+)
+def test_product_listing_uses_index(client, app, query, index):
+    _seed_cross_linked_catalog(app, products=15, categories=1)
+    plan = _listing_query_plan(client, app, f"/products{query}")
+
+    assert any(f"USING INDEX {index}" in step for step in plan), plan
+    # Pages are read in index order: no table scan and no sort step
+    assert not any(step == "SCAN products" for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_product_listing_by_category_uses_index(client, app):
+    _seed_cross_linked_catalog(app, products=15, categories=2)
+    plan = _listing_query_plan(
+        client, app, f"/products?category_id={app.test_category_id}"
+    )
+    assert any("ix_product_categories_category_id" in step for step in plan), plan
+
+
+def test_product_detail_query_count(client, app):
+    _seed_cross_linked_catalog(app, products=5, categories=3)
+    with app.app_context():
+        product_id = Products.query.filter_by(slug="linked-0").first().id
+
+    engine, statements, listener = _capture_selects(app)
+    try:
+        res = client.get(f"/products/{product_id}")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert res.status_code == 200
+    assert len(res.get_json()["categories"]) == 3
+    # ETag probe, product (vendor joined), batched categories
+    assert len(statements) == 3
+    assert _rows_fetched(engine, statements) == 5
+
+
+def test_product_detail_conditional_get(client, app, seed_product, vendor_token):
+    res = client.get(f"/products/{seed_product.id}")
+    assert res.status_code == 200
+    etag = res.headers["ETag"]
+    assert res.headers["Last-Modified"]
+
+    engine, statements, listener = _capture_selects(app)
+    try:
+        res = client.get(f"/products/{seed_product.id}", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert res.status_code == 304
+    assert res.data == b""
+    # Only the version probe ran
+    assert len(statements) == 1
+
+    client.put(
+        f"/products/{seed_product.id}",
+        json={"price": 90000},
+        headers={"Authorization": f"Bearer {vendor_token}"},
+    )
+    res = client.get(f"/products/{seed_product.id}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.get_json()["price"] == 90000
+
+
+def test_product_listing_conditional_get(client, app, seed_product, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(product_services, "time", SimpleNamespace(time=lambda: clock[0]))
+    res = client.get("/products?limit=5")
+    etag = res.headers["ETag"]
+
+    engine, statements, listener = _capture_selects(app)
+    try:
+        res = client.get("/products?limit=5", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert res.status_code == 304
+    # The ETag comes from the cache namespace version and window: no SQL
+    assert len(statements) == 0
+
+    # Another page is another representation
+    res = client.get("/products?limit=5&page=2", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+
+    # A checkout does not invalidate listings: stock catches up once the
+    # cache window rolls over
+    from services import order_services
+
+    items = [{"product_id": seed_product.id, "quantity": 1}]
+    _, error = order_services.create_order_with_items(app.test_customer_id, items)
+    assert error is None
+    res = client.get("/products?limit=5", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    clock[0] += app.config["PRODUCT_LIST_CACHE_TIMEOUT"]
+    cache.clear()  # what the expiry set from the window would have done
+    res = client.get("/products?limit=5", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.get_json()["products"][0]["stock_quantity"] == 9
+
+
+def test_category_rename_changes_product_etags(client, app, seed_product, vendor_token):
+    list_etag = client.get("/products").headers["ETag"]
+    detail_etag = client.get(f"/products/{seed_product.id}").headers["ETag"]
+
+    client.put(
+        f"/categories/{app.test_category_id}",
+        json={"name": "Renamed Beans"},
+        headers={"Authorization": f"Bearer {vendor_token}"},
+    )
+    res = client.get("/products", headers={"If-None-Match": list_etag})
+    assert res.status_code == 200
+    assert res.get_json()["products"][0]["categories"][0]["name"] == "Renamed Beans"
+    res = client.get(f"/products/{seed_product.id}", headers={"If-None-Match": detail_etag})
+    assert res.status_code == 200
+    assert res.get_json()["categories"][0]["name"] == "Renamed Beans"
+
+
+def test_vendor_rename_changes_product_listing(client, app, seed_product, admin_token):
+    etag = client.get("/products").headers["ETag"]
+    res = client.put(
+        f"/users/{app.test_vendor_id}",
+        json={"username": "renamed_roaster"},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert res.status_code == 200
+    res = client.get("/products", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.get_json()["products"][0]["vendor_name"] == "renamed_roaster"
+
+
+def test_listing_sends_no_etag_without_a_shared_cache(client, app, seed_product):
+    app.config["CACHE_SHARED"] = False
+    res = client.get("/products")
+    assert res.status_code == 200
+    assert "ETag" not in res.headers
+
+    # Product detail validators come from the database and still apply
+    res = client.get(f"/products/{seed_product.id}")
+    etag = res.headers["ETag"]
+    res = client.get(f"/products/{seed_product.id}", headers={"If-None-Match": etag})
+    assert res.status_code == 304
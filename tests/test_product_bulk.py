@@ -0,0 +1,193 @@
+import io
+import json
+
+from instance.database import db
+from models.job import Jobs
+from models.product import Products
+from models.product_category import ProductCategories
+
+
+def _headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+CSV_HEADER = "name,slug,description,price,stock_quantity,unit_quantity,category_ids\n"
+
+
+def _upload(client, token, content, filename="products.csv", **query):
+    return client.post(
+        "/products/import",
+        query_string=query,
+        data={"file": (io.BytesIO(content.encode()), filename)},
+        headers=_headers(token),
+        content_type="multipart/form-data",
+    )
+
+
+def test_csv_import_creates_products_and_reports_bad_rows(client, app, vendor_token):
+    category_id = app.test_category_id
+    content = CSV_HEADER + (
+        f"Gayo Light,gayo-light,Fruity,85000,10,250g,{category_id}\n"
+        "No Price,no-price,Missing price,,5,250g,\n"
+        f"Toraja Dark,toraja-dark,Earthy,90000.50,3,500g,{category_id};999\n"
+        "Kintamani,kintamani,Citrus,70000,8,250g,\n"
+        "Dup,gayo-light,Same slug again,1000,1,1kg,\n"
+    )
+    response = _upload(client, vendor_token, content)
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 2
+    assert body["failed"] == 3
+    errors = {e["line"]: e["errors"] for e in body["errors"]}
+    assert "price" in errors[3]
+    assert "category_ids" in errors[4]
+    assert "slug" in errors[6]
+
+    with app.app_context():
+        gayo = Products.query.filter_by(slug="gayo-light").one()
+        assert gayo.vendor_id == app.test_vendor_id
+        assert gayo.is_approved is False
+        assert gayo.search_text.startswith("Gayo Light Fruity")
+        assert [pc.category_id for pc in ProductCategories.query.filter_by(product_id=gayo.id)] == [category_id]
+        assert Products.query.filter_by(slug="kintamani").one().description == "Citrus"
+
+
+def test_ndjson_import_from_raw_body_in_chunks(client, app, vendor_token):
+    app.config["PRODUCT_IMPORT_CHUNK_SIZE"] = 2
+    lines = [
+        json.dumps({"name": f"Bean {i}", "slug": f"bean-{i}", "price": 1000 + i})
+        for i in range(5)
+    ]
+    lines.insert(2, "{not json")
+    response = client.post(
+        "/products/import",
+        data="\n".join(lines) + "\n",
+        headers=_headers(vendor_token),
+        content_type="application/x-ndjson",
+    )
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 5
+    assert body["failed"] == 1
+    assert body["errors"][0]["line"] == 3
+    with app.app_context():
+        assert Products.query.filter(Products.slug.like("bean-%")).count() == 5
+
+
+def test_import_rejects_unknown_format_and_non_vendors(client, vendor_token, customer_token):
+    response = _upload(client, vendor_token, "whatever", filename="products.txt")
+    assert response.status_code == 400
+    response = _upload(client, customer_token, CSV_HEADER)
+    assert response.status_code == 403
+
+
+def test_export_streams_round_trippable_csv(client, app, vendor_token, seed_product):
+    response = client.get("/products/export", headers=_headers(vendor_token))
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.is_streamed
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0].startswith("id,name,slug,")
+    assert lines[1].startswith("1,Test Coffee,test-coffee,")
+    assert lines[1].endswith(f",{app.test_category_id}")
+
+    # The export imports back as new products once the slugs are changed
+    content = "\n".join(lines).replace("test-coffee", "test-coffee-copy") + "\n"
+    response = _upload(client, vendor_token, content)
+    assert response.get_json()["created"] == 1
+
+
+def test_export_ndjson_for_admin_needs_vendor(client, app, admin_token, seed_product):
+    response = client.get("/products/export?format=ndjson", headers=_headers(admin_token))
+    assert response.status_code == 400
+
+    response = client.get(
+        f"/products/export?format=ndjson&vendor_id={app.test_vendor_id}",
+        headers=_headers(admin_token),
+    )
+    assert response.status_code == 200
+    (record,) = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert record["slug"] == "test-coffee"
+    assert record["price"] == 85000.0
+    assert record["category_ids"] == [app.test_category_id]
+
+
+def _pending_products(app, count, vendor_id=None):
+    with app.app_context():
+        products = [
+            Products(
+                name=f"Pending {i}",
+                slug=f"pending-{i}",
+                description="Awaiting review",
+                price=1000 + i,
+                stock_quantity=1,
+                unit_quantity="250g",
+                vendor_id=vendor_id or app.test_vendor_id,
+            )
+            for i in range(count)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        return [p.id for p in products]
+
+
+def test_bulk_approve_by_ids_reports_each_id(client, app, admin_token, seed_product):
+    ids = _pending_products(app, 3)
+    response = client.patch(
+        "/products/bulk/approve",
+        json={"ids": ids + [seed_product.id, 9999]},
+        headers=_headers(admin_token),
+    )
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == 3
+    assert body["results"] == {
+        **{str(i): "approved" for i in ids},
+        str(seed_product.id): "unchanged",
+        "9999": "not_found",
+    }
+    with app.app_context():
+        assert all(db.session.get(Products, i).is_approved for i in ids)
+        # One notification job for the vendor, one cache warm-up
+        tasks = sorted(job.task for job in Jobs.query)
+        assert tasks == ["notifications.notify_user", "products.warm_listing_cache"]
+        assert json.loads(Jobs.query.first().payload)["message"] == "3 of your products were approved."
+
+    # Now visible in the public listing: the cache was invalidated
+    listing = client.get("/products?limit=50").get_json()
+    assert {p["id"] for p in listing["products"]} >= set(ids)
+
+
+def test_bulk_reject_by_queue_filter(client, app, admin_token):
+    ids = _pending_products(app, 4)
+    response = client.patch(
+        "/products/bulk/reject",
+        json={"filter": {"vendor_id": app.test_vendor_id, "limit": 3}},
+        headers=_headers(admin_token),
+    )
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == 3
+    # Oldest first from the head of the queue
+    assert body["results"] == {str(i): "rejected" for i in ids[:3]}
+
+    queue = client.get(
+        "/products?only_unapproved=true", headers=_headers(admin_token)
+    ).get_json()
+    assert [p["id"] for p in queue["products"]] == ids[3:]
+
+
+def test_bulk_moderation_validates_input(client, admin_token, vendor_token):
+    def patch(path, payload, token=admin_token):
+        return client.patch(path, json=payload, headers=_headers(token))
+
+    assert patch("/products/bulk/approve", {"ids": [1]}, vendor_token).status_code == 403
+    assert patch("/products/bulk/publish", {"ids": [1]}).status_code == 404
+    assert patch("/products/bulk/approve", {}).status_code == 400
+    assert patch("/products/bulk/approve", {"ids": ["1"]}).status_code == 400
+    assert patch("/products/bulk/approve", {"ids": list(range(1, 502))}).status_code == 400
+    assert patch("/products/bulk/approve", {"filter": {"limit": 0}}).status_code == 400
+    assert (
+        patch("/products/bulk/approve", {"filter": {"created_before": "soon"}}).status_code
+        == 400
+    )
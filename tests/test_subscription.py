@@ -2,6 +2,12 @@ import json
 import pytest
 from route.subscription_route import subscription_bp
 from services.subscription_services import SubscriptionService
+from datetime import timedelta
+from instance.database import db
+from models.email_outbox import EmailOutbox
+from services.email_services import deliver_pending_emails
+from shared import crono
+from tests.smtp_server import LocalSMTPServer
 
 
 def test_subscribe_success(client, monkeypatch):
@@ -62,3 +68,96 @@ def test_subscribe_email_send_failure(monkeypatch, client):
     assert response.status_code == 500
     data = response.get_json()
     assert "error" in data
+
+
+
+@pytest.fixture
+def smtp_server(app):
+    """Point Flask-Mail at a local SMTP stand-in instead of suppressing sends."""
+    with LocalSMTPServer() as server:
+        state = app.extensions["mail"]
+        state.server, state.port = "127.0.0.1", server.port
+        state.use_tls = state.use_ssl = False
+        state.username = state.password = None
+        state.suppress = False
+        state.default_sender = "newsletter@bumibrew.test"
+        yield server
+
+
+def _utcnow():
+    # SQLite hands back naive UTC datetimes
+    return crono.now().replace(tzinfo=None)
+
+
+def _outbox(app):
+    with app.app_context():
+        return [
+            (e.recipient, e.status, e.attempts)
+            for e in EmailOutbox.query.order_by(EmailOutbox.id)
+        ]
+
+
+def test_subscribe_queues_welcome_email_without_smtp(client, app, init_db):
+    # No SMTP server is reachable in tests: the request must not need one
+    response = client.post("/subscribe", json={"email": "reader@example.com"})
+    assert response.status_code == 200
+    assert _outbox(app) == [("reader@example.com", "pending", 0)]
+
+
+def test_worker_sends_batch_over_one_connection(client, app, init_db, smtp_server):
+    for i in range(3):
+        client.post("/subscribe", json={"email": f"reader{i}@example.com"})
+
+    with app.app_context():
+        assert deliver_pending_emails() == (3, 0)
+        assert deliver_pending_emails() == (0, 0)
+
+    assert smtp_server.sessions == 1
+    assert [m["to"] for m in smtp_server.messages] == [
+        [f"reader{i}@example.com"] for i in range(3)
+    ]
+    assert "Subject: Welcome to BumiBrew!" in smtp_server.messages[0]["data"]
+    assert {status for _, status, _ in _outbox(app)} == {"sent"}
+
+
+def test_worker_retries_with_backoff(client, app, init_db, smtp_server):
+    app.config.update(EMAIL_RETRY_BASE_SECONDS=60, EMAIL_MAX_ATTEMPTS=3)
+    client.post("/subscribe", json={"email": "a@example.com"})
+    client.post("/subscribe", json={"email": "b@example.com"})
+    smtp_server.reject_next = 1
+
+    with app.app_context():
+        assert deliver_pending_emails() == (1, 1)
+        retry = EmailOutbox.query.filter_by(status="pending").one()
+        assert retry.recipient == "a@example.com"
+        assert "451" in retry.last_error
+        delay = retry.next_attempt_at - _utcnow()
+        assert timedelta(seconds=50) < delay <= timedelta(seconds=60)
+
+        # Not due yet
+        assert deliver_pending_emails() == (0, 0)
+
+        # Second failure doubles the delay; the third attempt is the last
+        retry.next_attempt_at = crono.now()
+        db.session.commit()
+        smtp_server.reject_next = 1
+        assert deliver_pending_emails() == (0, 1)
+        retry = db.session.get(EmailOutbox, retry.id)
+        assert retry.next_attempt_at - _utcnow() > timedelta(seconds=110)
+
+        retry.next_attempt_at = crono.now()
+        db.session.commit()
+        smtp_server.reject_next = 1
+        assert deliver_pending_emails() == (0, 1)
+
+    assert _outbox(app) == [("a@example.com", "failed", 3), ("b@example.com", "sent", 1)]
+
+
+def test_worker_reschedules_batch_when_smtp_is_down(client, app, init_db, smtp_server):
+    client.post("/subscribe", json={"email": "a@example.com"})
+    client.post("/subscribe", json={"email": "b@example.com"})
+    app.extensions["mail"].port = 1  # nothing listens there
+
+    with app.app_context():
+        assert deliver_pending_emails() == (0, 2)
+    assert _outbox(app) == [("a@example.com", "pending", 1), ("b@example.com", "pending", 1)]
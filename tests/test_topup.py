@@ -1,15 +1,5 @@
-import os
 import pytest
 
-# Auto-remove CSV after each test run to avoid pollution
-@pytest.fixture(autouse=True)
-def cleanup_topup_csv():
-    yield
-    try:
-        os.remove("topup_requests.csv")
-    except FileNotFoundError:
-        pass
-
 def test_request_topup_valid(client, customer_token):
     headers = {"Authorization": f"Bearer {customer_token}"}
     response = client.post(
@@ -31,9 +21,66 @@ def test_request_topup_invalid_amount(client, customer_token):
     assert response.status_code == 400
     assert response.json["msg"] == "Invalid top-up amount"
 
+@pytest.mark.parametrize("amount", [True, "50000", None])
+def test_request_topup_rejects_non_numeric_amount(client, customer_token, amount):
+    headers = {"Authorization": f"Bearer {customer_token}"}
+    response = client.post(
+        "/users/me/request-topup",
+        json={"amount": amount},
+        headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json["msg"] == "Invalid top-up amount"
+
 def test_admin_get_topup_requests(client, admin_token):
     headers = {"Authorization": f"Bearer {admin_token}"}
     response = client.get("/topup-requests", headers=headers)
 
     assert response.status_code == 200
-    assert isinstance(response.json["requests"], list)
\ No newline at end of file
+    assert isinstance(response.json["requests"], list)
+
+def test_admin_topup_requests_paginated_and_filtered(
+    client, customer_token, vendor_token, admin_token, app
+):
+    for token, amount in [(customer_token, 10000), (customer_token, 20000), (vendor_token, 30000)]:
+        client.post(
+            "/users/me/request-topup",
+            json={"amount": amount},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    response = client.get("/topup-requests?limit=2", headers=headers)
+    assert response.json["total"] == 3
+    assert [r["amount"] for r in response.json["requests"]] == [30000.0, 20000.0]
+
+    first = response.json["requests"][0]["request_id"]
+    client.post(f"/request-topup/{first}/approve", headers=headers)
+
+    response = client.get("/topup-requests?status=pending", headers=headers)
+    assert response.json["total"] == 2
+    assert all(r["status"] == "pending" for r in response.json["requests"])
+
+    response = client.get(f"/topup-requests?user_id={app.test_customer_id}", headers=headers)
+    assert {r["user_id"] for r in response.json["requests"]} == {app.test_customer_id}
+
+
+def test_import_legacy_topup_csv(app, init_db, tmp_path):
+    from instance.database import db
+    from models.topup_request import TopupRequests
+    from services.user_services import import_legacy_topup_csv
+
+    csv_path = tmp_path / "topup_requests.csv"
+    csv_path.write_text(
+        f"2025-05-07 10:21:29.738722,{app.test_customer_id},100000.0,approved\n"
+        f"2025-05-07 10:37:47.437047,{app.test_vendor_id},120000.0,pending\n"
+        "2025-05-07 10:50:29.157547,999999,120009.0,approved\n"
+        "garbage\n"
+    )
+    with app.app_context():
+        assert import_legacy_topup_csv(str(csv_path)) == (2, 2)
+        rows = db.session.execute(db.select(TopupRequests).order_by(TopupRequests.id)).scalars().all()
+        assert [(r.user_id, r.status) for r in rows] == [
+            (app.test_customer_id, "approved"),
+            (app.test_vendor_id, "pending"),
+        ]
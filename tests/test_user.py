@@ -1,7 +1,5 @@
 import pytest
-import csv
 import os
-import time
 from flask_jwt_extended import create_access_token
 from models.user import RoleType
 from instance.database import db
@@ -324,62 +322,103 @@ def test_admin_topup_negative_balance(client, admin_token, app):
     assert response.status_code == 400
     assert response.json["msg"] == "Balance cannot be negative"
 
-def test_admin_approve_topup(client, customer_token, admin_token, tmp_path):
+def test_admin_approve_topup(client, customer_token, admin_token, app):
     headers_admin = {"Authorization": f"Bearer {admin_token}"}
     headers_customer = {"Authorization": f"Bearer {customer_token}"}
-    csv_path = tmp_path / "test_topup_requests.csv"
-
-    # ✅ Force override the CSV path for this test
-    import services.user_services as us
-    us.CSV_TOPUP_FILE = str(csv_path)
 
     # ✅ Customer makes the request
-    client.post("/users/me/request-topup", json={"amount": 50000}, headers=headers_customer)
-
-    # ✅ Wait for file to appear
-    for _ in range(30):
-        if csv_path.exists():
-            break
-        time.sleep(0.1)
-
-    assert csv_path.exists(), "CSV file was not created"
-
-    with open(csv_path, newline="") as f:
-        for i, row in enumerate(csv.reader(f)):
-            if row[3] == "pending":
-                request_id = i
-                break
+    res = client.post("/users/me/request-topup", json={"amount": 50000}, headers=headers_customer)
+    request_id = res.json["requested"]["request_id"]
 
     res = client.post(f"/request-topup/{request_id}/approve", headers=headers_admin)
     assert res.status_code == 200
     assert "Top-up approved" in res.json["msg"]
+    assert res.json["new_balance"] == 50000.0
 
+    # A request is credited only once
+    res = client.post(f"/request-topup/{request_id}/approve", headers=headers_admin)
+    assert res.status_code == 404
+    with app.app_context():
+        assert db.session.get(Users, app.test_customer_id).balance == 50000
 
 
-def test_admin_reject_topup(client, customer_token, admin_token, tmp_path):
+def test_admin_reject_topup(client, customer_token, admin_token):
     headers_admin = {"Authorization": f"Bearer {admin_token}"}
     headers_customer = {"Authorization": f"Bearer {customer_token}"}
-    csv_path = tmp_path / "topup_test.csv"
 
+    res = client.post("/users/me/request-topup", json={"amount": 30000}, headers=headers_customer)
+    request_id = res.json["requested"]["request_id"]
+
+    res = client.post(f"/request-topup/{request_id}/reject", headers=headers_admin)
+    assert res.status_code == 200
+    assert "rejected" in res.json["msg"]
+
+    res = client.post(f"/request-topup/{request_id}/approve", headers=headers_admin)
+    assert res.status_code == 404
 
-     
 
-    client.post("/users/me/request-topup", json={"amount": 30000}, headers=headers_customer)
 
-    for _ in range(30):
-        if csv_path.exists():
-            break
-        time.sleep(0.1)
+def test_admin_balance_update_is_idempotent(client, admin_token, customer_token, app):
+    headers = {"Authorization": f"Bearer {admin_token}", "Idempotency-Key": "payout-42"}
+    customer_id = app.test_customer_id
 
-    assert csv_path.exists(), "CSV file was not created"
+    for _ in range(2):
+        response = client.patch(
+            f"/users/{customer_id}/balance", json={"balance": 25000}, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json["balance"] == 25000.0
 
-    with open(csv_path, newline="") as f:
-        for i, row in enumerate(csv.reader(f)):
-            if row[3] == "pending":
-                request_id = i
-                break
+    headers["Idempotency-Key"] = "payout-43"
+    client.patch(f"/users/{customer_id}/balance", json={"balance": 5000}, headers=headers)
 
-    res = client.post(f"/request-topup/{request_id}/reject", headers=headers_admin)
-    assert res.status_code == 200
-    assert "rejected" in res.json["msg"]
+    response = client.get(
+        "/users/me/balance/transactions?limit=1",
+        headers={"Authorization": f"Bearer {customer_token}"},
+    )
+    assert response.status_code == 200
+    (latest,) = response.json["transactions"]
+    assert latest["amount"] == 5000.0
+    assert latest["balance_after"] == 30000.0
 
+    response = client.get(
+        f"/users/me/balance/transactions?before_id={response.json['next_before_id']}",
+        headers={"Authorization": f"Bearer {customer_token}"},
+    )
+    assert [t["balance_after"] for t in response.json["transactions"]] == [25000.0]
+    assert response.json["next_before_id"] is None
+
+
+def test_concurrent_balance_credits_are_not_lost(app, init_db):
+    import threading
+    from services import balance_services
+
+    workers, amount = 10, 1000
+
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def credit(i):
+        with app.app_context():
+            barrier.wait()
+            try:
+                balance_services.apply_balance_change(
+                    app.test_customer_id, amount, kind="topup", idempotency_key=f"k{i % 5}"
+                )
+                db.session.commit()
+            except Exception as e:  # surfaced by the assertion below
+                db.session.rollback()
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=credit, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with app.app_context():
+        # 10 calls over 5 distinct keys: each operation is applied once
+        assert db.session.get(Users, app.test_customer_id).balance == 5 * amount
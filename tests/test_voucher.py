@@ -45,12 +45,35 @@ def test_deactivate_voucher(client, admin_token, test_voucher):
     assert res.status_code == 200
     assert "deactivated" in res.json["msg"].lower()
 
-def test_order_preview_with_voucher(client, admin_token, test_voucher):
+@pytest.fixture
+def priced_product(app):
+    from models.product import Products
+    from instance.database import db
+
+    with app.app_context():
+        product = Products(
+            name="Preview Coffee",
+            slug="preview-coffee",
+            description="Test description",
+            price=10000,
+            currency="IDR",
+            stock_quantity=10,
+            vendor_id=app.test_vendor_id,
+            is_approved=True,
+            discount_percentage=0,
+            unit_quantity="250g",
+        )
+        db.session.add(product)
+        db.session.commit()
+        return product.id
+
+
+def test_order_preview_with_voucher(client, admin_token, test_voucher, priced_product):
     res = client.post(
         "/orders/preview",
         headers={"Authorization": f"Bearer {admin_token}"},
         json={
-            "items": [{"product_id": 1, "quantity": 2, "unit_price": 10000}],
+            "items": [{"product_id": priced_product, "quantity": 2, "unit_price": 10000}],
             "voucher_code": "SAVE20"
         }
     )
@@ -59,6 +82,45 @@ def test_order_preview_with_voucher(client, admin_token, test_voucher):
     assert res.json["discount_amount"] == 4000.0
     assert res.json["total_after_discount"] == 16000.0
 
+
+def test_order_preview_ignores_client_prices(client, admin_token, app, priced_product):
+    from models.product import Products
+    from instance.database import db
+
+    with app.app_context():
+        db.session.get(Products, priced_product).discount_percentage = 15
+        db.session.commit()
+
+    res = client.post(
+        "/orders/preview",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"items": [{"product_id": priced_product, "quantity": 3, "unit_price": 1}]},
+    )
+    assert res.status_code == 200
+    assert res.json["items"][0]["unit_price"] == 8500.0
+    assert res.json["total_after_discount"] == 25500.0
+
+
+def test_order_preview_unknown_product_or_voucher(client, admin_token, priced_product):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    res = client.post(
+        "/orders/preview",
+        headers=headers,
+        json={"items": [{"product_id": 12345, "quantity": 1}]},
+    )
+    assert res.status_code == 400
+
+    res = client.post(
+        "/orders/preview",
+        headers=headers,
+        json={
+            "items": [{"product_id": priced_product, "quantity": 1}],
+            "voucher_code": "NOPE",
+        },
+    )
+    assert res.status_code == 400
+    assert "invalid or expired" in res.json["msg"]
+
 def test_cart_summary_with_voucher(client, customer_token, test_voucher, app):
     from models.cart_item import CartItems
     from models.product import Products
@@ -101,4 +163,90 @@ def test_cart_summary_with_voucher(client, customer_token, test_voucher, app):
     assert res.status_code == 200
     assert res.json["total_before_discount"] == 20000
     assert res.json["discount_amount"] == 4000.0
-    assert res.json["total_after_discount"] == 16000.0
\ No newline at end of file
+    assert res.json["total_after_discount"] == 16000.0
+
+def _count_voucher_selects(app, fn):
+    from sqlalchemy import event
+    from instance.database import db
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().startswith("SELECT") and "FROM vouchers" in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return len(statements)
+
+
+def test_voucher_lookups_are_cached_and_invalidated(
+    client, admin_token, app, test_voucher, priced_product
+):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    def preview(code):
+        return client.post(
+            "/orders/preview",
+            headers=headers,
+            json={"items": [{"product_id": priced_product, "quantity": 1}], "voucher_code": code},
+        )
+
+    assert _count_voucher_selects(app, lambda: preview("SAVE20")) == 1
+    assert _count_voucher_selects(app, lambda: preview("SAVE20")) == 0
+
+    # Unknown codes are cached as misses too
+    assert _count_voucher_selects(app, lambda: preview("LATER10")) == 1
+    assert _count_voucher_selects(app, lambda: preview("LATER10")) == 0
+
+    res = client.post("/vouchers", headers=headers, json={"code": "LATER10", "discount_percent": 10})
+    assert res.status_code == 201
+    assert preview("LATER10").json["discount_amount"] == 1000.0
+
+    client.patch(f"/vouchers/{test_voucher}/deactivate", headers=headers)
+    assert preview("SAVE20").status_code == 400
+
+
+def test_voucher_list_conditional_get(client, admin_token, test_voucher):
+    res = client.get("/vouchers")
+    etag = res.headers["ETag"]
+    assert client.get("/vouchers", headers={"If-None-Match": etag}).status_code == 304
+
+    client.patch(
+        f"/vouchers/{test_voucher}/deactivate",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    res = client.get("/vouchers", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json[0]["is_active"] is False
+
+
+def test_voucher_version_is_read_once_per_window(app, init_db, test_voucher, monkeypatch):
+    from services import voucher_services
+
+    app.config["VOUCHER_VERSION_CHECK_SECONDS"] = 60
+
+    reads = []
+    real = voucher_services.get_namespace_version
+    monkeypatch.setattr(
+        voucher_services,
+        "get_namespace_version",
+        lambda namespace: reads.append(namespace) or real(namespace),
+    )
+    with app.app_context():
+        voucher_services.clear_voucher_cache()
+        for _ in range(5):
+            assert voucher_services.get_active_voucher("SAVE20").code == "SAVE20"
+        assert len(reads) == 1
+
+        # Another worker changed the vouchers: seen once the window lapses
+        voucher_services.bump_namespace_version(voucher_services.VOUCHER_CACHE_NAMESPACE)
+        voucher_services._local_vouchers.set(voucher_services._VERSION_KEY, "old", 0)
+        voucher_services.get_active_voucher("SAVE20")
+        assert len(reads) == 2
+        voucher_services.clear_voucher_cache()
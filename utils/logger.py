@@ -1,22 +1,190 @@
+"""Application logging: JSON records written off the request thread.
+
+``setup_logger`` installs a single QueueHandler on the root logger; a
+QueueListener thread formats and writes the records, so a request never
+blocks on stdout. Every record carries the request id of the request that
+emitted it, DEBUG records can be sampled, and levels can be tuned per
+module (``LOG_LEVELS="repo.product_repo=DEBUG,werkzeug=WARNING"``).
+
+Modules log through ``logging.getLogger(__name__)`` (or
+``current_app.logger`` in routes) with lazy %-style arguments, so disabled
+levels cost a level check and nothing else.
+"""
+
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logger(app):
-    # Set the base logging level
-    app.logger.setLevel(logging.INFO)
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+REQUEST_ID_HEADER = "X-Request-ID"
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(module)s [%(request_id)s]: %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "request_id",
+    "sample_rate",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields become top-level keys."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request's id ("-" outside requests)."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = (
+                g.get("request_id", "-") if has_request_context() else "-"
+            )
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep a fraction of DEBUG records.
+
+    The fraction is ``rate`` unless the call passes its own, e.g.
+    ``logger.debug("...", extra={"sample_rate": 0.01})`` for very hot
+    paths. INFO and above always pass.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, "sample_rate", self.rate)
+        return rate >= 1.0 or random.random() < rate
+
+
+class LocalQueueHandler(QueueHandler):
+    """QueueHandler for an in-process queue.
 
-    # Avoid duplicate handlers during reloads (e.g., with Flask dev server)
-    if app.logger.hasHandlers():
-        return
+    The stdlib version formats the whole record on the calling thread; here
+    only the %-interpolation happens there (args may be mutated once the
+    call returns) and the formatter runs on the listener thread.
+    """
 
-    # Stream handler (console)
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.INFO)
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
-    # Log format
-    formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
+
+class StdoutHandler(logging.StreamHandler):
+    """Writes to the current ``sys.stdout`` (test runners swap it)."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+_queue_handler = None
+_listener = None
+
+
+def _install_root_handler(app):
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        return _queue_handler
+
+    output = StdoutHandler()
+    if app.config.get("LOG_FORMAT", "json") == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    _queue_handler = LocalQueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(RequestIdFilter())
+    _queue_handler.addFilter(DebugSamplingFilter())
+    _listener = QueueListener(
+        _queue_handler.queue, output, respect_handler_level=True
     )
-    handler.setFormatter(formatter)
+    _listener.start()
+    atexit.register(_listener.stop)  # drain what is still queued
+
+    logging.getLogger().addHandler(_queue_handler)
+    return _queue_handler
+
+
+def parse_levels(spec):
+    """``"repo=DEBUG,werkzeug=WARNING"`` -> {"repo": DEBUG, "werkzeug": WARNING}."""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def setup_logger(app):
+    handler = _install_root_handler(app)
+    for flt in handler.filters:
+        if isinstance(flt, DebugSamplingFilter):
+            flt.rate = float(app.config.get("LOG_DEBUG_SAMPLE_RATE", 1.0))
+
+    level = logging.getLevelName(app.config.get("LOG_LEVEL", "INFO").upper())
+    logging.getLogger().setLevel(level)
+    # Records reach the queue through the root logger
+    app.logger.removeHandler(default_handler)
+    app.logger.setLevel(level)
+    for name, module_level in parse_levels(app.config.get("LOG_LEVELS")).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        # Reuse the id of an upstream proxy when it looks sane
+        g.request_id = (
+            incoming if 0 < len(incoming) <= 128 and incoming.isprintable()
+            else uuid.uuid4().hex
+        )
 
-    # Add to Flask app logger
-    app.logger.addHandler(handler)
+    @app.after_request
+    def echo_request_id(response):
+        if "request_id" in g:
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
@@ -0,0 +1,29 @@
+"""Background job worker (see shared/jobs.py).
+
+    python worker.py
+
+Runs queued jobs and the periodic ones (expired reservation sweep, email
+outbox delivery) until SIGTERM/SIGINT; several workers can run side by side.
+"""
+
+import signal
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config.settings import create_app
+from shared.jobs import run_worker
+
+
+def main():
+    app = create_app()
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    run_worker(app, stop)
+
+
+if __name__ == "__main__":
+    main()